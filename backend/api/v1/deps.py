@@ -1,4 +1,6 @@
-from typing import AsyncGenerator
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
 import asyncpg
 from fastapi import Depends, HTTPException, status
@@ -6,10 +8,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
 
-from core import security
+from core import database, security
 from core.config import settings
+from core.ttl_cache import TTLCache
 from schemas.token import TokenPayload
 from schemas.user import User
+from services.queries import USER_BY_EMAIL
 
 # --- OAuth2 スキーマの定義 ---
 # トークンを取得するためのAPIエンドポイントのURLを指定します。
@@ -19,20 +23,52 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
+# --- 認証済みユーザーのキャッシュ ---
+# トークンの subject（メールアドレス）をキーに、検証済みの User を保持します。
+# ユーザー情報を変更する処理では invalidate_cached_user を呼び出してください。
+# キャッシュはプロセスごとのため、他のワーカーでは最大 USER_CACHE_TTL_SECONDS 秒古い情報が返り得ます。
+_user_cache: TTLCache[User] = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_cached_user(email: str) -> None:
+    """
+    指定したユーザーのキャッシュを破棄します。
+    """
+    _user_cache.delete(email)
+
+
+@asynccontextmanager
+async def db_connection() -> AsyncIterator[asyncpg.Connection]:
+    """
+    コネクションプールから接続を取得し、終了時に返却するコンテキストマネージャ。
+    キャッシュにヒットした場合は接続を使わないエンドポイントなど、必要になった時点で接続を取得したい場合に使います。
+    """
+    try:
+        conn = await database.acquire_connection()
+    except asyncio.TimeoutError:
+        # プールが飽和して接続を取得できなかった場合
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is busy. Please retry later.",
+        )
+
+    try:
+        yield conn
+    finally:
+        await database.release_connection(conn)
+
+
 async def get_db() -> AsyncGenerator[asyncpg.Connection, None]:
     """
     データベース接続の依存性。
     リクエストごとにコネクションプールから接続を取得し、
-    処理が完了したらクローズ（プールに返却）します。
+    処理が完了したらプールに返却します。
     """
-    conn = None
-    try:
-        # 設定ファイルからデータベースURLを取得して接続
-        conn = await asyncpg.connect(settings.DATABASE_URL)
+    async with db_connection() as conn:
         yield conn
-    finally:
-        if conn:
-            await conn.close()
 
 
 async def get_current_user(
@@ -56,14 +92,19 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # 直近に検証済みのユーザーであればキャッシュから返す
+    cached_user = _user_cache.get(token_data.sub)
+    if cached_user is not None:
+        return cached_user
+
     # トークンからユーザーのメールアドレスを取得し、DBからユーザーを検索
-    user_record = await conn.fetchrow(
-        "SELECT * FROM users WHERE email = $1", token_data.sub
-    )
+    user_record = await USER_BY_EMAIL.fetchrow(conn, token_data.sub)
 
     if not user_record:
         # ユーザーが見つからない場合も認証エラー
         raise HTTPException(status_code=404, detail="User not found")
     
     # DBから取得したレコードをUserスキーマに変換して返す
-    return User(**user_record)
+    user = User(**user_record)
+    _user_cache.set(token_data.sub, user)
+    return user
@@ -15,7 +15,17 @@ from fastapi import (
 from api.v1 import deps
 from schemas import user as user_schema
 from schemas import admin as admin_schema
-from core import security
+from core import database, security
+from core.cache import get_cache
+from core.cache.tags import content_tag
+from core.queries import get_query_stats
+from services.account import AccountService
+from services.activity_rollup import ActivityRollupService
+from services.answer_ingest import get_answer_ingest
+from services.feed_candidates import get_feed_candidate_pool
+from services.learning_stats import LearningStatsService
+from services.public_feed_cache import invalidate_public_feed
+from services.student_import import StudentImportService
 
 router = APIRouter()
 
@@ -79,7 +89,7 @@ async def create_teacher(
             detail="A user with this email already exists.",
         )
 
-    hashed_password = security.get_password_hash(teacher_in.password)
+    hashed_password = await security.get_password_hash_async(teacher_in.password)
     
     # データベースに新しい教師を挿入
     new_teacher_record = await conn.fetchrow(
@@ -122,6 +132,9 @@ async def update_teacher_status(
     
     if not updated_teacher:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found")
+
+    # 無効化したアカウントの情報がキャッシュに残らないようにする
+    deps.invalidate_cached_user(updated_teacher['email'])
         
     return updated_teacher
 
@@ -139,11 +152,11 @@ async def delete_teacher(
     """
     教師アカウントを削除します。（管理者権限が必要）
     """
-    result = await conn.execute(
-        "DELETE FROM users WHERE id = $1 AND role = 'teacher'", teacher_id
-    )
-    if result == 'DELETE 0':
+    # 反応数とトレンドから、この教師の反応の分を同じトランザクションで差し引いて削除する
+    deleted_email = await AccountService(conn).delete(teacher_id, role='teacher')
+    if deleted_email is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found")
+    deps.invalidate_cached_user(deleted_email)
     return
 
 
@@ -168,49 +181,21 @@ async def bulk_upload_students(
     if file.content_type != 'text/csv':
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type. Please upload a CSV.")
 
-    contents = await file.read()
-    decoded_content = contents.decode('utf-8')
-    csv_reader = csv.reader(io.StringIO(decoded_content))
-    
-    header = next(csv_reader, None)
-    if not header or header != ['email', 'password', 'nickname']:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid CSV header. Expected: email, password, nickname")
+    # アップロードされたファイル全体をメモリに読み込まず、1行ずつ読み進める
+    text_stream = io.TextIOWrapper(file.file, encoding='utf-8', newline='')
+    try:
+        csv_reader = csv.reader(text_stream)
 
-    result = {
-        "total_rows": 0,
-        "successful_imports": 0,
-        "failed_imports": 0,
-        "errors": []
-    }
+        header = next(csv_reader, None)
+        if not header or header != ['email', 'password', 'nickname']:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid CSV header. Expected: email, password, nickname")
 
-    async with conn.transaction():
-        for i, row in enumerate(csv_reader):
-            result["total_rows"] += 1
-            if len(row) != 3:
-                result["failed_imports"] += 1
-                result["errors"].append(f"Row {i+1}: Invalid number of columns")
-                continue
-            
-            email, password, nickname = row
-            
-            # TODO: email, password, nickname のバリデーション
-            
-            try:
-                hashed_password = security.get_password_hash(password)
-                await conn.execute(
-                    """
-                    INSERT INTO users (email, password_hash, nickname, role)
-                    VALUES ($1, $2, $3, 'student')
-                    """,
-                    email, hashed_password, nickname
-                )
-                result["successful_imports"] += 1
-            except asyncpg.exceptions.UniqueViolationError:
-                result["failed_imports"] += 1
-                result["errors"].append(f"Row {i+1}: Email '{email}' already exists.")
-            except Exception as e:
-                result["failed_imports"] += 1
-                result["errors"].append(f"Row {i+1}: An unexpected error occurred: {e}")
+        result = await StudentImportService(conn).import_rows(csv_reader)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file encoding. Please upload a UTF-8 CSV.")
+    finally:
+        # UploadFile 側でクローズするため、ラッパーはファイルから切り離す
+        text_stream.detach()
 
     return result
 
@@ -228,9 +213,106 @@ async def delete_content(
     """
     不適切な投稿など、任意のコンテンツをシステムから強制的に削除します。（管理者権限が必要）
     """
-    result = await conn.execute(
-        "DELETE FROM contents WHERE id = $1", content_id
-    )
+    # カスケード削除される解答の分も含めて、学習統計と日別活動数を同じトランザクションで減らす
+    async with conn.transaction():
+        await LearningStatsService(conn).subtract_content(content_id)
+        await ActivityRollupService(conn).subtract_content(content_id)
+        result = await conn.execute(
+            "DELETE FROM contents WHERE id = $1", content_id
+        )
     if result == 'DELETE 0':
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
+    await invalidate_public_feed()
+    get_feed_candidate_pool().remove_content(content_id)
+    await get_cache().invalidate_tags(content_tag(content_id))
     return
+
+
+# ---------------------------------------------------------------------------
+# システム監視 API
+# ---------------------------------------------------------------------------
+
+@router.get(
+    "/system/db-pool",
+    response_model=admin_schema.DbPoolStats,
+    summary="【管理者用】DBコネクションプールの使用状況を取得"
+)
+async def get_db_pool_stats(
+    admin: user_schema.User = Depends(get_current_admin)
+):
+    """
+    コネクションプールの使用中・待機中の接続数などを取得します。（管理者権限が必要）
+    """
+    return database.get_pool_stats()
+
+
+@router.get(
+    "/system/password-hashing",
+    response_model=admin_schema.PasswordHashingStats,
+    summary="【管理者用】パスワードハッシュ計算の実行状況を取得"
+)
+async def get_password_hashing_stats(
+    admin: user_schema.User = Depends(get_current_admin)
+):
+    """
+    パスワードハッシュ計算用スレッドプールの実行待ち・実行中の件数などを取得します。（管理者権限が必要）
+    """
+    return security.get_hashing_stats()
+
+
+@router.get(
+    "/system/answer-ingest",
+    response_model=admin_schema.AnswerIngestStats,
+    summary="【管理者用】解答の書き込みキューの状況を取得"
+)
+async def get_answer_ingest_stats(
+    admin: user_schema.User = Depends(get_current_admin)
+):
+    """
+    解答の書き込みキューの滞留数や書き込み件数を取得します。（管理者権限が必要）
+    """
+    ingest = get_answer_ingest()
+    if ingest is None:
+        return {"enabled": False}
+    return {"enabled": True, **ingest.stats()}
+
+
+@router.get(
+    "/system/cache",
+    summary="【管理者用】共有キャッシュの状況を取得"
+)
+async def get_cache_stats(
+    admin: user_schema.User = Depends(get_current_admin)
+):
+    """
+    共有キャッシュのヒット数・ミス数や、同時読み込みの集約数などを取得します。（管理者権限が必要）
+    """
+    return get_cache().stats()
+
+
+@router.get(
+    "/system/queries",
+    response_model=List[admin_schema.QueryStats],
+    summary="【管理者用】登録済みのSQL文ごとの実行状況を取得"
+)
+async def get_registered_query_stats(
+    admin: user_schema.User = Depends(get_current_admin)
+):
+    """
+    services/queries.py に登録したSQL文ごとの実行回数・実行時間を、合計実行時間の長い順に取得します。（管理者権限が必要）
+    """
+    return get_query_stats()
+
+
+@router.get(
+    "/system/feed-candidates",
+    response_model=admin_schema.FeedCandidateStats,
+    summary="【管理者用】おすすめフィードの候補の状況を取得"
+)
+async def get_feed_candidate_stats(
+    admin: user_schema.User = Depends(get_current_admin)
+):
+    """
+    このワーカーが保持しているおすすめフィードの候補数や、変更の反映回数などを取得します。（管理者権限が必要）
+    """
+    return get_feed_candidate_pool().stats()
@@ -10,6 +10,8 @@ from api.v1 import deps
 from core import security
 from core.config import settings
 from schemas import user, token
+from services.account import AccountService
+from services.queries import UPDATE_USER_PROFILE, USER_BY_EMAIL
 
 router = APIRouter()
 
@@ -32,7 +34,7 @@ async def register(
             detail="A user with this email already exists.",
         )
 
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.get_password_hash_async(user_in.password)
     
     # データベースに新しいユーザーを挿入
     # RETURNING * を使って挿入したレコードをすぐに取得
@@ -62,10 +64,8 @@ async def login(
     ユーザーログイン。OAuth2互換のフォームデータ（username, password）を受け取り、
     アクセストークンを返却します。
     """
-    user_record = await conn.fetchrow(
-        "SELECT * FROM users WHERE email = $1", form_data.username
-    )
-    if not user_record or not security.verify_password(form_data.password, user_record['password_hash']):
+    user_record = await USER_BY_EMAIL.fetchrow(conn, form_data.username)
+    if not user_record or not await security.verify_password_async(form_data.password, user_record['password_hash']):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
@@ -110,43 +110,24 @@ async def update_user_profile(
     """
     現在のユーザーのプロフィール（ニックネーム、プロフィール画像、パスワード）を更新します。（要認証）
     """
-    # 更新するフィールドと値を動的に構築
-    update_fields = []
-    values = []
-    
-    # Bodyから受け取った値がNoneでない場合のみ更新対象に加える
-    if user_in.nickname is not None:
-        update_fields.append("nickname = ${}")
-        values.append(user_in.nickname)
-        
-    if user_in.profile_image_url is not None:
-        update_fields.append("profile_image_url = ${}")
-        values.append(user_in.profile_image_url)
-        
-    if user_in.password is not None:
-        hashed_password = security.get_password_hash(user_in.password)
-        update_fields.append("password_hash = ${}")
-        values.append(hashed_password)
-
-    if not update_fields:
+    # Bodyから受け取った値がNoneでない場合のみ更新する
+    # (常に同じSQL文で実行し、プリペアドステートメントを再利用する)
+    if user_in.nickname is None and user_in.profile_image_url is None and user_in.password is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
 
-    # SQLクエリを生成
-    set_clause = ", ".join([field.format(i + 1) for i, field in enumerate(update_fields)])
-    values.append(current_user.id) # WHERE句のためのID
-    
-    query = f"""
-        UPDATE users
-        SET {set_clause}, updated_at = NOW()
-        WHERE id = ${len(values)}
-        RETURNING *
-    """
-    
-    updated_user_record = await conn.fetchrow(query, *values)
+    hashed_password = None
+    if user_in.password is not None:
+        hashed_password = await security.get_password_hash_async(user_in.password)
+
+    updated_user_record = await UPDATE_USER_PROFILE.fetchrow(
+        conn, current_user.id, user_in.nickname, user_in.profile_image_url, hashed_password
+    )
 
     if not updated_user_record:
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    deps.invalidate_cached_user(current_user.email)
+
     # ★★★ ここを修正 ★★★
     # asyncpg.Record を dict に変換してから返す
     return dict(updated_user_record)
@@ -160,6 +141,8 @@ async def delete_account(
     """
     現在のアカウントを削除します。（要認証）
     """
-    await conn.execute("DELETE FROM users WHERE id = $1", current_user.id)
+    # 反応数とトレンドから、このユーザーの反応・解答の分を同じトランザクションで差し引いて削除する
+    await AccountService(conn).delete(current_user.id)
+    deps.invalidate_cached_user(current_user.email)
     return {"message": "Account deleted successfully"}
 
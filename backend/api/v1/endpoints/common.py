@@ -1,12 +1,27 @@
 import uuid
+from datetime import datetime
+
 import asyncpg
-from typing import List, Optional, Union
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from typing import List, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
 
 from api.v1 import deps
+from core.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    parse_keyset_cursor,
+)
 from schemas import common as common_schema
 from schemas import user as user_schema
 from schemas import content as content_schema
+from services.answer_key import get_answer_key
+from services.hydration import HydrationService
+from services.engagement import EMPTY_COUNTS, EngagementService
+from services.public_feed_cache import conditional_response, get_public_feed_page
+from services.queries import PUBLIC_FEED_PAGE, USER_NOTIFICATIONS
+from services.search_service import SNIPPET_CONTEXT_CHARS, SearchService, highlight
 
 router = APIRouter()
 
@@ -19,53 +34,45 @@ router = APIRouter()
 async def search_contents(
     conn: asyncpg.Connection = Depends(deps.get_db),
     q: str = Query(..., min_length=1, description="検索キーワード"),
-    limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスの next_cursor"),
 ):
     """
-    クイズと豆知識のタイトルまたは本文にキーワードを含むコンテンツを検索します。
+    クイズと豆知識のタイトルまたは本文にキーワードを含むコンテンツを、関連度の高い順に検索します。
     """
-    # ILIKE を使って大文字小文字を区別せずに部分一致検索
-    search_term = f"%{q}%"
-    
-    # 検索結果の総数を取得
-    total_count_record = await conn.fetchrow(
-        """
-        SELECT COUNT(*) FROM contents
-        WHERE (title ILIKE $1 OR content ILIKE $1)
-          AND is_published = TRUE
-        """,
-        search_term
-    )
-    total = total_count_record['count'] if total_count_record else 0
-    
-    # 検索結果を指定された件数だけ取得
-    search_records = await conn.fetch(
-        """
-        SELECT * FROM contents
-        WHERE (title ILIKE $1 OR content ILIKE $1)
-          AND is_published = TRUE
-        ORDER BY created_at DESC
-        LIMIT $2 OFFSET $3
-        """,
-        search_term, limit, offset
-    )
-
-    # クイズの場合は選択肢を、すべての場合はタグを取得
-    items = []
-    for record in search_records:
-        options = []
-        if record['content_type'] == 'quiz':
-            options = await conn.fetch("SELECT * FROM quiz_options WHERE content_id = $1 ORDER BY display_order", record['id'])
-        
-        tags = await conn.fetch("SELECT t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", record['id'])
-        
-        item = {**record, "tags": tags}
-        if options:
-            item["options"] = options
-        items.append(item)
-
-    return {"items": items, "total": total}
+    search_service = SearchService(conn)
+    after = decode_cursor(cursor, (float, datetime, uuid.UUID)) if cursor else None
+
+    # 次ページの有無を判定するため1件多く取得
+    search_records = await search_service.search(q, limit + 1, after)
+    has_more = len(search_records) > limit
+    search_records = search_records[:limit]
+
+    # 1ページに収まる場合は正確な件数、そうでなければ推定件数
+    if cursor is None and not has_more:
+        total = len(search_records)
+    else:
+        total = await search_service.estimate_total(q)
+
+    # クイズの場合は選択肢を、すべての場合はタグを一括で取得
+    items = await HydrationService(conn).hydrate(search_records)
+
+    highlights = [
+        {
+            "content_id": record['id'],
+            "rank": record['rank'],
+            "title": highlight(record['title'], q),
+            "snippet": highlight(record['content'], q, SNIPPET_CONTEXT_CHARS),
+        }
+        for record in search_records
+    ]
+
+    next_cursor = None
+    if has_more:
+        last = search_records[-1]
+        next_cursor = encode_cursor((last['rank'], last['created_at'], last['id']))
+
+    return {"items": items, "highlights": highlights, "total": total, "next_cursor": next_cursor}
 
 
 @router.get(
@@ -80,15 +87,7 @@ async def get_notifications(
     """
     自身宛の通知一覧を取得します。（要認証）
     """
-    notifications = await conn.fetch(
-        """
-        SELECT * FROM notifications
-        WHERE user_id = $1
-        ORDER BY created_at DESC
-        LIMIT 50
-        """,
-        current_user.id
-    )
+    notifications = await USER_NOTIFICATIONS.fetch(conn, current_user.id)
     
     # TODO: 通知を既読にする処理を追加（例: /notifications/{id}/read）
 
@@ -100,60 +99,71 @@ async def get_notifications(
     summary="【公開】認証不要の公開フィード取得"
 )
 async def get_public_feed(
-    conn: asyncpg.Connection = Depends(deps.get_db),
-    limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    request: Request,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    認証不要で公開されている全てのクイズと豆知識を取得します。
+    認証不要で公開されている全てのクイズと豆知識を新しい順に取得します。
     作成者情報は匿名化されます。
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
+
+    反応数を除いたページは共有キャッシュに保持し、反応数だけをリクエストごとに content_engagement から読みます。
+    ETag を返すため、If-None-Match 付きの再取得には 304 を返します。
     """
+    async with deps.db_connection() as conn:
+        page, next_cursor = await get_public_feed_page(
+            limit, cursor, lambda: _load_public_feed(conn, limit, cursor)
+        )
+        counts_by_content = await EngagementService(conn).get_counts([item['id'] for item in page])
+
+    # キャッシュの値は他のリクエストと共有されるため、コピーに反応数を付与する
+    result = [{**item, **counts_by_content.get(item['id'], EMPTY_COUNTS)} for item in page]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return conditional_response(request, result, headers)
+
+
+async def _load_public_feed(
+    conn: asyncpg.Connection, limit: int, cursor: Optional[str]
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    公開フィードの1ページ分を、反応数を除いてDBから読み込みます。
+
+    :return: (コンテンツのリスト, 次ページのカーソル)
+    """
+    after_created_at, after_id = parse_keyset_cursor(cursor)
+
     # 公開コンテンツを取得
-    contents = await conn.fetch(
-        """
-        SELECT
-            c.id, c.title, c.content, c.content_type,
-            c.created_at, c.updated_at, c.is_published,
-            NULL::uuid as author_id  -- 匿名化のためNULLに
-        FROM contents c
-        WHERE c.is_published = TRUE
-        ORDER BY c.created_at DESC
-        LIMIT $1 OFFSET $2
-        """,
-        limit, offset
-    )
+    contents = await PUBLIC_FEED_PAGE.fetch(conn, limit + 1, after_created_at, after_id)
+    next_cursor = None
+    if len(contents) > limit:
+        last = contents[limit - 1]
+        next_cursor = encode_cursor((last['created_at'], last['id']))
+    contents = contents[:limit]
+
+    content_ids = [record['id'] for record in contents]
+    quiz_ids = [record['id'] for record in contents if record['content_type'] == 'quiz']
+
+    # タグと選択肢を一括で取得
+    hydrator = HydrationService(conn)
+    tags_by_content = await hydrator.load_tags(content_ids)
+    options_by_content = await hydrator.load_options(quiz_ids)
 
     result = []
     for content_record in contents:
         content_dict = dict(content_record)
+        content_dict['tags'] = [tag['name'] for tag in tags_by_content.get(content_record['id'], [])]
 
-        # タグを取得
-        tags = await conn.fetch(
-            """
-            SELECT t.name FROM tags t
-            JOIN content_tags ct ON t.id = ct.tag_id
-            WHERE ct.content_id = $1
-            """,
-            content_record['id']
-        )
-        content_dict['tags'] = [tag['name'] for tag in tags]
-
-        # クイズの場合は選択肢を取得（正解情報は含まない）
+        # クイズの場合は選択肢を付与（正解情報は含まない）
         if content_record['content_type'] == 'quiz':
-            options = await conn.fetch(
-                """
-                SELECT id, option_text as text, display_order
-                FROM quiz_options
-                WHERE content_id = $1
-                ORDER BY display_order
-                """,
-                content_record['id']
-            )
-            content_dict['options'] = [dict(opt) for opt in options]
+            content_dict['options'] = [
+                {"id": opt['id'], "text": opt['option_text'], "display_order": opt['display_order']}
+                for opt in options_by_content.get(content_record['id'], [])
+            ]
 
         result.append(content_dict)
 
-    return result
+    return result, next_cursor
 
 
 @router.post(
@@ -170,77 +180,43 @@ async def submit_public_quiz_answer(
     認証不要でクイズに解答します。
     解答履歴は保存されません。
     """
-    # クイズが存在するか確認
-    content = await conn.fetchrow(
-        """
-        SELECT id, content_type, is_published
-        FROM contents
-        WHERE id = $1
-        """,
-        content_id
-    )
-
-    if not content:
+    # 正誤判定はキャッシュした解答キーで行う（キャッシュがあればクエリは発行しない）
+    answer_key = await get_answer_key(conn, content_id)
+
+    if not answer_key:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="クイズが見つかりません。"
         )
 
-    if content['content_type'] != 'quiz':
+    if answer_key.content_type != 'quiz':
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="このコンテンツはクイズではありません。"
         )
 
-    if not content['is_published']:
+    if not answer_key.is_published:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="このクイズは公開されていません。"
         )
 
     # 選択された選択肢が存在するか確認
-    selected_option = await conn.fetchrow(
-        """
-        SELECT id, is_correct
-        FROM quiz_options
-        WHERE id = $1 AND content_id = $2
-        """,
-        selected_option_id, content_id
-    )
-
-    if not selected_option:
+    if selected_option_id not in answer_key.options:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="選択された選択肢が見つかりません。"
         )
 
-    # 正解の選択肢を取得
-    correct_option = await conn.fetchrow(
-        """
-        SELECT id FROM quiz_options
-        WHERE content_id = $1 AND is_correct = TRUE
-        """,
-        content_id
-    )
-
-    if not correct_option:
+    if not answer_key.correct_option_id:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="クイズに正解が設定されていません。"
         )
 
-    # 解説をcontentsテーブルから取得
-    explanation_record = await conn.fetchrow(
-        """
-        SELECT explanation FROM contents
-        WHERE id = $1
-        """,
-        content_id
-    )
-
     # 解答結果を返す（保存はしない）
     return {
-        "is_correct": selected_option['is_correct'],
-        "correct_option_id": correct_option['id'],
-        "explanation": explanation_record['explanation'] if explanation_record else None
+        "is_correct": answer_key.options[selected_option_id],
+        "correct_option_id": answer_key.correct_option_id,
+        "explanation": answer_key.explanation
     }
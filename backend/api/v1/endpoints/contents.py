@@ -1,30 +1,60 @@
 import uuid
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 import asyncpg
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from api.v1 import deps
+from core.cache import get_cache
+from core.cache.tags import content_tag, fact_details_key, quiz_details_key
+from core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    parse_keyset_cursor,
+)
 from schemas import content as content_schema
 from schemas import user as user_schema
+from services.activity_rollup import ActivityRollupService
+from services.answer_ingest import record_answer
+from services.answer_key import get_answer_key
+from services.content_writer import ContentWriteService
+from services.feed_candidates import get_feed_candidate_pool
+from services.feed_service import FeedService
+from services.hydration import HydrationService
+from services.learning_stats import LearningStatsService
+from services.public_feed_cache import invalidate_public_feed
+from services.trending import TrendingService
+from services.queries import (
+    CONTENT_AUTHOR,
+    CONTENT_TAGS,
+    CONTENTS_PAGE,
+    CONTENT_WITH_COUNTS,
+    QUIZ_OPTIONS,
+    UPDATE_CONTENT,
+    UPDATE_CONTENT_FIELDS,
+    partial_update_args,
+)
 
 router = APIRouter()
 
 
 # --- ヘルパー関数 ---
 
-async def _get_quiz_details(conn: asyncpg.Connection, quiz_id: uuid.UUID) -> dict:
+async def _load_quiz_details(conn: asyncpg.Connection, quiz_id: uuid.UUID) -> Optional[dict]:
     """
-    指定されたIDのクイズと、それに関連するオプションとタグを取得する
+    指定されたIDのクイズと、それに関連するオプションとタグをDBから読み込む (存在しない場合は None)
     """
-    quiz_record = await conn.fetchrow(
-        "SELECT * FROM contents WHERE id = $1 AND content_type = 'quiz'", quiz_id
-    )
+    quiz_record = await CONTENT_WITH_COUNTS.fetchrow(conn, quiz_id, 'quiz')
     if not quiz_record:
-        raise HTTPException(status_code=404, detail="Quiz not found")
+        return None
 
-    options = await conn.fetch("SELECT * FROM quiz_options WHERE content_id = $1 ORDER BY display_order", quiz_id)
-    tags = await conn.fetch("SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", quiz_id)
+    options = await QUIZ_OPTIONS.fetch(conn, quiz_id)
+    tags = await CONTENT_TAGS.fetch(conn, quiz_id)
 
     # Recordをdictに変換して返す
     return {
@@ -33,6 +63,31 @@ async def _get_quiz_details(conn: asyncpg.Connection, quiz_id: uuid.UUID) -> dic
         "tags": [dict(t) for t in tags]
     }
 
+
+async def _get_quiz_details(conn: asyncpg.Connection, quiz_id: uuid.UUID) -> dict:
+    """
+    指定されたIDのクイズと、それに関連するオプションとタグを取得する
+    (共有キャッシュを経由し、キャッシュミス時のみDBから読み込む)
+    """
+    quiz = await get_cache().get_or_load(
+        quiz_details_key(quiz_id), lambda: _load_quiz_details(conn, quiz_id), tags=[content_tag(quiz_id)]
+    )
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz
+
+
+async def _load_fact_details(conn: asyncpg.Connection, fact_id: uuid.UUID) -> Optional[dict]:
+    """
+    指定されたIDの豆知識と、それに関連するタグをDBから読み込む (存在しない場合は None)
+    """
+    fact_record = await CONTENT_WITH_COUNTS.fetchrow(conn, fact_id, 'trivia')
+    if not fact_record:
+        return None
+
+    tags = await CONTENT_TAGS.fetch(conn, fact_id)
+    return {**dict(fact_record), "tags": [dict(t) for t in tags]}
+
 async def _check_quiz_author(
     conn: asyncpg.Connection,
     quiz_id: uuid.UUID,
@@ -41,10 +96,7 @@ async def _check_quiz_author(
     """
     ユーザーがクイズの作成者（author）であるか確認する
     """
-    author_id = await conn.fetchval(
-        "SELECT author_id FROM contents WHERE id = $1 AND content_type = 'quiz'",
-        quiz_id
-    )
+    author_id = await CONTENT_AUTHOR.fetchval(conn, quiz_id, 'quiz')
     if not author_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     if author_id != user_id:
@@ -60,28 +112,21 @@ async def _check_quiz_author(
 
 @router.get("/quizzes", response_model=List[content_schema.Quiz])
 async def read_quizzes(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    クイズの一覧を取得します。
+    クイズの一覧を新しい順に取得します。
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
     """
-    quiz_records = await conn.fetch(
-        "SELECT * FROM contents "
-        "WHERE content_type = 'quiz' AND is_published = TRUE "
-        "ORDER BY created_at DESC "
-        "LIMIT $1 OFFSET $2",
-        limit, offset
-    )
-
-    quizzes = []
-    for record in quiz_records:
-        options = await conn.fetch("SELECT * FROM quiz_options WHERE content_id = $1 ORDER BY display_order", record['id'])
-        tags = await conn.fetch("SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", record['id'])
-        quizzes.append({**dict(record), "options": [dict(o) for o in options], "tags": [dict(t) for t in tags]})
+    after_created_at, after_id = parse_keyset_cursor(cursor)
+    quiz_records = await CONTENTS_PAGE.fetch(conn, 'quiz', limit + 1, after_created_at, after_id)
+    quiz_records = paginate(quiz_records, limit, response)
 
-    return quizzes
+    # 選択肢とタグは件数に関係なく一括で取得する
+    return await HydrationService(conn).hydrate(quiz_records)
 
 
 @router.post("/quizzes", response_model=content_schema.Quiz, status_code=status.HTTP_201_CREATED)
@@ -100,24 +145,17 @@ async def create_quiz(
             quiz_in.title, quiz_in.content, quiz_in.explanation, current_user.id
         )
 
-        options_list = []
-        for i, option in enumerate(quiz_in.options):
-            option_record = await conn.fetchrow(
-                "INSERT INTO quiz_options (content_id, option_text, is_correct, display_order) "
-                "VALUES ($1, $2, $3, $4) RETURNING *",
-                new_quiz_record['id'], option.option_text, option.is_correct, i
-            )
-            options_list.append(dict(option_record))
-        
-        tags_list = []
-        if quiz_in.tags:
-            for tag_name in quiz_in.tags:
-                tag_record = await conn.fetchrow("SELECT id, name FROM tags WHERE name = $1", tag_name)
-                if not tag_record:
-                    tag_record = await conn.fetchrow("INSERT INTO tags (name) VALUES ($1) RETURNING id, name", tag_name)
-                await conn.execute("INSERT INTO content_tags (content_id, tag_id) VALUES ($1, $2)", new_quiz_record['id'], tag_record['id'])
-                tags_list.append(dict(tag_record))
+        # 選択肢とタグは件数に関係なくそれぞれ1回のクエリで登録する
+        writer = ContentWriteService(conn)
+        options_list = await writer.insert_options(new_quiz_record['id'], quiz_in.options)
+        tags_list = await writer.insert_tags(new_quiz_record['id'], quiz_in.tags or [])
+
+        await LearningStatsService(conn).add_post(current_user.id, new_quiz_record['created_at'])
 
+    await invalidate_public_feed()
+    get_feed_candidate_pool().add_content(
+        new_quiz_record['id'], new_quiz_record['created_at'], [t['id'] for t in tags_list]
+    )
     return {**dict(new_quiz_record), "options": options_list, "tags": tags_list}
 
 
@@ -151,40 +189,33 @@ async def update_quiz(
         tags = update_data.pop('tags', None)
 
         if update_data: # 更新するフィールドが何かあれば
-            set_clause = ", ".join([f"{key} = ${i+1}" for i, key in enumerate(update_data.keys())])
-            values = list(update_data.values())
-            values.append(quiz_id)
-            
-            await conn.execute(
-                f"UPDATE contents SET {set_clause}, updated_at = NOW() WHERE id = ${len(values)}",
-                *values
-            )
+            # 指定された項目のみを更新する (SQL文は常に同じため、プリペアドステートメントを再利用できる)
+            await UPDATE_CONTENT.execute(conn, quiz_id, *partial_update_args(update_data, UPDATE_CONTENT_FIELDS))
+
+        writer = ContentWriteService(conn)
 
         # 4. 選択肢を更新 (指定があった場合のみ)
         if options is not None:
-            # 既存の選択肢をすべて削除
-            await conn.execute("DELETE FROM quiz_options WHERE content_id = $1", quiz_id)
-            # 新しい選択肢を挿入
-            for i, option in enumerate(options):
-                await conn.execute(
-                    "INSERT INTO quiz_options (content_id, option_text, is_correct, display_order) "
-                    "VALUES ($1, $2, $3, $4)",
-                    quiz_id, option.option_text, option.is_correct, i
-                )
+            # 既存の選択肢をすべて削除し、新しい選択肢を一括で挿入
+            await writer.replace_options(quiz_id, quiz_in.options)
 
         # 5. タグを更新 (指定があった場合のみ)
         if tags is not None:
-            # 既存のタグ関連をすべて削除
-            await conn.execute("DELETE FROM content_tags WHERE content_id = $1", quiz_id)
-            # 新しいタグ関連を挿入
-            for tag_name in tags:
-                tag_record = await conn.fetchrow("SELECT id FROM tags WHERE name = $1", tag_name)
-                if not tag_record:
-                    tag_record = await conn.fetchrow("INSERT INTO tags (name) VALUES ($1) RETURNING id", tag_name)
-                await conn.execute("INSERT INTO content_tags (content_id, tag_id) VALUES ($1, $2)", quiz_id, tag_record['id'])
+            # 既存のタグ関連をすべて削除し、新しいタグ関連を一括で挿入
+            tags_list = await writer.replace_tags(quiz_id, tags)
+
+    await invalidate_public_feed()
+    if tags is not None:
+        get_feed_candidate_pool().update_content_tags(quiz_id, [t['id'] for t in tags_list])
+    # 詳細と解答キー（正解や解説が変わった可能性がある）のキャッシュを、すべてのワーカーで破棄
+    await get_cache().invalidate_tags(content_tag(quiz_id))
 
     # 6. 更新後の完全なクイズデータを取得して返す
-    return await _get_quiz_details(conn, quiz_id)
+    #    (破棄直後のキャッシュや、更新前に始まった同じキーの読み込みの結果を返さないよう、DBから直接読む)
+    quiz = await _load_quiz_details(conn, quiz_id)
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz
 
 
 @router.delete("/quizzes/{quiz_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -200,7 +231,14 @@ async def delete_quiz(
     await _check_quiz_author(conn, quiz_id, current_user.id)
     
     # 2. 削除を実行 (ON DELETE CASCADEにより関連データも削除される)
-    await conn.execute("DELETE FROM contents WHERE id = $1", quiz_id)
+    #    カスケード削除される解答の分も含めて、学習統計と日別活動数を同じトランザクションで減らす
+    async with conn.transaction():
+        await LearningStatsService(conn).subtract_content(quiz_id)
+        await ActivityRollupService(conn).subtract_content(quiz_id)
+        await conn.execute("DELETE FROM contents WHERE id = $1", quiz_id)
+    await invalidate_public_feed()
+    get_feed_candidate_pool().remove_content(quiz_id)
+    await get_cache().invalidate_tags(content_tag(quiz_id))
     
     return
 
@@ -215,27 +253,22 @@ async def answer_quiz(
     """
     クイズに解答し、正誤判定を受け取ります。（要認証）
     """
-    correct_option_record = await conn.fetchrow(
-        "SELECT qo.id, c.explanation FROM quiz_options qo "
-        "JOIN contents c ON qo.content_id = c.id "
-        "WHERE qo.content_id = $1 AND qo.is_correct = TRUE",
-        quiz_id
-    )
-    if not correct_option_record:
+    # 正誤判定はキャッシュした解答キーで行い、DBへは解答の記録のみを書き込む
+    answer_key = await get_answer_key(conn, quiz_id)
+    if not answer_key or answer_key.content_type != 'quiz' or not answer_key.correct_option_id:
         raise HTTPException(status_code=404, detail="Quiz or correct option not found")
+    if answer_in.selected_option_id not in answer_key.options:
+        raise HTTPException(status_code=404, detail="Selected option not found")
 
-    is_correct = (answer_in.selected_option_id == correct_option_record['id'])
+    is_correct = answer_key.options[answer_in.selected_option_id]
 
-    await conn.execute(
-        "INSERT INTO user_answers (user_id, content_id, selected_option_id, is_correct) "
-        "VALUES ($1, $2, $3, $4)",
-        current_user.id, quiz_id, answer_in.selected_option_id, is_correct
-    )
+    # ANSWER_INGEST_ENABLED の場合は書き込みをキューに任せ、正誤判定の結果をすぐに返す
+    await record_answer(conn, current_user.id, quiz_id, answer_in.selected_option_id, is_correct)
 
     return {
         "is_correct": is_correct,
-        "correct_option_id": correct_option_record['id'],
-        "explanation": correct_option_record['explanation']
+        "correct_option_id": answer_key.correct_option_id,
+        "explanation": answer_key.explanation
     }
 
 
@@ -283,26 +316,21 @@ async def read_my_all_quiz_answers(
 
 @router.get("/facts", response_model=List[content_schema.Trivia])
 async def read_facts(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    豆知識の一覧を取得します。
+    豆知識の一覧を新しい順に取得します。
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
     """
-    fact_records = await conn.fetch(
-        "SELECT * FROM contents "
-        "WHERE content_type = 'trivia' AND is_published = TRUE "
-        "ORDER BY created_at DESC LIMIT $1 OFFSET $2",
-        limit, offset
-    )
-    
-    facts = []
-    for record in fact_records:
-        tags = await conn.fetch("SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", record['id'])
-        facts.append({**dict(record), "tags": [dict(t) for t in tags]})
+    after_created_at, after_id = parse_keyset_cursor(cursor)
+    fact_records = await CONTENTS_PAGE.fetch(conn, 'trivia', limit + 1, after_created_at, after_id)
+    fact_records = paginate(fact_records, limit, response)
 
-    return facts
+
+    return await HydrationService(conn).hydrate(fact_records)
 
 
 @router.post("/facts", response_model=content_schema.Trivia, status_code=status.HTTP_201_CREATED)
@@ -321,15 +349,15 @@ async def create_fact(
             fact_in.title, fact_in.content, fact_in.explanation, current_user.id
         )
         
-        tags_list = []
-        if fact_in.tags:
-            for tag_name in fact_in.tags:
-                tag_record = await conn.fetchrow("SELECT id, name FROM tags WHERE name = $1", tag_name)
-                if not tag_record:
-                    tag_record = await conn.fetchrow("INSERT INTO tags (name) VALUES ($1) RETURNING id, name", tag_name)
-                await conn.execute("INSERT INTO content_tags (content_id, tag_id) VALUES ($1, $2)", new_fact_record['id'], tag_record['id'])
-                tags_list.append(dict(tag_record))
+        # タグは件数に関係なく1回のクエリで登録する
+        tags_list = await ContentWriteService(conn).insert_tags(new_fact_record['id'], fact_in.tags or [])
+
+        await LearningStatsService(conn).add_post(current_user.id, new_fact_record['created_at'])
 
+    await invalidate_public_feed()
+    get_feed_candidate_pool().add_content(
+        new_fact_record['id'], new_fact_record['created_at'], [t['id'] for t in tags_list]
+    )
     return {**dict(new_fact_record), "tags": tags_list}
 
 
@@ -338,13 +366,12 @@ async def read_fact(fact_id: uuid.UUID, conn: asyncpg.Connection = Depends(deps.
     """
     指定されたIDの豆知識を一件取得します。
     """
-    fact_record = await conn.fetchrow("SELECT * FROM contents WHERE id = $1 AND content_type = 'trivia'", fact_id)
-    if not fact_record:
+    fact = await get_cache().get_or_load(
+        fact_details_key(fact_id), lambda: _load_fact_details(conn, fact_id), tags=[content_tag(fact_id)]
+    )
+    if fact is None:
         raise HTTPException(status_code=404, detail="Fact not found")
-
-    tags = await conn.fetch("SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", fact_id)
-    
-    return {**dict(fact_record), "tags": [dict(t) for t in tags]}
+    return fact
 
 
 @router.put("/facts/{fact_id}", response_model=content_schema.Trivia)
@@ -358,10 +385,7 @@ async def update_fact(
     既存の豆知識を更新します。（要認証・作成者のみ）
     """
     # 1. ユーザーが豆知識の作成者であることを確認
-    author_id = await conn.fetchval(
-        "SELECT author_id FROM contents WHERE id = $1 AND content_type = 'trivia'",
-        fact_id
-    )
+    author_id = await CONTENT_AUTHOR.fetchval(conn, fact_id, 'trivia')
     if not author_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fact not found")
     if author_id != current_user.id:
@@ -377,28 +401,22 @@ async def update_fact(
         tags = update_data.pop('tags', None)
 
         if update_data:
-            set_clause = ", ".join([f"{key} = ${i+1}" for i, key in enumerate(update_data.keys())])
-            values = list(update_data.values())
-            values.append(fact_id)
-            
-            await conn.execute(
-                f"UPDATE contents SET {set_clause}, updated_at = NOW() WHERE id = ${len(values)}",
-                *values
-            )
+            # 指定された項目のみを更新する (SQL文は常に同じため、プリペアドステートメントを再利用できる)
+            await UPDATE_CONTENT.execute(conn, fact_id, *partial_update_args(update_data, UPDATE_CONTENT_FIELDS))
 
         # 4. タグを更新 (指定があった場合のみ)
         if tags is not None:
-            await conn.execute("DELETE FROM content_tags WHERE content_id = $1", fact_id)
-            for tag_name in tags:
-                tag_record = await conn.fetchrow("SELECT id FROM tags WHERE name = $1", tag_name)
-                if not tag_record:
-                    tag_record = await conn.fetchrow("INSERT INTO tags (name) VALUES ($1) RETURNING id", tag_name)
-                await conn.execute("INSERT INTO content_tags (content_id, tag_id) VALUES ($1, $2)", fact_id, tag_record['id'])
-
-    # 5. 更新後の豆知識データを取得して返す
-    fact_record = await conn.fetchrow("SELECT * FROM contents WHERE id = $1", fact_id)
-    tags_records = await conn.fetch("SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", fact_id)
-    return {**dict(fact_record), "tags": [dict(t) for t in tags_records]}
+            tags_list = await ContentWriteService(conn).replace_tags(fact_id, tags)
+    await invalidate_public_feed()
+    if tags is not None:
+        get_feed_candidate_pool().update_content_tags(fact_id, [t['id'] for t in tags_list])
+    await get_cache().invalidate_tags(content_tag(fact_id))
+
+    # 5. 更新後の豆知識データを取得して返す (キャッシュを経由せず、DBから直接読む)
+    fact = await _load_fact_details(conn, fact_id)
+    if fact is None:
+        raise HTTPException(status_code=404, detail="Fact not found")
+    return fact
 
 
 @router.delete("/facts/{fact_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -411,10 +429,7 @@ async def delete_fact(
     豆知識を削除します。（要認証・作成者のみ）
     """
     # 1. ユーザーが豆知識の作成者であることを確認
-    author_id = await conn.fetchval(
-        "SELECT author_id FROM contents WHERE id = $1 AND content_type = 'trivia'",
-        fact_id
-    )
+    author_id = await CONTENT_AUTHOR.fetchval(conn, fact_id, 'trivia')
     if not author_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fact not found")
     if author_id != current_user.id:
@@ -423,8 +438,14 @@ async def delete_fact(
             detail="You do not have permission to modify this fact"
         )
     
-    # 2. 削除を実行
-    await conn.execute("DELETE FROM contents WHERE id = $1", fact_id)
+    # 2. 削除を実行 (学習統計と日別活動数の投稿数も同じトランザクションで減らす)
+    async with conn.transaction():
+        await LearningStatsService(conn).subtract_content(fact_id)
+        await ActivityRollupService(conn).subtract_content(fact_id)
+        await conn.execute("DELETE FROM contents WHERE id = $1", fact_id)
+    await invalidate_public_feed()
+    get_feed_candidate_pool().remove_content(fact_id)
+    await get_cache().invalidate_tags(content_tag(fact_id))
     
     return
 
@@ -435,31 +456,59 @@ async def delete_fact(
 
 @router.get("/feed", response_model=List[content_schema.Quiz | content_schema.Trivia])
 async def get_feed(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    current_user: user_schema.User = Depends(deps.get_current_user)
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
     おすすめのフィードを取得します。（要認証）
-    NOTE: 現在は単純に新しい順で返しますが、将来的にはservices/feed_service.pyでスコアリングロジックを実装します。
-    """
-    feed_records = await conn.fetch(
-        "SELECT * FROM contents WHERE is_published = TRUE ORDER BY created_at DESC LIMIT 50"
+    services/feed_candidates.py のスコアリング（反応数・新規投稿・自身のいいね・試験範囲）順に返し、
+    直近の投稿を読み終えた後はそれ以前の投稿を新しい順で続けます。
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
+    """
+    # スコアは変動するため、スコア順の候補の位置は先頭からの件数で表し、
+    # 候補期間より前の投稿の位置は最後に返した行の (created_at, id) で表す (読み始める前は null)
+    ranked_offset, after_created_at, after_id = (
+        decode_cursor(cursor, (int, datetime, uuid.UUID)) if cursor else (0, None, None)
     )
-    
-    feed = []
-    for record in feed_records:
-        options = []
-        if record['content_type'] == 'quiz':
-            options = await conn.fetch("SELECT * FROM quiz_options WHERE content_id = $1 ORDER BY display_order", record['id'])
-            options = [dict(o) for o in options]
-        
-        tags = await conn.fetch("SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1", record['id'])
-        tags = [dict(t) for t in tags]
-        
-        item = {**dict(record), "tags": tags}
-        if options:
-            item["options"] = options
-        feed.append(item)
+    if ranked_offset is None or ranked_offset < 0 or (after_created_at is None) != (after_id is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    older_after = (after_created_at, after_id) if after_created_at is not None else None
+
+    feed_records, next_position = await FeedService(conn).get_feed_page(
+        current_user.id, limit, ranked_offset, older_after
+    )
+    if next_position is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_position)
+
+    return await HydrationService(conn).hydrate(feed_records)
+
 
-    return feed
+# ---------------------------------------------------------------------------
+# トレンド (Trending) API
+# ---------------------------------------------------------------------------
+
+@router.get("/trending", response_model=List[content_schema.TrendingQuiz | content_schema.TrendingTrivia])
+async def get_trending(
+    conn: asyncpg.Connection = Depends(deps.get_db),
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    team_id: Optional[uuid.UUID] = Query(None, description="指定した場合は、そのチームのメンバーの投稿に絞る"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    直近の反応・解答が多いコンテンツを、指数減衰付きのスコア順に取得します。（要認証）
+    チームを指定する場合は、そのチームのメンバーまたは作成者である必要があります。
+    """
+    if team_id is not None:
+        is_member = await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM team_members WHERE team_id = $1 AND user_id = $2) "
+            "OR EXISTS (SELECT 1 FROM teams WHERE id = $1 AND created_by = $2)",
+            team_id, current_user.id
+        )
+        if not is_member:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this team")
 
+    trending_records = await TrendingService(conn).top(limit, team_id=team_id)
+    return await HydrationService(conn).hydrate(trending_records)
@@ -4,17 +4,34 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from api.v1 import deps
+from core.singleflight import SingleFlight
 from schemas import curriculum as curriculum_schema
 from schemas import user as user_schema
+from services.feed_candidates import get_feed_candidate_pool
+from services.queries import UPDATE_STUDY_SETTING, UPDATE_STUDY_SETTING_FIELDS, partial_update_args
 # teams.py から get_current_teacher と _verify_team_owner をインポートします
 from api.v1.endpoints.teams import get_current_teacher, _verify_team_owner
 
 router = APIRouter()
 
 
+# 同じ設定の同時の読み込みを1回にまとめる
+_study_setting_flight: SingleFlight[dict] = SingleFlight()
+
+
 async def _get_study_setting_details(conn: asyncpg.Connection, setting_id: uuid.UUID) -> dict:
     """
     ヘルパー関数：単一のStudySettingとその関連タグを取得する
+    同じ設定を同時に読み込むリクエストがある場合は、その結果を共有する
+    """
+    return await _study_setting_flight.do(
+        setting_id, lambda: _load_study_setting_details(conn, setting_id)
+    )
+
+
+async def _load_study_setting_details(conn: asyncpg.Connection, setting_id: uuid.UUID) -> dict:
+    """
+    ヘルパー関数：単一のStudySettingとその関連タグをDBから読み込む
     """
     setting_record = await conn.fetchrow(
         "SELECT * FROM study_settings WHERE id = $1", setting_id
@@ -115,6 +132,8 @@ async def create_study_setting(
             if tag_record:
                 tags_list.append(tag_record)
 
+    # おすすめフィードの試験範囲ボーナスを読み込み直す
+    get_feed_candidate_pool().invalidate_team(setting_in.team_id)
     return {**new_setting_record, "tags": tags_list}
 
 
@@ -152,13 +171,9 @@ async def update_study_setting(
         tag_ids = update_data.pop('tag_ids', None)
 
         if update_data: # 更新するフィールドが何かあれば
-            set_clause = ", ".join([f"{key} = ${i+1}" for i, key in enumerate(update_data.keys())])
-            values = list(update_data.values())
-            values.append(setting_id)
-            
-            await conn.execute(
-                f"UPDATE study_settings SET {set_clause}, updated_at = NOW() WHERE id = ${len(values)}",
-                *values
+            # 指定された項目のみを更新する (SQL文は常に同じため、プリペアドステートメントを再利用できる)
+            await UPDATE_STUDY_SETTING.execute(
+                conn, setting_id, *partial_update_args(update_data, UPDATE_STUDY_SETTING_FIELDS)
             )
 
         # 4. タグの関連付けを更新 (指定があった場合のみ)
@@ -172,8 +187,12 @@ async def update_study_setting(
                     setting_id, tag_id
                 )
 
+    # おすすめフィードの試験範囲ボーナスを読み込み直す
+    get_feed_candidate_pool().invalidate_team(setting['team_id'])
+
     # 5. 更新後の完全なデータを取得して返す
-    updated_setting_details = await _get_study_setting_details(conn, setting_id)
+    #    (更新前に始まった読み込みの結果を共有しないよう、直接読み込む)
+    updated_setting_details = await _load_study_setting_details(conn, setting_id)
     return updated_setting_details
 
 
@@ -193,7 +212,7 @@ async def delete_study_setting(
     # 1. 設定が存在し、かつ教師がオーナーであるか確認
     setting = await conn.fetchrow(
         """
-        SELECT ss.id FROM study_settings ss
+        SELECT ss.id, ss.team_id FROM study_settings ss
         JOIN teams t ON ss.team_id = t.id
         WHERE ss.id = $1 AND t.created_by = $2
         """,
@@ -207,4 +226,6 @@ async def delete_study_setting(
         await conn.execute("DELETE FROM study_setting_tags WHERE study_setting_id = $1", setting_id)
         await conn.execute("DELETE FROM study_settings WHERE id = $1", setting_id)
 
+    # おすすめフィードの試験範囲ボーナスを読み込み直す
+    get_feed_candidate_pool().invalidate_team(setting['team_id'])
     return
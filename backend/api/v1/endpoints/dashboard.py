@@ -1,13 +1,19 @@
 import uuid
 import asyncpg
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from api.v1 import deps
 from schemas import dashboard as dashboard_schema
 from schemas import user as user_schema
 # teams.py から get_current_teacher をインポートします
 from api.v1.endpoints.teams import get_current_teacher
+from services.activity_rollup import ActivityRollupService
+from services.learning_stats import LearningStatsService, accuracy
+from services.queries import PENDING_REPORTS_COUNT
+
+# 活動推移として取得できる最大日数
+MAX_ACTIVITY_DAYS = 366
 
 router = APIRouter()
 
@@ -58,21 +64,16 @@ async def get_dashboard_summary(
             "pending_reports_count": 0
         }
 
-    # 2. 各統計値を並行して集計
-    total_answered_fut = conn.fetchval("SELECT COUNT(*) FROM user_answers WHERE user_id = ANY($1)", student_ids)
-    correct_answers_fut = conn.fetchval("SELECT COUNT(*) FROM user_answers WHERE user_id = ANY($1) AND is_correct = TRUE", student_ids)
-    posts_created_fut = conn.fetchval("SELECT COUNT(*) FROM contents WHERE author_id = ANY($1)", student_ids)
-    pending_reports_fut = conn.fetchval("SELECT COUNT(*) FROM reports WHERE reporter_id = ANY($1) AND status = 'pending'", student_ids)
+    # 2. 各統計値を集計 (解答数・投稿数は生徒ごとの学習統計を主キーで取得して合算する)
+    stats_by_student = await LearningStatsService(conn).get_many(student_ids)
+    pending_reports_count = await PENDING_REPORTS_COUNT.fetchval(conn, student_ids) or 0
 
-    total_quizzes_answered = await total_answered_fut or 0
-    correct_answers = await correct_answers_fut or 0
-    total_posts_created = await posts_created_fut or 0
-    pending_reports_count = await pending_reports_fut or 0
+    total_quizzes_answered = sum(s['answers_count'] for s in stats_by_student.values())
+    correct_answers = sum(s['correct_answers_count'] for s in stats_by_student.values())
+    total_posts_created = sum(s['posts_count'] for s in stats_by_student.values())
 
     # 3. 正答率を計算
-    overall_accuracy = 0.0
-    if total_quizzes_answered > 0:
-        overall_accuracy = round((correct_answers / total_quizzes_answered) * 100, 2)
+    overall_accuracy = accuracy(correct_answers, total_quizzes_answered)
 
     return {
         "total_students": total_students,
@@ -140,10 +141,10 @@ async def get_weekly_activity(
     conn: asyncpg.Connection = Depends(deps.get_db),
     current_teacher: user_schema.User = Depends(get_current_teacher),
     team_id: Optional[uuid.UUID] = None,
-    days: int = 7  # デフォルトで7日分
+    days: int = Query(7, ge=1, le=MAX_ACTIVITY_DAYS)  # デフォルトで7日分 (30日・90日なども指定可能)
 ):
     """
-    自身が管理するチームの生徒の週間活動推移（投稿数・解答数）を取得します。（教師権限が必要）
+    自身が管理するチームの生徒の活動推移（投稿数・解答数）を日別に取得します。（教師権限が必要）
     """
 
     # 1. 対象となる生徒のIDリストを取得
@@ -172,36 +173,6 @@ async def get_weekly_activity(
         # 生徒がいない場合は空の配列を返す
         return []
 
-    # 2. 過去N日間の投稿数と解答数を集計
-    query = """
-        WITH date_series AS (
-            SELECT (CURRENT_DATE - generate_series(0, $1 - 1))::date AS date
-        ),
-        daily_posts AS (
-            SELECT DATE(created_at) AS date, COUNT(*) AS posts
-            FROM contents
-            WHERE author_id = ANY($2)
-              AND created_at >= CURRENT_DATE - INTERVAL '1 day' * $1
-            GROUP BY DATE(created_at)
-        ),
-        daily_answers AS (
-            SELECT DATE(answered_at) AS date, COUNT(*) AS answers
-            FROM user_answers
-            WHERE user_id = ANY($2)
-              AND answered_at >= CURRENT_DATE - INTERVAL '1 day' * $1
-            GROUP BY DATE(answered_at)
-        )
-        SELECT
-            ds.date::text AS date,
-            COALESCE(dp.posts, 0) AS posts,
-            COALESCE(da.answers, 0) AS answers
-        FROM date_series ds
-        LEFT JOIN daily_posts dp ON ds.date = dp.date
-        LEFT JOIN daily_answers da ON ds.date = da.date
-        ORDER BY ds.date ASC
-    """
-
-    activity_records = await conn.fetch(query, days, student_ids)
-
-    return [dict(record) for record in activity_records]
+    # 2. 過去N日間の投稿数と解答数を、日別のロールアップ (user_daily_activity) から取得
+    return await ActivityRollupService(conn).get_daily_activity(student_ids, days)
 
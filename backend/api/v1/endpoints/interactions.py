@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 from api.v1 import deps
 from schemas import user as user_schema
+from services.engagement import EngagementService, publish_interaction_change
 
 router = APIRouter()
 
@@ -33,14 +34,9 @@ async def like_content(
     await _check_content_exists(conn, content_id)
 
     # ON CONFLICT DO NOTHING を使い、ユニーク制約違反（既にいいね済み）の場合はエラーにせず無視する
-    await conn.execute(
-        """
-        INSERT INTO interactions (user_id, content_id, interaction_type)
-        VALUES ($1, $2, 'like')
-        ON CONFLICT (user_id, content_id, interaction_type) DO NOTHING
-        """,
-        current_user.id, content_id
-    )
+    # (新規に登録された場合のみ、同じ文で反応数のカウンターを増やす)
+    if await EngagementService(conn).add(current_user.id, content_id, 'like'):
+        await publish_interaction_change(content_id, 'like', 1)
     return
 
 
@@ -57,10 +53,8 @@ async def unlike_content(
     """
     指定されたコンテンツの「いいね」を取り消します。（要認証）
     """
-    await conn.execute(
-        "DELETE FROM interactions WHERE user_id = $1 AND content_id = $2 AND interaction_type = 'like'",
-        current_user.id, content_id
-    )
+    if await EngagementService(conn).remove(current_user.id, content_id, 'like'):
+        await publish_interaction_change(content_id, 'like', -1)
     return
 
 
@@ -79,14 +73,8 @@ async def save_content(
     """
     await _check_content_exists(conn, content_id)
 
-    await conn.execute(
-        """
-        INSERT INTO interactions (user_id, content_id, interaction_type)
-        VALUES ($1, $2, 'save')
-        ON CONFLICT (user_id, content_id, interaction_type) DO NOTHING
-        """,
-        current_user.id, content_id
-    )
+    if await EngagementService(conn).add(current_user.id, content_id, 'save'):
+        await publish_interaction_change(content_id, 'save', 1)
     return
 
 
@@ -103,10 +91,8 @@ async def unsave_content(
     """
     指定されたコンテンツの保存（ブックマーク）を取り消します。（要認証）
     """
-    await conn.execute(
-        "DELETE FROM interactions WHERE user_id = $1 AND content_id = $2 AND interaction_type = 'save'",
-        current_user.id, content_id
-    )
+    if await EngagementService(conn).remove(current_user.id, content_id, 'save'):
+        await publish_interaction_change(content_id, 'save', -1)
     return
 
 @router.post(
@@ -127,14 +113,8 @@ async def share_content(
     
     # 共有は一度きりではなく、実行されるたびに記録する（あるいはユニーク制約で一度にする）
     # ここでは「いいね」などと仕様を合わせ、ユニーク制約を想定
-    await conn.execute(
-        """
-        INSERT INTO interactions (user_id, content_id, interaction_type)
-        VALUES ($1, $2, 'share')
-        ON CONFLICT (user_id, content_id, interaction_type) DO NOTHING
-        """,
-        current_user.id, content_id
-    )
+    if await EngagementService(conn).add(current_user.id, content_id, 'share'):
+        await publish_interaction_change(content_id, 'share', 1)
     
     # TODO: 共有処理が重い場合（例: 外部API呼び出し）は、
     # この処理をバックグラウンドタスク（非同期）で実行することを推奨
@@ -8,6 +8,7 @@ from schemas import report as report_schema
 from schemas import user as user_schema
 # teams.py から get_current_teacher をインポートします
 from api.v1.endpoints.teams import get_current_teacher
+from services.queries import TEAM_PENDING_REPORTS
 
 router = APIRouter()
 
@@ -96,21 +97,7 @@ async def get_reports(
     if not team_ids:
         return []
 
-    report_records = await conn.fetch(
-        """
-        SELECT
-            r.*,
-            u.nickname AS reporter_nickname,
-            c.title AS content_title
-        FROM reports r
-        JOIN users u ON r.reporter_id = u.id
-        JOIN contents c ON r.content_id = c.id
-        JOIN team_members tm ON u.id = tm.user_id
-        WHERE tm.team_id = ANY($1) AND r.status = 'pending'
-        ORDER BY r.created_at ASC
-        """,
-        team_ids
-    )
+    report_records = await TEAM_PENDING_REPORTS.fetch(conn, team_ids)
     
     return [dict(r) for r in report_records]
 
@@ -9,6 +9,7 @@ from schemas import content as content_schema
 # teams.py から get_current_teacher をインポートします
 # (将来的には deps.py に移すのが望ましいです)
 from api.v1.endpoints.teams import get_current_teacher
+from services.learning_stats import LearningStatsService, accuracy
 
 router = APIRouter()
 
@@ -50,24 +51,14 @@ async def get_student_details(
             detail="Student not found or you do not have permission to view this student"
         )
 
-    # 2. 学習統計を取得 (users.py の /me/statistics と同様のロジック)
-    total_answered_fut = conn.fetchval("SELECT COUNT(*) FROM user_answers WHERE user_id = $1", student_id)
-    correct_answers_fut = conn.fetchval("SELECT COUNT(*) FROM user_answers WHERE user_id = $1 AND is_correct = TRUE", student_id)
-    posts_created_fut = conn.fetchval("SELECT COUNT(*) FROM contents WHERE author_id = $1", student_id)
-
-    total_answered = await total_answered_fut or 0
-    correct_answers = await correct_answers_fut or 0
-    posts_created = await posts_created_fut or 0
-
-    accuracy = 0.0
-    if total_answered > 0:
-        accuracy = round((correct_answers / total_answered) * 100, 2)
+    # 2. 学習統計を取得 (users.py の /me/statistics と同様に、ロールアップテーブルを主キーで参照)
+    learning_stats = await LearningStatsService(conn).get(student_id)
 
     stats = {
-        "total_quizzes_answered": total_answered,
-        "correct_answers": correct_answers,
-        "accuracy": accuracy,
-        "posts_created": posts_created,
+        "total_quizzes_answered": learning_stats['answers_count'],
+        "correct_answers": learning_stats['correct_answers_count'],
+        "accuracy": accuracy(learning_stats['correct_answers_count'], learning_stats['answers_count']),
+        "posts_created": learning_stats['posts_count'],
     }
 
     # 3. 投稿履歴を取得 (直近10件)
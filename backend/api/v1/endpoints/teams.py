@@ -6,8 +6,11 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from api.v1 import deps
+from core.cache import get_cache
+from core.cache.tags import team_key, team_tag
 from schemas import team as team_schema
 from schemas import user as user_schema
+from services.queries import USER_TEAM
 
 router = APIRouter()
 
@@ -42,9 +45,14 @@ async def _verify_team_owner(
     """
     # ★★★ 修正 ★★★: 'SELECT id, created_by' から 'SELECT *' に変更
     # これにより、id, created_by だけでなく、name, join_code なども取得される
-    team = await conn.fetchrow(
-        "SELECT * FROM teams WHERE id = $1", team_id
-    )
+    # チーム情報は共有キャッシュを経由して取得する（参加コードの再生成時に破棄される）
+    async def load():
+        team_record = await conn.fetchrow(
+            "SELECT * FROM teams WHERE id = $1", team_id
+        )
+        return dict(team_record) if team_record else None
+
+    team = await get_cache().get_or_load(team_key(team_id), load, tags=[team_tag(team_id)])
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
     if team['created_by'] != teacher.id:
@@ -75,9 +83,7 @@ async def join_team(
     if current_user.role != 'student':
          raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students can join teams")
 
-    existing_membership = await conn.fetchrow(
-        "SELECT team_id FROM team_members WHERE user_id = $1", current_user.id
-    )
+    existing_membership = await USER_TEAM.fetchrow(conn, current_user.id)
     if existing_membership:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is already in a team")
 
@@ -270,6 +276,7 @@ async def regenerate_join_code(
         """,
         new_join_code, team_id
     )
+    await get_cache().invalidate_tags(team_tag(team_id))
     
     # ★★★ 修正 ★★★
     # asyncpg.Record を dict に変換
@@ -293,63 +300,25 @@ async def get_team_members_with_learning_summary(
     # 1. 教師がチームのオーナーであることを確認 (team_record が返ってくる)
     team_record = await _verify_team_owner(team_id, conn, current_teacher)
 
-    # 2. 非常に複雑な集計クエリ
-    #    Common Table Expressions (WITH句) を使い、複数の集計を事前に行う
+    # 2. メンバーと学習統計を取得
+    #    投稿数・解答数・最終活動日時は user_learning_stats に増分で保持されているため、
+    #    メンバーごとに主キーで結合するだけで集計は行わない
     query = """
-    WITH team_members AS (
-        -- 1. このチームのメンバーリストを取得
-        SELECT u.id, u.nickname, u.email, tm.joined_at
-        FROM users u
-        JOIN team_members tm ON u.id = tm.user_id
-        WHERE tm.team_id = $1 AND u.role = 'student'
-    ),
-    posts AS (
-        -- 2. メンバーの投稿数を集計
-        SELECT author_id, COUNT(*) AS posts_count
-        FROM contents
-        WHERE author_id = ANY(SELECT id FROM team_members)
-        GROUP BY author_id
-    ),
-    answers AS (
-        -- 3. メンバーの解答数と正解数を集計
-        SELECT
-            user_id,
-            COUNT(*) AS answers_count,
-            COUNT(*) FILTER (WHERE is_correct = TRUE) AS correct_answers_count
-        FROM user_answers
-        WHERE user_id = ANY(SELECT id FROM team_members)
-        GROUP BY user_id
-    ),
-    activity AS (
-        -- 4. メンバーの最終活動日 (投稿 または 解答) を取得
-        SELECT
-            user_id,
-            MAX(action_at) AS last_activity_at
-        FROM (
-            SELECT author_id AS user_id, created_at AS action_at FROM contents WHERE author_id = ANY(SELECT id FROM team_members)
-            UNION ALL
-            SELECT user_id, answered_at AS action_at FROM user_answers WHERE user_id = ANY(SELECT id FROM team_members)
-        ) AS all_actions
-        GROUP BY user_id
-    )
-    -- 5. すべてのデータを結合して最終的なメンバーリストを生成
     SELECT
-        tm.id AS user_id,
-        tm.nickname,
-        tm.email,
+        u.id AS user_id,
+        u.nickname,
+        u.email,
         tm.joined_at,
-        COALESCE(p.posts_count, 0) AS posts_count,
-        COALESCE(a.answers_count, 0) AS answers_count,
-        COALESCE(a.correct_answers_count, 0) AS correct_answers_count,
-        act.last_activity_at,
-        (act.last_activity_at > NOW() - INTERVAL '7 days') AS is_active
-    FROM
-        team_members tm
-    LEFT JOIN posts p ON tm.id = p.author_id
-    LEFT JOIN answers a ON tm.id = a.user_id
-    LEFT JOIN activity act ON tm.id = act.user_id
-    ORDER BY
-        tm.nickname;
+        COALESCE(s.posts_count, 0) AS posts_count,
+        COALESCE(s.answers_count, 0) AS answers_count,
+        COALESCE(s.correct_answers_count, 0) AS correct_answers_count,
+        s.last_activity_at,
+        (s.last_activity_at > NOW() - INTERVAL '7 days') AS is_active
+    FROM users u
+    JOIN team_members tm ON u.id = tm.user_id
+    LEFT JOIN user_learning_stats s ON s.user_id = u.id
+    WHERE tm.team_id = $1 AND u.role = 'student'
+    ORDER BY u.nickname;
     """
     
     member_records = await conn.fetch(query, team_id)
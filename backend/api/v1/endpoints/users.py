@@ -1,71 +1,78 @@
-from typing import List, Union
+from typing import List, Optional, Union
 import asyncpg
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from api.v1 import deps
+from core.pagination import MAX_PAGE_SIZE, paginate, parse_keyset_cursor
 from schemas import user as user_schema
 from schemas import content as content_schema
+from services.hydration import HydrationService
+from services.learning_stats import LearningStatsService, accuracy
+from services.queries import USER_ANSWERS_PAGE, USER_INTERACTIONS_PAGE, USER_POSTS_PAGE
 
 router = APIRouter()
 
+# 履歴一覧のデフォルトの取得件数
+HISTORY_PAGE_SIZE = 50
+
 
 @router.get("/me/posts", response_model=List[content_schema.ContentInfo], summary="自身の投稿履歴を取得する")
 async def read_my_posts(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    current_user: user_schema.User = Depends(deps.get_current_user)
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    自身が作成したコンテンツ（クイズと豆知識）の一覧を取得します。（要認証）
+    自身が作成したコンテンツ（クイズと豆知識）の一覧を新しい順に取得します。（要認証）
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
     """
-    posts_records = await conn.fetch(
-        "SELECT id, content_type, title, created_at FROM contents WHERE author_id = $1 ORDER BY created_at DESC",
-        current_user.id
-    )
+    after_created_at, after_id = parse_keyset_cursor(cursor)
+    posts_records = await USER_POSTS_PAGE.fetch(conn, current_user.id, limit + 1, after_created_at, after_id)
     
     # ★★★ 修正 ★★★: Recordのリストをdictのリストに変換
-    return [dict(p) for p in posts_records]
+    return [dict(p) for p in paginate(posts_records, limit, response)]
 
 
 @router.get("/me/answers", response_model=List[content_schema.UserAnswer], summary="自身の解答履歴を取得する")
 async def read_my_answers(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    current_user: user_schema.User = Depends(deps.get_current_user)
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    自身のすべてのクイズ解答履歴を取得します。（要認証）
+    自身のクイズ解答履歴を新しい順に取得します。（要認証）
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
     """
-    answer_records = await conn.fetch(
-        """
-        SELECT ua.id, ua.content_id, c.title as quiz_title, ua.selected_option_id, ua.is_correct, ua.answered_at
-        FROM user_answers ua
-        JOIN contents c ON ua.content_id = c.id
-        WHERE ua.user_id = $1
-        ORDER BY ua.answered_at DESC
-        """,
-        current_user.id
+    after_answered_at, after_id = parse_keyset_cursor(cursor)
+    answer_records = await USER_ANSWERS_PAGE.fetch(
+        conn, current_user.id, limit + 1, after_answered_at, after_id
     )
     
     # ★★★ 修正 ★★★: Recordのリストをdictのリストに変換
-    return [dict(r) for r in answer_records]
+    return [dict(r) for r in paginate(answer_records, limit, response, created_at_key="answered_at")]
 
 
 @router.get("/me/likes", response_model=List[content_schema.ContentInfo], summary="「いいね」したコンテンツ一覧を取得する")
 async def read_my_liked_contents(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    current_user: user_schema.User = Depends(deps.get_current_user)
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    自身が「いいね」したコンテンツの一覧を取得します。（要認証）
+    自身が「いいね」したコンテンツの一覧を新しい順に取得します。（要認証）
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
     """
-    liked_records = await conn.fetch(
-        """
-        SELECT c.id, c.content_type, c.title, c.created_at FROM contents c
-        JOIN interactions i ON c.id = i.content_id
-        WHERE i.user_id = $1 AND i.interaction_type = 'like'
-        ORDER BY i.created_at DESC
-        """,
-        current_user.id
+    after_created_at, after_id = parse_keyset_cursor(cursor)
+    liked_records = await USER_INTERACTIONS_PAGE.fetch(
+        conn, current_user.id, limit + 1, after_created_at, after_id, 'like'
     )
+    liked_records = paginate(liked_records, limit, response, created_at_key="interacted_at", id_key="interaction_id")
     
     # ★★★ 修正 ★★★: Recordのリストをdictのリストに変換
     return [dict(c) for c in liked_records]
@@ -73,21 +80,21 @@ async def read_my_liked_contents(
 
 @router.get("/me/bookmarks", response_model=List[content_schema.ContentInfo], summary="保存したコンテンツ一覧を取得する")
 async def read_my_saved_contents(
+    response: Response,
     conn: asyncpg.Connection = Depends(deps.get_db),
-    current_user: user_schema.User = Depends(deps.get_current_user)
+    current_user: user_schema.User = Depends(deps.get_current_user),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="前ページのレスポンスヘッダー X-Next-Cursor の値"),
 ):
     """
-    自身が保存（ブックマーク）したコンテンツの一覧を取得します。（要認証）
+    自身が保存（ブックマーク）したコンテンツの一覧を新しい順に取得します。（要認証）
+    続きがある場合は、次ページのカーソルをレスポンスヘッダー X-Next-Cursor で返します。
     """
-    saved_records = await conn.fetch(
-        """
-        SELECT c.id, c.content_type, c.title, c.created_at FROM contents c
-        JOIN interactions i ON c.id = i.content_id
-        WHERE i.user_id = $1 AND i.interaction_type = 'save'
-        ORDER BY i.created_at DESC
-        """,
-        current_user.id
+    after_created_at, after_id = parse_keyset_cursor(cursor)
+    saved_records = await USER_INTERACTIONS_PAGE.fetch(
+        conn, current_user.id, limit + 1, after_created_at, after_id, 'save'
     )
+    saved_records = paginate(saved_records, limit, response, created_at_key="interacted_at", id_key="interaction_id")
     
     # ★★★ 修正 ★★★: Recordのリストをdictのリストに変換
     return [dict(c) for c in saved_records]
@@ -101,25 +108,14 @@ async def read_my_stats(
     """
     自身の学習に関する統計情報（解答数、正答率など）を取得します。（要認証）
     """
-    # 各統計値を並行して取得
-    total_answered_fut = conn.fetchval("SELECT COUNT(*) FROM user_answers WHERE user_id = $1", current_user.id)
-    correct_answers_fut = conn.fetchval("SELECT COUNT(*) FROM user_answers WHERE user_id = $1 AND is_correct = TRUE", current_user.id)
-    posts_created_fut = conn.fetchval("SELECT COUNT(*) FROM contents WHERE author_id = $1", current_user.id)
-
-    total_answered = await total_answered_fut
-    correct_answers = await correct_answers_fut
-    posts_created = await posts_created_fut
-
-    # 正答率を計算（ゼロ除算を回避）
-    accuracy = 0.0
-    if total_answered > 0:
-        accuracy = round((correct_answers / total_answered) * 100, 2)
+    # 統計はロールアップテーブルから主キーで取得する
+    stats = await LearningStatsService(conn).get(current_user.id)
 
     return {
-        "total_quizzes_answered": total_answered,
-        "correct_answers": correct_answers,
-        "accuracy": accuracy,
-        "posts_created": posts_created,
+        "total_quizzes_answered": stats['answers_count'],
+        "correct_answers": stats['correct_answers_count'],
+        "accuracy": accuracy(stats['correct_answers_count'], stats['answers_count']),
+        "posts_created": stats['posts_count'],
     }
 
 
@@ -132,56 +128,16 @@ async def read_my_saved_contents_full(
     自身が保存（ブックマーク）したコンテンツの完全な詳細情報を取得します。（要認証）
     クイズの場合は選択肢も含めて返します。
     """
-    # 保存したコンテンツのIDを取得
-    saved_content_ids = await conn.fetch(
+    # 保存したコンテンツを保存日時の新しい順に取得
+    saved_records = await conn.fetch(
         """
-        SELECT content_id FROM interactions
-        WHERE user_id = $1 AND interaction_type = 'save'
-        ORDER BY created_at DESC
+        SELECT c.* FROM interactions i
+        JOIN contents c ON c.id = i.content_id
+        WHERE i.user_id = $1 AND i.interaction_type = 'save'
+        ORDER BY i.created_at DESC
         """,
         current_user.id
     )
 
-    result = []
-    for record in saved_content_ids:
-        content_id = record['content_id']
-
-        # コンテンツの基本情報を取得
-        content_record = await conn.fetchrow(
-            "SELECT * FROM contents WHERE id = $1",
-            content_id
-        )
-
-        if not content_record:
-            continue
-
-        content_dict = dict(content_record)
-
-        # タグを取得
-        tag_records = await conn.fetch(
-            """
-            SELECT t.name FROM tags t
-            JOIN content_tags ct ON t.id = ct.tag_id
-            WHERE ct.content_id = $1
-            """,
-            content_id
-        )
-        content_dict['tags'] = [{'name': tag['name']} for tag in tag_records]
-
-        # クイズの場合は選択肢も取得
-        if content_dict['content_type'] == 'quiz':
-            options_records = await conn.fetch(
-                """
-                SELECT id, option_text, is_correct, display_order
-                FROM quiz_options
-                WHERE content_id = $1
-                ORDER BY display_order
-                """,
-                content_id
-            )
-            content_dict['options'] = [dict(opt) for opt in options_records]
-
-        result.append(content_dict)
-
-    return result
-
+    # タグと（クイズの場合は）選択肢を一括で取得
+    return await HydrationService(conn).hydrate(saved_records)
@@ -0,0 +1,63 @@
+"""
+アプリケーション共通のキャッシュ。
+
+設定 CACHE_BACKEND で実装を切り替えます。
+    - "memory": プロセス内のLRUキャッシュ (MemoryCache)
+    - "redis":  Redisプロトコルのサーバー (RedisCache)。複数のワーカーでキャッシュと破棄を共有できます
+
+使い方:
+    from core.cache import get_cache
+
+    quiz = await get_cache().get_or_load(f"quiz:{quiz_id}", load_quiz, tags=[f"content:{quiz_id}"])
+    await get_cache().invalidate_tags(f"content:{quiz_id}")
+"""
+from typing import Optional
+
+from core.cache.base import CacheBackend
+from core.cache.memory import MemoryCache
+from core.cache.redis import RedisCache
+from core.config import settings
+
+__all__ = ["CacheBackend", "MemoryCache", "RedisCache", "create_cache", "get_cache", "close_cache"]
+
+_cache: Optional[CacheBackend] = None
+
+
+def create_cache() -> CacheBackend:
+    """
+    設定に従ってキャッシュのバックエンドを作成します。
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(
+            settings.CACHE_REDIS_URL,
+            default_ttl_seconds=settings.CACHE_DEFAULT_TTL_SECONDS,
+            pool_size=settings.CACHE_REDIS_POOL_SIZE,
+            timeout=settings.CACHE_REDIS_TIMEOUT,
+            key_prefix=settings.CACHE_KEY_PREFIX,
+        )
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(
+            max_size=settings.CACHE_MAX_SIZE,
+            default_ttl_seconds=settings.CACHE_DEFAULT_TTL_SECONDS,
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND!r}")
+
+
+def get_cache() -> CacheBackend:
+    """
+    アプリケーション共通のキャッシュを返します。（初回呼び出し時に作成されます）
+    """
+    global _cache
+    if _cache is None:
+        _cache = create_cache()
+    return _cache
+
+
+async def close_cache() -> None:
+    """
+    キャッシュの接続を解放します。（main.py の lifespan から呼び出す）
+    """
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
@@ -0,0 +1,107 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from core.singleflight import SingleFlight
+
+V = TypeVar("V")
+
+
+class CacheBackend(ABC):
+    """
+    キャッシュの共通インターフェース。
+
+    - get / set / delete: キーと値の読み書き（値が None の場合はキャッシュしません）
+    - ttl_seconds: エントリの有効期限（省略時はバックエンドの既定値）
+    - tags: エントリに付けるタグ。invalidate_tags で同じタグのエントリをまとめて破棄できます
+      （破棄するたびにタグの世代番号が進みます）
+    - get_or_load: キャッシュミス時に読み込み関数を実行して保存します。同じキーの読み込みが
+      同時に要求された場合は、最初の1件だけが読み込み関数を実行し、他は同じ結果を待ちます（single-flight）。
+      読み込み中にタグが破棄された場合は、古い可能性がある結果を保存しません
+
+    キャッシュから返される値は他のリクエストと共有される可能性があるため、変更しないでください。
+    """
+
+    def __init__(self, default_ttl_seconds: float):
+        self.default_ttl_seconds = default_ttl_seconds
+        # 同じキーの同時の読み込みを1回にまとめる
+        self._flight: SingleFlight = SingleFlight()
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        キーに対応する値を返します。存在しない・期限切れの場合は None を返します。
+        """
+
+    @abstractmethod
+    async def set(
+        self, key: str, value: Any, ttl_seconds: Optional[float] = None, tags: Sequence[str] = ()
+    ) -> None:
+        """
+        値を保存します。
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """
+        指定したキーを破棄します。
+        """
+
+    @abstractmethod
+    async def invalidate_tags(self, *tags: str) -> None:
+        """
+        指定したタグが付いたエントリをすべて破棄し、タグの世代番号を進めます。
+        """
+
+    @abstractmethod
+    async def get_tag_versions(self, tags: Sequence[str]) -> Optional[List[int]]:
+        """
+        タグごとの世代番号を返します（一度も破棄されていないタグは 0）。取得できない場合は None を返します。
+        """
+
+    async def close(self) -> None:
+        """
+        バックエンドが持つ接続などを解放します。
+        """
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self._flight.calls,
+            "coalesced": self._flight.coalesced,
+            "inflight": self._flight.stats()["inflight"],
+        }
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[V]],
+        ttl_seconds: Optional[float] = None,
+        tags: Sequence[str] = (),
+    ) -> V:
+        """
+        キャッシュから値を取得し、無い場合は loader を実行して結果を保存します。
+
+        :param key: キャッシュのキー
+        :param loader: キャッシュミス時に値を読み込む関数（例外はそのまま呼び出し元に送出されます）
+        :param ttl_seconds: 有効期限
+        :param tags: エントリに付けるタグ
+        :return: キャッシュした値、または loader の結果
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        async def load() -> V:
+            # 読み込みの前にタグの世代番号を記録し、読み込み中に破棄された場合は保存しない
+            versions = await self.get_tag_versions(tags) if tags else []
+            loaded = await loader()
+            if loaded is None or versions is None:
+                return loaded
+            if tags and await self.get_tag_versions(tags) != versions:
+                return loaded
+            await self.set(key, loaded, ttl_seconds, tags)
+            # 確認から保存までの間に破棄された場合に備えて、保存後にもう一度確認する
+            if tags and await self.get_tag_versions(tags) != versions:
+                await self.delete(key)
+            return loaded
+
+        return await self._flight.do(key, load)
@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from core.cache.base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """
+    プロセス内の、有効期限・タグ付きLRUキャッシュ。
+    上限件数を超えると最も長く使われていないエントリから削除します。
+    ワーカー（プロセス）ごとに独立しているため、破棄は同じワーカー内にしか伝わりません。
+    """
+
+    def __init__(self, max_size: int, default_ttl_seconds: float):
+        super().__init__(default_ttl_seconds)
+        self.max_size = max_size
+        # キー -> (有効期限, 値, タグ)
+        self._entries: "OrderedDict[str, Tuple[float, Any, FrozenSet[str]]]" = OrderedDict()
+        # タグ -> キーの集合
+        self._keys_by_tag: Dict[str, Set[str]] = defaultdict(set)
+        # タグ -> 世代番号 (破棄されたことのあるタグのみ)
+        self._tag_versions: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(
+        self, key: str, value: Any, ttl_seconds: Optional[float] = None, tags: Sequence[str] = ()
+    ) -> None:
+        if value is None or self.max_size <= 0:
+            return
+        self._remove(key)
+        ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value, frozenset(tags))
+        for tag in tags:
+            self._keys_by_tag[tag].add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._remove(key)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            self._tag_versions[tag] += 1
+            for key in self._keys_by_tag.pop(tag, set()):
+                self._remove(key)
+
+    async def get_tag_versions(self, tags: Sequence[str]) -> Optional[List[int]]:
+        return [self._tag_versions.get(tag, 0) for tag in tags]
+
+    def _remove(self, key: str) -> None:
+        """
+        エントリを削除し、タグの索引からも取り除きます。
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import pickle
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from core.cache.base import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# タグの世代番号のキーを保持する期間 (読み込みにかかる時間より十分に長くする)
+TAG_VERSION_TTL_MS = 24 * 60 * 60 * 1000
+
+
+class RedisError(Exception):
+    """
+    Redisサーバーがエラー応答 (-ERR ...) を返した場合の例外
+    """
+
+
+class _RedisConnection:
+    """
+    Redisプロトコル (RESP2) の最小限のクライアント接続。
+    コマンドは複数まとめて送信し（パイプライン）、応答を順に読み取ります。
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, password: Optional[str], db: int) -> "_RedisConnection":
+        reader, writer = await asyncio.open_connection(host, port)
+        conn = cls(reader, writer)
+        commands: List[Tuple[Any, ...]] = []
+        if password:
+            commands.append(("AUTH", password))
+        if db:
+            commands.append(("SELECT", db))
+        if commands:
+            await conn.execute_many(commands)
+        return conn
+
+    @staticmethod
+    def _encode(command: Sequence[Any]) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if isinstance(arg, bytes):
+                data = arg
+            elif isinstance(arg, str):
+                data = arg.encode("utf-8")
+            else:
+                data = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self.reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            return RedisError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def execute_many(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        複数のコマンドを1回の書き込みで送信し、それぞれの応答を返します。
+        いずれかのコマンドがエラー応答を返した場合は、すべての応答を読み終えてから RedisError を送出します。
+        """
+        self.writer.write(b"".join(self._encode(command) for command in commands))
+        await self.writer.drain()
+        replies = [await self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (OSError, ConnectionError):
+            pass
+
+
+class RedisCache(CacheBackend):
+    """
+    Redisプロトコルのサーバーを使う、ワーカー間で共有されるキャッシュ。
+
+    - 値は pickle でシリアライズします（信頼できるサーバーのみを指定してください）
+    - タグは「タグ -> キーの集合」をRedisのセットとして保持し、破棄時にまとめて DEL します
+    - タグの世代番号は INCR で進め、ワーカー間で共有します
+    - サーバーに接続できない・応答が遅い場合はキャッシュミスとして扱い、リクエストは失敗させません
+    """
+
+    def __init__(
+        self,
+        url: str,
+        default_ttl_seconds: float,
+        pool_size: int = 10,
+        timeout: float = 0.5,
+        key_prefix: str = "",
+    ):
+        super().__init__(default_ttl_seconds)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self._idle: List[_RedisConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}tag:{tag}"
+
+    def _tag_version_key(self, tag: str) -> str:
+        return f"{self.key_prefix}tagver:{tag}"
+
+    async def _execute_many(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        プールの接続でコマンドを実行します。通信エラー・タイムアウトの場合は接続を破棄して例外を送出します。
+        """
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            try:
+                if conn is None:
+                    conn = await asyncio.wait_for(
+                        _RedisConnection.open(self.host, self.port, self.password, self.db), self.timeout
+                    )
+                replies = await asyncio.wait_for(conn.execute_many(commands), self.timeout)
+            except BaseException:
+                # 応答の途中で中断した接続は再利用できないため破棄する
+                if conn is not None:
+                    await conn.close()
+                raise
+            self._idle.append(conn)
+            return replies
+
+    async def _try_execute_many(self, commands: Sequence[Sequence[Any]]) -> Optional[List[Any]]:
+        """
+        _execute_many を実行し、失敗した場合はログを出力して None を返します。
+        """
+        try:
+            return await self._execute_many(commands)
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, RedisError) as e:
+            self.errors += 1
+            logger.warning("Redis cache command failed: %r", e)
+            return None
+
+    async def get(self, key: str) -> Optional[Any]:
+        replies = await self._try_execute_many([("GET", self._key(key))])
+        if not replies or replies[0] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(replies[0])
+
+    async def set(
+        self, key: str, value: Any, ttl_seconds: Optional[float] = None, tags: Sequence[str] = ()
+    ) -> None:
+        if value is None:
+            return
+        ttl_ms = max(1, int((self.default_ttl_seconds if ttl_seconds is None else ttl_seconds) * 1000))
+        redis_key = self._key(key)
+        commands: List[Tuple[Any, ...]] = [
+            ("SET", redis_key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), "PX", ttl_ms)
+        ]
+        for tag in tags:
+            # タグのセットは、最後に追加したエントリと同じ期間だけ保持する
+            commands.append(("SADD", self._tag_key(tag), redis_key))
+            commands.append(("PEXPIRE", self._tag_key(tag), ttl_ms))
+        await self._try_execute_many(commands)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._try_execute_many([("DEL", *[self._key(key) for key in keys])])
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        if not tags:
+            return
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        # 世代番号を進めてからキーの集合を読むため、読み込み中の get_or_load は保存を取りやめるか、
+        # 保存したエントリがここで削除される
+        commands: List[Tuple[Any, ...]] = []
+        for tag in tags:
+            commands.append(("INCR", self._tag_version_key(tag)))
+            commands.append(("PEXPIRE", self._tag_version_key(tag), TAG_VERSION_TTL_MS))
+        commands.extend(("SMEMBERS", tag_key) for tag_key in tag_keys)
+        replies = await self._try_execute_many(commands)
+        if replies is None:
+            return
+        members = replies[2 * len(tags):]
+        keys = {key for tag_members in members for key in (tag_members or [])}
+        await self._try_execute_many([("DEL", *tag_keys, *keys)])
+
+    async def get_tag_versions(self, tags: Sequence[str]) -> Optional[List[int]]:
+        replies = await self._try_execute_many([("MGET", *[self._tag_version_key(tag) for tag in tags])])
+        if replies is None:
+            return None
+        return [int(version) if version is not None else 0 for version in replies[0]]
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*[conn.close() for conn in idle])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "idle_connections": len(self._idle),
+        }
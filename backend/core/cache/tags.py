@@ -0,0 +1,49 @@
+"""
+キャッシュのキーとタグの命名規則。
+エントリを作成する側と破棄する側で同じ関数を使い、名前の不一致による破棄漏れを防ぎます。
+"""
+import uuid
+from typing import Optional
+
+
+def content_tag(content_id: uuid.UUID) -> str:
+    """
+    コンテンツ（クイズ・豆知識）に関するエントリに付けるタグ。
+    詳細・解答キーなどのエントリに付け、コンテンツの更新・削除、反応数の変化時に破棄します。
+    """
+    return f"content:{content_id}"
+
+
+def team_tag(team_id: uuid.UUID) -> str:
+    """
+    チームに関するエントリに付けるタグ。チーム情報の更新時に破棄します。
+    """
+    return f"team:{team_id}"
+
+
+def public_feed_tag() -> str:
+    """
+    公開フィード (/public/feed) のページに付けるタグ。コンテンツの作成・更新・削除時に破棄します。
+    （反応数はページに含めないため、反応の変化では破棄しません）
+    """
+    return "public-feed"
+
+
+def quiz_details_key(quiz_id: uuid.UUID) -> str:
+    return f"quiz-details:{quiz_id}"
+
+
+def fact_details_key(fact_id: uuid.UUID) -> str:
+    return f"fact-details:{fact_id}"
+
+
+def team_key(team_id: uuid.UUID) -> str:
+    return f"team:{team_id}"
+
+
+def public_feed_key(limit: int, cursor: Optional[str]) -> str:
+    return f"public-feed:{limit}:{cursor or ''}"
+
+
+def answer_key_key(content_id: uuid.UUID) -> str:
+    return f"answer-key:{content_id}"
@@ -33,6 +33,106 @@ class Settings(BaseSettings):
             f"{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    # --- コネクションプール設定 ---
+    # アプリケーション起動時に作成し、全リクエストで共有する
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    # プールから接続を取得する際の最大待ち時間（秒）。超過した場合は503を返す
+    DB_POOL_ACQUIRE_TIMEOUT: float = 10.0
+    # 一定時間使われなかった接続をクローズするまでの秒数（0で無効）
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300.0
+    # 接続ごとのプリペアドステートメントキャッシュの上限（0で無効）
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # 全ワーカー合計の接続数の上限（0で無効）。指定した場合、ワーカーごとの上限は
+    # DB_POOL_MAX_SIZE ではなく「この値 / ワーカー数」になる（PostgreSQL の max_connections に合わせる）
+    DB_POOL_TOTAL_MAX_SIZE: int = 0
+
+    # --- サーバー (本番起動モード) 設定 ---
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8080
+    # ワーカープロセス数（0の場合はCPUコア数）
+    SERVER_WORKERS: int = 0
+    # イベントループ ("auto" の場合はインストールされていれば uvloop) と
+    # HTTPパーサー ("auto" の場合はインストールされていれば httptools) の実装
+    SERVER_LOOP: str = "auto"
+    SERVER_HTTP: str = "auto"
+    # SIGTERM を受け取ってから、処理中のリクエストの完了を待つ最大秒数
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # 応答のないワーカーを再起動するまでの秒数
+    SERVER_WORKER_TIMEOUT: int = 60
+    SERVER_KEEPALIVE: int = 5
+
+    # --- 計測 (メトリクス) 設定 ---
+    # 有効にすると、リクエストごとの応答時間・クエリ数などを集計し、/metrics で Prometheus 形式で返す
+    METRICS_ENABLED: bool = True
+
+    # --- 認証済みユーザーのキャッシュ設定 ---
+    # JWTの subject ごとに User を保持し、短時間に繰り返されるユーザー検索を省略する
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # --- クイズの解答キーのキャッシュ設定 ---
+    # クイズIDごとに正解の選択肢・解説・公開状態を共有キャッシュ (core.cache) に保持し、解答時のクエリを省略する。
+    # クイズの更新・削除時にはコンテンツのタグで破棄される
+    ANSWER_KEY_CACHE_TTL_SECONDS: float = 60.0
+
+    # --- 公開フィード (/public/feed) のキャッシュ設定 ---
+    # limit・cursor ごとに反応数を除いたページを共有キャッシュ (core.cache) に保持する。
+    # コンテンツの作成・更新・削除時にはタグで破棄される
+    PUBLIC_FEED_CACHE_TTL_SECONDS: float = 30.0
+
+    # --- おすすめフィードの候補 (services/feed_candidates.py) 設定 ---
+    # 候補とチーム共通のスコアはプロセス内に保持し、このプロセスでの投稿・反応の変更は即座に反映する。
+    # 他のワーカーでの変更を取り込むため、この秒数ごとにDBから読み込み直す
+    FEED_CANDIDATE_TTL_SECONDS: float = 60.0
+
+    # --- トレンド (services/trending.py) 設定 ---
+    # 反応・解答の重みが半分に減衰するまでの秒数。変更した場合は scripts.rebuild_trending で再計算する
+    TRENDING_HALF_LIFE_SECONDS: float = 6 * 3600.0
+
+    # --- 共有キャッシュ (core.cache) 設定 ---
+    # "memory": プロセス内のLRUキャッシュ / "redis": Redisプロトコルのサーバー（ワーカー間で共有される）
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # Redisへの同時接続数の上限
+    CACHE_REDIS_POOL_SIZE: int = 10
+    # Redisへの接続・応答を待つ最大時間（秒）。超過した場合はキャッシュミスとして扱う
+    CACHE_REDIS_TIMEOUT: float = 0.5
+    # 複数のアプリケーションで同じRedisを使う場合のキーの接頭辞
+    CACHE_KEY_PREFIX: str = "reklink:"
+    CACHE_DEFAULT_TTL_SECONDS: float = 60.0
+    # "memory" の場合の最大件数
+    CACHE_MAX_SIZE: int = 10000
+
+    # --- 解答の書き込みバッファ (write-behind) 設定 ---
+    # 有効にすると、解答はメモリ上のキューに積まれ、まとめてCOPYで書き込まれる
+    ANSWER_INGEST_ENABLED: bool = False
+    # 1回の書き込みでまとめる最大件数
+    ANSWER_INGEST_BATCH_SIZE: int = 500
+    # 最初の解答を受け取ってから書き込むまでの最大待ち時間（秒）
+    ANSWER_INGEST_FLUSH_INTERVAL: float = 0.5
+    # キューに積める最大件数。満杯の場合は ANSWER_INGEST_ENQUEUE_TIMEOUT 秒まで待つ
+    ANSWER_INGEST_MAX_QUEUE_SIZE: int = 10000
+    # キューが満杯のまま待ち時間を超えた場合は、その解答をリクエスト内で直接書き込む
+    ANSWER_INGEST_ENQUEUE_TIMEOUT: float = 1.0
+    # 書き込みに失敗した場合に書き込み直す回数と、最初の待ち時間（秒。書き込み直すたびに倍になる）
+    ANSWER_INGEST_MAX_RETRIES: int = 5
+    ANSWER_INGEST_RETRY_BACKOFF: float = 0.5
+
+    # --- 日別活動数のロールアップ (user_daily_activity) 設定 ---
+    # アプリケーション内で定期的に集計を実行するかどうか（cron で scripts.rollup_activity を実行する場合は False）
+    ACTIVITY_ROLLUP_ENABLED: bool = True
+    # 集計の実行間隔（秒）
+    ACTIVITY_ROLLUP_INTERVAL_SECONDS: float = 60.0
+    # 書き込み中のトランザクションや解答の書き込みキューを取りこぼさないよう、
+    # 現在時刻からこの秒数より前の行までを集計する（それ以降の行は参照時に直接集計する）
+    ACTIVITY_ROLLUP_LAG_SECONDS: float = 60.0
+
+    # --- パスワードハッシュ (bcrypt) の実行設定 ---
+    # bcryptの計算はイベントループを止めないよう専用スレッドプールで実行する
+    # 同時に実行するハッシュ計算の上限（0の場合はCPUコア数）
+    PASSWORD_HASH_WORKERS: int = 0
+
     class Config:
         case_sensitive = True
 
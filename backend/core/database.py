@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+
+import asyncpg
+
+from core.config import settings
+from core.instrumentation import InstrumentedConnection
+from core.queries import prepare_registered_queries, registered_query_count
+
+# --- アプリケーション全体で共有するコネクションプール ---
+# main.py の lifespan で作成・クローズされます。
+_pool: Optional[asyncpg.Pool] = None
+
+# プールの飽和状況を把握するためのカウンター
+_stats = {
+    "waiting": 0,           # 接続の取得を待っているリクエスト数
+    "acquired_total": 0,    # 起動以降に取得された接続の累計
+    "acquire_timeouts": 0,  # 取得待ちがタイムアウトした回数
+    "max_wait_seconds": 0.0,  # 取得待ち時間の最大値
+}
+
+
+def pool_size() -> Tuple[int, int]:
+    """
+    このワーカープロセスのコネクションプールの (最小接続数, 最大接続数) を返します。
+    DB_POOL_TOTAL_MAX_SIZE が指定されている場合は、全ワーカーの合計がその値を超えないように分配します。
+    """
+    max_size = settings.DB_POOL_MAX_SIZE
+    if settings.DB_POOL_TOTAL_MAX_SIZE > 0:
+        max_size = max(1, settings.DB_POOL_TOTAL_MAX_SIZE // max(1, settings.SERVER_WORKERS))
+    return min(settings.DB_POOL_MIN_SIZE, max_size), max_size
+
+
+async def init_pool() -> asyncpg.Pool:
+    """
+    設定値に従ってコネクションプールを作成します。
+
+    :return: 作成されたコネクションプール
+    """
+    global _pool
+    if _pool is None:
+        min_size, max_size = pool_size()
+        # 登録済みの文がアドホックなクエリで追い出されないよう、キャッシュには余裕を持たせる
+        statement_cache_size = max(settings.DB_STATEMENT_CACHE_SIZE, registered_query_count() * 2)
+        _pool = await asyncpg.create_pool(
+            settings.DATABASE_URL,
+            min_size=min_size,
+            max_size=max_size,
+            max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+            statement_cache_size=statement_cache_size,
+            # 接続ごとに、登録済みの文 (services/queries.py) を準備しておく
+            init=prepare_registered_queries,
+            # クエリごとの実行時間・行数を計測する (/metrics)
+            connection_class=InstrumentedConnection if settings.METRICS_ENABLED else asyncpg.Connection,
+        )
+    return _pool
+
+
+async def close_pool() -> None:
+    """
+    コネクションプールをクローズします。貸し出し中の接続の返却を待ってから終了します。
+    """
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_pool() -> asyncpg.Pool:
+    """
+    作成済みのコネクションプールを返します。
+    """
+    if _pool is None:
+        raise RuntimeError("Database pool is not initialized")
+    return _pool
+
+
+async def acquire_connection() -> asyncpg.Connection:
+    """
+    プールから接続を取得します。
+    取得待ちが DB_POOL_ACQUIRE_TIMEOUT を超えた場合は asyncio.TimeoutError を送出します。
+    """
+    pool = get_pool()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    _stats["waiting"] += 1
+    try:
+        conn = await pool.acquire(timeout=settings.DB_POOL_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["acquire_timeouts"] += 1
+        raise
+    finally:
+        _stats["waiting"] -= 1
+        _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], loop.time() - started)
+
+    _stats["acquired_total"] += 1
+    return conn
+
+
+async def release_connection(conn: asyncpg.Connection) -> None:
+    """
+    取得した接続をプールへ返却します。
+    """
+    await get_pool().release(conn)
+
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
+    """
+    プールから接続を取得し、ブロックを抜けるとプールへ返却します。
+    """
+    conn = await acquire_connection()
+    try:
+        yield conn
+    finally:
+        await release_connection(conn)
+
+
+def get_pool_stats() -> dict:
+    """
+    コネクションプールの飽和状況（使用中・待機中の接続数など）を返します。
+    """
+    if _pool is None:
+        min_size, max_size = pool_size()
+        return {
+            "min_size": min_size,
+            "max_size": max_size,
+            "size": 0,
+            "idle": 0,
+            "in_use": 0,
+            **_stats,
+        }
+
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    return {
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        **_stats,
+    }
@@ -0,0 +1,232 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+import asyncpg
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import COUNT_BUCKETS, Counter, Gauge, Histogram
+
+# リクエスト外（バックグラウンド処理など）で実行されたクエリの route ラベル
+NO_ROUTE = "-"
+# どのルートにも一致しなかったリクエストの route ラベル
+UNMATCHED_ROUTE = "unmatched"
+
+# --- HTTP リクエスト ---
+HTTP_REQUESTS = Counter(
+    "reklink_http_requests_total", "HTTP requests processed.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "reklink_http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "reklink_http_requests_in_flight", "HTTP requests currently being processed.", ("method", "route")
+)
+
+# --- データベース ---
+DB_QUERY_DURATION = Histogram(
+    "reklink_db_query_duration_seconds", "Database round trip latency.", ("route",)
+)
+DB_ROWS = Counter(
+    "reklink_db_rows_total", "Rows returned or affected by database queries.", ("route",)
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "reklink_db_queries_per_request", "Database round trips per HTTP request.", ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "reklink_db_time_per_request_seconds", "Time spent in database queries per HTTP request.", ("method", "route")
+)
+
+# --- コネクションプール / 登録済みのSQL文 (スクレイプ時に更新) ---
+DB_POOL_CONNECTIONS = Gauge(
+    "reklink_db_pool_connections", "Database pool connections by state.", ("state",)
+)
+DB_POOL_WAITING = Gauge("reklink_db_pool_waiting", "Requests waiting to acquire a database connection.")
+PREPARED_QUERY_CALLS = Counter(
+    "reklink_prepared_query_calls_total", "Executions of registered statements.", ("name",)
+)
+PREPARED_QUERY_SECONDS = Counter(
+    "reklink_prepared_query_seconds_total", "Total execution time of registered statements.", ("name",)
+)
+
+
+@dataclass
+class RequestStats:
+    """
+    1リクエストの処理中に実行されたクエリの集計
+    """
+    route: str = UNMATCHED_ROUTE
+    queries: int = 0
+    rows: int = 0
+    db_seconds: float = 0.0
+
+
+# 処理中のリクエストの集計 (リクエスト外では None)
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """
+    処理中のリクエストのクエリの集計を返します。リクエスト外では None を返します。
+    """
+    return _request_stats.get()
+
+
+def _row_count(result: Any) -> int:
+    """
+    クエリの結果から、返された（または変更された）行数を求めます。
+    """
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, str):
+        # execute / copy の結果のステータス (例: "UPDATE 3", "INSERT 0 1", "COPY 500")
+        last = result.rsplit(" ", 1)[-1]
+        return int(last) if last.isdigit() else 0
+    return 1
+
+
+def _record_query(started: float, rows: int) -> None:
+    elapsed = time.perf_counter() - started
+    stats = _request_stats.get()
+    route = NO_ROUTE
+    if stats is not None:
+        route = stats.route
+        stats.queries += 1
+        stats.rows += rows
+        stats.db_seconds += elapsed
+    DB_QUERY_DURATION.observe((route,), elapsed)
+    if rows:
+        DB_ROWS.inc((route,), rows)
+
+
+class InstrumentedConnection(asyncpg.Connection):
+    """
+    クエリごとの実行時間・行数を記録する接続クラス。
+    コネクションプールの connection_class に指定して使います。
+    トランザクションの BEGIN / COMMIT も1回の往復として数えます。
+    """
+
+    async def execute(self, query: str, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await super().execute(query, *args, **kwargs)
+            return result
+        finally:
+            _record_query(started, _row_count(result))
+
+    async def executemany(self, command: str, args, **kwargs) -> None:
+        started = time.perf_counter()
+        try:
+            return await super().executemany(command, args, **kwargs)
+        finally:
+            _record_query(started, 0)
+
+    async def fetch(self, query: str, *args, **kwargs) -> list:
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await super().fetch(query, *args, **kwargs)
+            return result
+        finally:
+            _record_query(started, _row_count(result))
+
+    async def fetchrow(self, query: str, *args, **kwargs) -> Optional[asyncpg.Record]:
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await super().fetchrow(query, *args, **kwargs)
+            return result
+        finally:
+            _record_query(started, _row_count(result))
+
+    async def fetchval(self, query: str, *args, **kwargs) -> Any:
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await super().fetchval(query, *args, **kwargs)
+            return result
+        finally:
+            # 値そのものは行数と無関係なため、結果が返った場合は1行として数える
+            _record_query(started, 0 if result is None else 1)
+
+    async def copy_records_to_table(self, table_name: str, **kwargs) -> str:
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await super().copy_records_to_table(table_name, **kwargs)
+            return result
+        finally:
+            _record_query(started, _row_count(result))
+
+
+def _resolve_route(app: Any, scope: Scope) -> str:
+    """
+    リクエストのパスに一致するルートのパステンプレート（例: /api/v1/quizzes/{quiz_id}）を返します。
+    ラベルの種類が増えすぎないよう、実際のパスではなくテンプレートを使います。
+    """
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    リクエストごとの応答時間・処理中の件数・クエリ数を記録するASGIミドルウェア。
+    """
+
+    def __init__(self, app: ASGIApp, router: Any):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(route=_resolve_route(self.router, scope))
+        labels = (method, stats.route)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # 同じプロセス内でアプリを呼び出す側 (scripts/benchmark.py など) が集計を参照できるようにする
+        scope.setdefault("state", {})["request_stats"] = stats
+        token = _request_stats.set(stats)
+        HTTP_REQUESTS_IN_FLIGHT.inc(labels)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec(labels)
+            _request_stats.reset(token)
+            HTTP_REQUESTS.inc((method, stats.route, str(status_code)))
+            HTTP_REQUEST_DURATION.observe(labels, elapsed)
+            DB_QUERIES_PER_REQUEST.observe(labels, stats.queries)
+            DB_TIME_PER_REQUEST.observe(labels, stats.db_seconds)
+
+
+def update_scrape_gauges(pool_stats: Dict[str, Any], query_stats: Iterable[Dict[str, Any]]) -> None:
+    """
+    スクレイプ時点のコネクションプール・登録済みのSQL文の状況をメトリクスに反映します。
+    """
+    DB_POOL_CONNECTIONS.set(("in_use",), pool_stats["in_use"])
+    DB_POOL_CONNECTIONS.set(("idle",), pool_stats["idle"])
+    DB_POOL_CONNECTIONS.set(("max",), pool_stats["max_size"])
+    DB_POOL_WAITING.set((), pool_stats["waiting"])
+    for query in query_stats:
+        PREPARED_QUERY_CALLS.set_total((query["name"],), query["calls"])
+        PREPARED_QUERY_SECONDS.set_total((query["name"],), query["total_seconds"])
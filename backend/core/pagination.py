@@ -0,0 +1,113 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    キーセットページネーションの位置（最後の行のソートキー）を不透明なカーソル文字列に変換します。
+
+    :param values: 最後の行のソートキーの値（例: (created_at, id)）
+    :return: URLセーフなカーソル文字列
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, types: Sequence[type]) -> List[Any]:
+    """
+    カーソル文字列を、指定された型のソートキーの値に復元します。
+
+    :param token: encode_cursor で生成されたカーソル文字列
+    :param types: 各値の型（datetime, uuid.UUID, float, int, str）
+    :return: 復元された値のリスト（null の値は None のまま）
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cursor length mismatch")
+
+        values = []
+        for value, type_ in zip(payload, types):
+            if value is None:
+                values.append(None)
+            elif type_ is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif type_ is uuid.UUID:
+                values.append(uuid.UUID(value))
+            else:
+                values.append(type_(value))
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+# --- (created_at, id) によるキーセットページネーション ---
+
+# 次ページのカーソルを返すレスポンスヘッダー（一覧APIのレスポンス本体は配列のまま）
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# 一覧APIのデフォルトの取得件数と上限
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def keyset_condition(created_at_column: str, id_column: str, param_index: int) -> str:
+    """
+    「カーソル位置より後ろ（古い）の行」を表すWHERE条件を生成します。
+    ORDER BY {created_at_column} DESC, {id_column} DESC と組み合わせて使用します。
+
+    カーソルが無い場合（パラメータがNULL）は先頭から取得します。
+    NULL判定を OR で書くとインデックスの範囲条件として使えないため、COALESCE で番兵値に置き換えます。
+
+    :param created_at_column: 日時の列名（例: "c.created_at"）
+    :param id_column: ID列名（例: "c.id"）
+    :param param_index: カーソルの日時を渡すプレースホルダ番号（IDは param_index + 1）
+    :return: SQLの条件式
+    """
+    return (
+        f"({created_at_column}, {id_column}) < ("
+        f"COALESCE(${param_index}::timestamptz, 'infinity'), "
+        f"COALESCE(${param_index + 1}::uuid, 'ffffffff-ffff-ffff-ffff-ffffffffffff')"
+        f")"
+    )
+
+
+def parse_keyset_cursor(cursor: Optional[str]) -> Tuple[Optional[datetime], Optional[uuid.UUID]]:
+    """
+    (created_at, id) のカーソルを復元します。カーソルが無い場合は (None, None) を返します。
+    """
+    if not cursor:
+        return None, None
+    created_at, id_ = decode_cursor(cursor, (datetime, uuid.UUID))
+    return created_at, id_
+
+
+def paginate(
+    records: Sequence[Any],
+    limit: int,
+    response: Response,
+    created_at_key: str = "created_at",
+    id_key: str = "id",
+) -> List[Any]:
+    """
+    limit + 1 件取得したレコードを limit 件に切り詰め、続きがあれば次ページのカーソルをヘッダーに設定します。
+
+    :param records: limit + 1 件を上限に取得したレコード
+    :param limit: ページの件数
+    :param response: カーソルを設定するレスポンス
+    :param created_at_key: レコード中の日時のキー
+    :param id_key: レコード中のIDのキー
+    :return: 切り詰めたレコードのリスト
+    """
+    page = list(records[:limit])
+    if len(records) > limit and page:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor((last[created_at_key], last[id_key]))
+    return page
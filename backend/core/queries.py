@@ -0,0 +1,126 @@
+import logging
+import time
+from typing import Any, Dict, List
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedQuery:
+    """
+    名前付きの固定SQL文。
+
+    register_query で登録した文は、コネクションプールの各接続の初期化時に prepare_registered_queries で
+    準備され、asyncpg のステートメントキャッシュに載ります。実行時は同じSQL文字列で実行するため、
+    リクエストごとの PREPARE が発生しません。
+    文ごとの実行回数・実行時間を集計します。
+    """
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    async def _run(self, method, args: tuple) -> Any:
+        started = time.perf_counter()
+        try:
+            return await method(self.sql, *args)
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    async def fetch(self, conn: asyncpg.Connection, *args: Any) -> List[asyncpg.Record]:
+        return await self._run(conn.fetch, args)
+
+    async def fetchrow(self, conn: asyncpg.Connection, *args: Any) -> asyncpg.Record:
+        return await self._run(conn.fetchrow, args)
+
+    async def fetchval(self, conn: asyncpg.Connection, *args: Any) -> Any:
+        return await self._run(conn.fetchval, args)
+
+    async def execute(self, conn: asyncpg.Connection, *args: Any) -> str:
+        return await self._run(conn.execute, args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+
+# 名前 -> 登録済みの文
+_registry: Dict[str, PreparedQuery] = {}
+
+
+def register_query(name: str, sql: str) -> PreparedQuery:
+    """
+    名前付きの文を登録します。モジュールの読み込み時に呼び出してください。
+
+    :param name: 文の名前（統計の表示に使用。重複不可）
+    :param sql: SQL文（呼び出しごとに変わらない固定の文字列）
+    :return: 登録した文
+    """
+    if name in _registry:
+        raise ValueError(f"Query '{name}' is already registered")
+    query = PreparedQuery(name, sql)
+    _registry[name] = query
+    return query
+
+
+def registered_query_count() -> int:
+    return len(_registry)
+
+
+def registered_queries() -> List[PreparedQuery]:
+    return list(_registry.values())
+
+
+async def prepare_registered_queries(conn: asyncpg.Connection) -> None:
+    """
+    登録済みの文をすべて準備し、接続のステートメントキャッシュに載せます。
+    コネクションプールの init から、接続ごとに1回呼び出されます。
+
+    準備に失敗した文（マイグレーション前のテーブルを参照している場合など）は警告を出して読み飛ばし、
+    初回の実行時に通常どおり準備されます。
+
+    Connection.prepare で作った文は conn.fetch などのステートメントキャッシュに載らないため、
+    内部の _prepare を使います。asyncpg のバージョンは requirements.txt で動作確認済みの範囲に固定し、
+    それでも _prepare が使えない場合は事前準備だけを取りやめます（実行には影響しません）。
+    """
+    prepare = getattr(conn, "_prepare", None)
+    if prepare is None:
+        logger.warning("asyncpg Connection._prepare is unavailable; registered queries are prepared on first use")
+        return
+    for query in _registry.values():
+        try:
+            await prepare(query.sql, use_cache=True)
+        except asyncpg.PostgresError as e:
+            logger.warning("Failed to prepare query '%s': %r", query.name, e)
+        except TypeError as e:
+            # 内部APIのシグネチャが変わった場合
+            logger.warning("Cannot warm the statement cache with this asyncpg version: %r", e)
+            return
+
+
+def get_query_stats() -> List[Dict[str, Any]]:
+    """
+    登録済みの文ごとの実行回数・実行時間を、合計実行時間の長い順に返します。
+    """
+    return sorted(
+        (query.stats() for query in _registry.values()),
+        key=lambda s: s["total_seconds"],
+        reverse=True,
+    )
@@ -1,5 +1,8 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -10,6 +13,20 @@ from core.config import settings
 # "bcrypt"アルゴリズムを使用してパスワードをハッシュ化するためのコンテキストを作成
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# --- ハッシュ計算用のスレッドプール ---
+# bcryptは1回あたり数百ミリ秒かかるため、イベントループ上で直接実行すると
+# その間すべてのリクエストが止まってしまう。bcryptの計算中はGILが解放されるため、
+# 専用のスレッドプールで並列に実行する。
+_T = TypeVar("_T")
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_semaphore: Optional[asyncio.Semaphore] = None
+_hash_stats = {
+    "queued": 0,        # 実行待ちのハッシュ計算数
+    "in_flight": 0,     # 実行中のハッシュ計算数
+    "completed": 0,     # 完了したハッシュ計算の累計
+    "max_queue_depth": 0,  # 実行待ち数の最大値
+}
+
 # --- JWTの設定 ---
 # JWTの署名に使用するアルゴリズム
 ALGORITHM = "HS256"
@@ -36,6 +53,78 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _hash_workers() -> int:
+    # 未指定の場合は、CPUコアをサーバーのワーカープロセスで分け合う
+    return settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 1) // max(1, settings.SERVER_WORKERS))
+
+
+async def _run_in_hash_pool(func: Callable[..., _T], *args) -> _T:
+    """
+    ハッシュ計算を専用スレッドプールで実行します。
+    同時実行数は PASSWORD_HASH_WORKERS に制限され、超過分はイベントループ上で待機します。
+    """
+    global _hash_executor, _hash_semaphore
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=_hash_workers(), thread_name_prefix="password-hash")
+    if _hash_semaphore is None:
+        _hash_semaphore = asyncio.Semaphore(_hash_workers())
+
+    _hash_stats["queued"] += 1
+    _hash_stats["max_queue_depth"] = max(_hash_stats["max_queue_depth"], _hash_stats["queued"])
+    try:
+        await _hash_semaphore.acquire()
+    finally:
+        _hash_stats["queued"] -= 1
+
+    _hash_stats["in_flight"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_stats["in_flight"] -= 1
+        _hash_stats["completed"] += 1
+        _hash_semaphore.release()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password をイベントループを止めずに実行します。
+
+    :param plain_password: ユーザーが入力した平文のパスワード
+    :param hashed_password: データベースに保存されているハッシュ化されたパスワード
+    :return: パスワードが一致すればTrue, そうでなければFalse
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash をイベントループを止めずに実行します。
+
+    :param password: ハッシュ化する平文のパスワード
+    :return: ハッシュ化されたパスワード文字列
+    """
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+def get_hashing_stats() -> dict:
+    """
+    ハッシュ計算用スレッドプールの実行待ち・実行中の件数などを返します。
+    """
+    return {"workers": _hash_workers(), **_hash_stats}
+
+
+def shutdown_hashing_pool() -> None:
+    """
+    ハッシュ計算用スレッドプールを終了します。（アプリケーション終了時に呼び出す）
+    """
+    global _hash_executor, _hash_semaphore
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+    _hash_semaphore = None
+
+
 def create_access_token(
     data: dict, expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -0,0 +1,86 @@
+"""
+APIサーバーの起動処理。
+
+- 本番モード: gunicorn のマスタープロセスがアプリケーションを読み込んでから (preload)
+  ワーカープロセスを fork し、各ワーカーが uvicorn のイベントループでリクエストを処理します。
+  SIGTERM を受け取ると新しい接続の受け付けを止め、処理中のリクエストの完了を
+  SERVER_GRACEFUL_TIMEOUT 秒まで待ってから、各ワーカーの lifespan の終了処理
+  (解答の書き込みキューの書き出し・コネクションプールのクローズ) を実行して終了します。
+- 開発モード: 単一プロセスの uvicorn をファイル変更時の自動リロード付きで起動します。
+"""
+import os
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+from core.config import settings
+
+APP_PATH = "main:app"
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """
+    ワーカープロセス数を決定します。（引数 > SERVER_WORKERS > CPUコア数 の順）
+    """
+    return max(1, workers or settings.SERVER_WORKERS or os.cpu_count() or 1)
+
+
+def run_dev(host: str, port: int) -> None:
+    """
+    開発モード: 単一プロセス・自動リロード付きで起動します。
+    """
+    settings.SERVER_WORKERS = 1
+    uvicorn.run(APP_PATH, host=host, port=port, reload=True)
+
+
+def run_production(host: str, port: int, workers: Optional[int] = None) -> None:
+    """
+    本番モード: gunicorn + uvicorn ワーカーで複数プロセス起動します。
+    """
+    # gunicorn は本番モードでのみ必要なため、ここでインポートする
+    from gunicorn.app.base import BaseApplication
+
+    # ワーカー数はワーカーごとのコネクションプールの大きさの計算にも使うため、
+    # fork 前に設定へ反映してワーカーに引き継ぐ
+    settings.SERVER_WORKERS = resolve_workers(workers)
+
+    options: Dict[str, Any] = {
+        "bind": f"{host}:{port}",
+        "workers": settings.SERVER_WORKERS,
+        "worker_class": "core.server.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": settings.SERVER_WORKER_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+    class Application(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # preload_app=True のため、マスタープロセスで1回だけ読み込まれる
+            from main import app
+            return app
+
+    Application().run()
+
+
+try:
+    from uvicorn.workers import UvicornWorker as _BaseUvicornWorker
+except ImportError:  # gunicorn が未インストールの環境（開発モードのみで使う場合）
+    _BaseUvicornWorker = None
+
+if _BaseUvicornWorker is not None:
+    class UvicornWorker(_BaseUvicornWorker):
+        """
+        設定 SERVER_LOOP / SERVER_HTTP でイベントループとHTTPパーサーを選択する uvicorn ワーカー。
+        """
+        CONFIG_KWARGS = {
+            "loop": settings.SERVER_LOOP,
+            "http": settings.SERVER_HTTP,
+            "lifespan": "on",
+        }
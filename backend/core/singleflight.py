@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[V]):
+    """
+    同じキーに対する同時の読み込みを1回にまとめるユーティリティ（リクエストの集約）。
+
+    あるキーの読み込み中に同じキーで do() が呼ばれた場合、後から来た呼び出しは読み込み関数を実行せず、
+    最初の呼び出しの結果（または例外）を受け取ります。読み込みが終わるとキーは解放されるため、
+    結果を保存するキャッシュではありません。
+
+    読み込み関数は最初の呼び出し元のタスク（とDB接続）で実行されます。
+    最初の呼び出し元がキャンセルされた場合、待っていた呼び出しは改めて読み込みを行います。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        """
+        キーに対する読み込みを実行し、結果を返します。
+
+        :param key: 読み込みを識別するキー（同じ結果になる呼び出しには同じキーを指定する）
+        :param fn: 読み込み関数
+        :return: 読み込み関数の結果
+        """
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            # asyncio.wait は待っている Future をキャンセルしないため、自分がキャンセルされても影響しない
+            self.coalesced += 1
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                return inflight.result()
+            # 読み込み中の呼び出しがキャンセルされた場合は、改めて読み込む
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.calls += 1
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 待っている呼び出しがない場合に "exception was never retrieved" を出さないようにする
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "inflight": len(self._inflight)}
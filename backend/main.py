@@ -1,17 +1,46 @@
-from fastapi import FastAPI
+import argparse
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 
 # api.pyで作成した司令塔となるapi_routerをインポートします
 from api.v1.api import api_router
+from core import database, metrics, security, server
+from core.cache import close_cache
+from core.pagination import NEXT_CURSOR_HEADER
 from core.config import settings
+from core.instrumentation import MetricsMiddleware, update_scrape_gauges
+from core.queries import get_query_stats
+from services.activity_rollup import start_activity_rollup, stop_activity_rollup
+from services.answer_ingest import start_answer_ingest, stop_answer_ingest
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    アプリケーションの起動時・終了時の処理。
+    起動時にコネクションプールを作成し、終了時にクローズします。
+    解答の書き込みキューは、プールをクローズする前に残りをすべて書き込んでから停止します。
+    日別活動数の定期集計もここで開始・停止します。
+    """
+    await database.init_pool()
+    start_answer_ingest()
+    start_activity_rollup()
+    yield
+    await stop_activity_rollup()
+    await stop_answer_ingest()
+    await database.close_pool()
+    await close_cache()
+    security.shutdown_hashing_pool()
 
 # FastAPIアプリケーションのインスタンスを作成
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="歴史学習アプリ「RekLink」のAPI",
     version="1.7.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # --- CORS (Cross-Origin Resource Sharing) の設定 ---
@@ -26,8 +55,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 一覧APIの次ページのカーソルをフロントエンドから読めるようにする
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# --- 計測 ---
+# ルートごとの応答時間・処理中のリクエスト数・1リクエストあたりのクエリ数を集計する
+# (最後に追加したミドルウェアが最も外側で実行されるため、CORS の処理時間も含まれる)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, router=app.router)
+
 # --- ★★★ 最も重要な部分 ★★★ ---
 # /api/v1 という共通のパスで、api_router（api.pyで定義）に束ねられた
 # すべてのAPIエンドポイントをアプリケーションに登録します。
@@ -42,11 +79,27 @@ def read_root():
     return {"message": "Welcome to RekLink API!"}
 
 
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def read_metrics():
+    """
+    Prometheus のテキスト形式でメトリクスを返します。
+    値はワーカープロセスごとに集計されます。
+    """
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    update_scrape_gauges(database.get_pool_stats(), get_query_stats())
+    return Response(content=metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8080,
-        reload=True
-    )
+    parser = argparse.ArgumentParser(description="RekLink API サーバー")
+    parser.add_argument("--dev", action="store_true", help="開発モード（単一プロセス・自動リロード）で起動する")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（省略時は SERVER_WORKERS またはCPUコア数）")
+    args = parser.parse_args()
 
+    if args.dev:
+        server.run_dev(args.host, args.port)
+    else:
+        server.run_production(args.host, args.port, args.workers)
@@ -30,3 +30,67 @@ class BulkUploadResult(BaseModel):
     successful_imports: int
     failed_imports: int
     errors: List[str] = []
+
+
+class DbPoolStats(BaseModel):
+    """
+    【管理者用】データベースコネクションプールの飽和状況
+    """
+    min_size: int = Field(..., description="プールの最小接続数")
+    max_size: int = Field(..., description="プールの最大接続数")
+    size: int = Field(..., description="現在開いている接続数")
+    idle: int = Field(..., description="アイドル状態の接続数")
+    in_use: int = Field(..., description="貸し出し中の接続数")
+    waiting: int = Field(..., description="接続の取得を待っているリクエスト数")
+    acquired_total: int = Field(..., description="起動以降に取得された接続の累計")
+    acquire_timeouts: int = Field(..., description="取得待ちがタイムアウトした回数")
+    max_wait_seconds: float = Field(..., description="取得待ち時間の最大値（秒）")
+
+
+class PasswordHashingStats(BaseModel):
+    """
+    【管理者用】パスワードハッシュ計算用スレッドプールの実行状況
+    """
+    workers: int = Field(..., description="同時に実行できるハッシュ計算の上限")
+    queued: int = Field(..., description="実行待ちのハッシュ計算数")
+    in_flight: int = Field(..., description="実行中のハッシュ計算数")
+    completed: int = Field(..., description="完了したハッシュ計算の累計")
+    max_queue_depth: int = Field(..., description="実行待ち数の最大値")
+
+
+class AnswerIngestStats(BaseModel):
+    """
+    【管理者用】解答の書き込みキューの状況
+    """
+    enabled: bool = Field(..., description="書き込みキューが有効かどうか")
+    queue_depth: int = Field(0, description="書き込み待ちの解答数")
+    max_queue_size: int = Field(0, description="キューに積める最大件数")
+    enqueued: int = Field(0, description="キューに積まれた解答の累計")
+    written: int = Field(0, description="書き込まれた解答の累計")
+    dropped: int = Field(0, description="書き込めずに破棄された解答の累計")
+    flushes: int = Field(0, description="まとめて書き込んだ回数")
+    rejected: int = Field(0, description="キューが満杯のため直接書き込んだ解答の累計")
+
+
+class QueryStats(BaseModel):
+    """
+    【管理者用】登録済みのSQL文ごとの実行状況
+    """
+    name: str = Field(..., description="文の名前")
+    calls: int = Field(..., description="実行回数")
+    errors: int = Field(..., description="エラーになった回数")
+    total_seconds: float = Field(..., description="合計実行時間（秒）")
+    mean_seconds: float = Field(..., description="平均実行時間（秒）")
+    max_seconds: float = Field(..., description="最大実行時間（秒）")
+
+
+class FeedCandidateStats(BaseModel):
+    """
+    【管理者用】おすすめフィードの候補 (プロセス内のランキング) の状況
+    """
+    loaded: bool = Field(..., description="候補を読み込み済みかどうか")
+    candidates: int = Field(..., description="候補のコンテンツ数")
+    teams: int = Field(..., description="試験範囲の候補を保持しているチーム数")
+    loads: int = Field(..., description="DBから候補を読み込んだ回数")
+    updates: int = Field(..., description="投稿・反応などの変更を反映した回数")
+    coalesced_loads: int = Field(..., description="同時の読み込みを1回にまとめた回数")
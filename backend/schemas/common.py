@@ -25,10 +25,25 @@ class Notification(BaseModel):
         from_attributes = True
 
 
+class SearchHighlight(BaseModel):
+    """
+    【共通】検索結果1件ごとのハイライト情報
+    キーワード部分は <mark> タグで囲まれ、それ以外はHTMLエスケープ済みです。
+    """
+    content_id: uuid.UUID
+    rank: float = Field(..., description="関連度スコア（大きいほど関連が高い）")
+    title: str = Field(..., description="キーワードをハイライトしたタイトル")
+    snippet: str = Field(..., description="本文中のキーワード周辺を切り出したスニペット")
+
+
 class SearchResult(BaseModel):
     """
     【共通】検索結果のデータ形式
     """
     # 検索結果はクイズか豆知識のどちらか
     items: List[Union[Quiz, Trivia]] = []
+    highlights: List[SearchHighlight] = []
+    # 総件数はプランナーの推定値（結果が1ページに収まる場合は正確な件数）
     total: int = 0
+    # 次のページを取得するためのカーソル（最後のページの場合は None）
+    next_cursor: Optional[str] = None
@@ -52,6 +52,10 @@ class Quiz(ContentBase):
     updated_at: datetime
     options: List[QuizOption]
     tags: List[Tag] = [] # 取得時にはタグの情報を含める
+    # 反応数 (content_engagement のカウンター)
+    like_count: int = 0
+    save_count: int = 0
+    share_count: int = 0
 
     class Config:
         from_attributes = True
@@ -74,11 +78,31 @@ class Trivia(ContentBase):
     created_at: datetime
     updated_at: datetime
     tags: List[Tag] = []
+    # 反応数 (content_engagement のカウンター)
+    like_count: int = 0
+    save_count: int = 0
+    share_count: int = 0
 
     class Config:
         from_attributes = True
 
 
+# --- トレンド (Trending) ---
+class TrendingStats(BaseModel):
+    """
+    反応・解答の指数減衰付きの集計 (services/trending.py)
+    """
+    score: float = Field(..., description="反応・解答の重み付きの減衰付き合計")
+    interaction_rate: float = Field(..., description="1時間あたりの反応数 (指数移動平均)")
+    answer_rate: float = Field(..., description="1時間あたりの解答数 (指数移動平均)")
+
+class TrendingQuiz(Quiz):
+    trending: TrendingStats
+
+class TrendingTrivia(Trivia):
+    trending: TrendingStats
+
+
 # --- 解答 (Answer) ---
 class AnswerCreate(BaseModel):
     selected_option_id: uuid.UUID
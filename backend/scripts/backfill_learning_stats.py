@@ -0,0 +1,25 @@
+"""
+user_learning_stats（ユーザーごとの学習統計）を user_answers と contents から再構築するCLI。
+
+増分更新とのずれを解消したい場合や、初回導入時に実行します (backend ディレクトリで実行):
+    python -m scripts.backfill_learning_stats
+"""
+import asyncio
+
+import asyncpg
+
+from core.config import settings
+from services.learning_stats import LearningStatsService
+
+
+async def main() -> None:
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        rebuilt = await LearningStatsService(conn).rebuild()
+    finally:
+        await conn.close()
+    print(f"Rebuilt learning stats for {rebuilt} user(s).")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
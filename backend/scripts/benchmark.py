@@ -0,0 +1,519 @@
+"""
+教室のアクセスを模した負荷をAPIにかけ、エンドポイントごとの応答時間とクエリ数を計測するベンチマーク。
+
+合成した学校 (チーム・生徒・コンテンツ・解答など) を scripts.generate_data でデータベースに投入し、
+アプリケーション (main.app) を同じプロセス内で直接呼び出して、実際のルーター・依存関係・DBを通した
+応答時間の p50 / p95 / p99 と、1リクエストあたりのクエリ数を表示します。
+HTTPサーバー・ネットワークの時間は含みません。
+
+合成データは既存のテーブルに追加され、集計テーブル (content_engagement など) は全体を再計算するため、
+ベンチマーク専用のデータベースに対して実行してください (backend ディレクトリで実行):
+    python -m scripts.benchmark --teams 10 --students 300 --contents 2000
+    python -m scripts.benchmark --scenario quiz_burst --concurrency 50 --json result.json
+    python -m scripts.benchmark --skip-seed --baseline result.json   # 前回の結果と比較して悪化した場合は終了コード1
+    python -m scripts.benchmark --cleanup                            # 合成データを削除する
+
+シナリオ:
+    login_storm        授業開始時に生徒が一斉にログインする
+    feed_scroll        おすすめフィード・公開フィード・クイズ一覧をページ送りで読む
+    quiz_burst         同じチームの生徒が同じクイズを開いて一斉に解答する
+    teacher_dashboard  教師がダッシュボードと生徒一覧を繰り返し更新する
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import asyncpg
+
+from core import security
+from core.config import settings
+from scripts.generate_data import (
+    BASE_SPEC,
+    SYNTHETIC_EMAIL_DOMAIN,
+    SYNTHETIC_PASSWORD,
+    Dataset,
+    DatasetSpec,
+    cleanup,
+    load_dataset,
+)
+
+# ---------------------------------------------------------------------------
+# 合成データ
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BenchTeam:
+    id: uuid.UUID
+    teacher_email: str
+    student_emails: List[str]
+    quiz_ids: List[uuid.UUID]
+
+
+@dataclass
+class School:
+    """
+    ベンチマークの対象となる合成した学校
+    """
+    teams: List[BenchTeam]
+    quiz_ids: List[uuid.UUID]
+    # メールアドレス -> アクセストークン (ログイン以外のシナリオで使用する)
+    tokens: Dict[str, str] = field(default_factory=dict)
+
+    def token(self, email: str) -> str:
+        token = self.tokens.get(email)
+        if token is None:
+            token = self.tokens[email] = security.create_access_token(data={"sub": email})
+        return token
+
+
+def bench_spec(teams: int, students: int, contents: int) -> DatasetSpec:
+    """
+    ベンチマークの規模から合成データの設定を作ります。
+    生徒はチームに均等に割り振るため、生徒数はチーム数の倍数に切り上げます。
+    """
+    return replace(
+        BASE_SPEC,
+        teams=teams,
+        students_per_team=max(1, math.ceil(students / teams)),
+        contents=contents,
+        tags=max(1, round(BASE_SPEC.tags * math.sqrt(contents / BASE_SPEC.contents))),
+    )
+
+
+def school_from_dataset(dataset: Dataset) -> School:
+    """
+    投入したデータセットから School を組み立てます。
+    """
+    teams = [
+        BenchTeam(
+            dataset.team_id(t),
+            dataset.teacher_email(t),
+            [dataset.student_email(s) for s in dataset.students_of_team(t)],
+            [dataset.content_id(c) for c in dataset.quizzes_of_team(t)],
+        )
+        for t in range(dataset.spec.teams)
+    ]
+    return School(teams=teams, quiz_ids=[quiz_id for team in teams for quiz_id in team.quiz_ids])
+
+
+async def load_school(conn: asyncpg.Connection) -> School:
+    """
+    投入済みの合成データから School を組み立てます (--skip-seed の場合)。
+    """
+    records = await conn.fetch(
+        """
+        SELECT t.id AS team_id, u.email AS teacher_email,
+               ARRAY(
+                   SELECT su.email FROM team_members tm JOIN users su ON su.id = tm.user_id
+                   WHERE tm.team_id = t.id AND su.role = 'student' ORDER BY su.email
+               ) AS student_emails,
+               ARRAY(
+                   SELECT c.id FROM contents c
+                   WHERE c.team_id = t.id AND c.content_type = 'quiz' ORDER BY c.id
+               ) AS quiz_ids
+        FROM teams t JOIN users u ON u.id = t.created_by
+        WHERE u.email LIKE $1
+        ORDER BY t.join_code
+        """,
+        f"%@{SYNTHETIC_EMAIL_DOMAIN}"
+    )
+    teams = [
+        BenchTeam(r['team_id'], r['teacher_email'], list(r['student_emails']), list(r['quiz_ids']))
+        for r in records
+    ]
+    return School(teams=teams, quiz_ids=[quiz_id for team in teams for quiz_id in team.quiz_ids])
+
+
+# ---------------------------------------------------------------------------
+# アプリケーションの呼び出し
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BenchResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    seconds: float
+    queries: int
+    route: str
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class AsgiClient:
+    """
+    ASGIアプリケーションを同じプロセス内で直接呼び出す最小限のHTTPクライアント。
+    MetricsMiddleware が記録したルートとクエリ数を応答と一緒に返します。
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        token: Optional[str] = None,
+        json_body: Any = None,
+        form: Optional[Dict[str, str]] = None,
+    ) -> BenchResponse:
+        body = b""
+        headers = [(b"host", b"bench")]
+        if json_body is not None:
+            body = json.dumps(json_body, default=str).encode("utf-8")
+            headers.append((b"content-type", b"application/json"))
+        elif form is not None:
+            body = urlencode(form).encode("utf-8")
+            headers.append((b"content-type", b"application/x-www-form-urlencoded"))
+        if token:
+            headers.append((b"authorization", f"Bearer {token}".encode("ascii")))
+        headers.append((b"content-length", str(len(body)).encode("ascii")))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("utf-8"),
+            "root_path": "",
+            "query_string": urlencode(params or {}).encode("utf-8"),
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+            "state": {},
+        }
+        response_complete = asyncio.Event()
+        request_sent = False
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+
+        async def receive() -> dict:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update(
+                    (k.decode("latin-1").lower(), v.decode("latin-1")) for k, v in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            # 未処理の例外は ServerErrorMiddleware が500を返した後に再送出される。
+            # 1件の失敗でベンチマーク全体を止めないよう、エラーの応答として記録する
+            status = 500
+        elapsed = time.perf_counter() - started
+        response_complete.set()
+
+        stats = scope["state"].get("request_stats")
+        return BenchResponse(
+            status=status,
+            headers=response_headers,
+            body=b"".join(chunks),
+            seconds=elapsed,
+            queries=stats.queries if stats else 0,
+            route=f"{method} {stats.route if stats else path}",
+        )
+
+
+@dataclass
+class Sample:
+    scenario: str
+    endpoint: str
+    status: int
+    seconds: float
+    queries: int
+
+
+class Session:
+    """
+    1人の仮想ユーザーのリクエストを記録するラッパー
+    """
+
+    def __init__(self, client: AsgiClient, scenario: str, samples: List[Sample]):
+        self.client = client
+        self.scenario = scenario
+        self.samples = samples
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> BenchResponse:
+        response = await self.client.request(method, path, **kwargs)
+        self.samples.append(Sample(self.scenario, response.route, response.status, response.seconds, response.queries))
+        return response
+
+
+# ---------------------------------------------------------------------------
+# シナリオ
+# ---------------------------------------------------------------------------
+
+API = settings.API_V1_STR
+FEED_PAGE_SIZE = 20
+FEED_PAGES = 3
+
+
+async def login_storm(session: Session, school: School, rng: random.Random) -> None:
+    team = rng.choice(school.teams)
+    email = rng.choice(team.student_emails)
+    response = await session.request(
+        "POST", f"{API}/auth/login", form={"username": email, "password": SYNTHETIC_PASSWORD}
+    )
+    if response.status == 200:
+        await session.request("GET", f"{API}/auth/me", token=response.json()["access_token"])
+
+
+async def feed_scroll(session: Session, school: School, rng: random.Random) -> None:
+    team = rng.choice(school.teams)
+    token = school.token(rng.choice(team.student_emails))
+    for path in (f"{API}/feed", f"{API}/public/feed", f"{API}/quizzes"):
+        params: Dict[str, Any] = {"limit": FEED_PAGE_SIZE}
+        for _ in range(FEED_PAGES):
+            response = await session.request("GET", path, params=params, token=token)
+            cursor = response.headers.get("x-next-cursor")
+            if response.status != 200 or not cursor:
+                break
+            params = {"limit": FEED_PAGE_SIZE, "cursor": cursor}
+
+
+async def quiz_burst(session: Session, school: School, rng: random.Random) -> None:
+    # 授業中は同じチームの生徒が同じクイズに集中するため、チーム内の少数のクイズから選ぶ
+    team = rng.choice(school.teams)
+    if not team.quiz_ids:
+        return
+    quiz_id = rng.choice(team.quiz_ids[:3])
+    token = school.token(rng.choice(team.student_emails))
+    response = await session.request("GET", f"{API}/quizzes/{quiz_id}", token=token)
+    if response.status != 200:
+        return
+    option = rng.choice(response.json()["options"])
+    await session.request(
+        "POST", f"{API}/quizzes/{quiz_id}/answer", token=token, json_body={"selected_option_id": option["id"]}
+    )
+
+
+async def teacher_dashboard(session: Session, school: School, rng: random.Random) -> None:
+    team = rng.choice(school.teams)
+    token = school.token(team.teacher_email)
+    params = {"team_id": str(team.id)}
+    await session.request("GET", f"{API}/dashboard/summary", params=params, token=token)
+    await session.request("GET", f"{API}/dashboard/weekly-activity", params={**params, "days": 7}, token=token)
+    await session.request("GET", f"{API}/dashboard/popular-tags", params=params, token=token)
+    await session.request("GET", f"{API}/teams/{team.id}/students", token=token)
+
+
+SCENARIOS: Dict[str, Callable[[Session, School, random.Random], Awaitable[None]]] = {
+    "login_storm": login_storm,
+    "feed_scroll": feed_scroll,
+    "quiz_burst": quiz_burst,
+    "teacher_dashboard": teacher_dashboard,
+}
+
+
+async def run_scenario(
+    client: AsgiClient, school: School, name: str, sessions: int, concurrency: int, seed: int
+) -> Tuple[List[Sample], float]:
+    """
+    シナリオを sessions 回、concurrency 人の仮想ユーザーで同時に実行します。
+
+    :return: (記録したリクエスト, 経過時間（秒）)
+    """
+    scenario = SCENARIOS[name]
+    samples: List[Sample] = []
+    remaining = iter(range(sessions))
+
+    async def virtual_user(n: int) -> None:
+        rng = random.Random(f"{seed}:{name}:{n}")
+        session = Session(client, name, samples)
+        for _ in remaining:
+            await scenario(session, school, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(n) for n in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+# ---------------------------------------------------------------------------
+# 集計
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """
+    昇順に並んだ値の p パーセンタイル (nearest-rank) を返します。
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), int(-(-p * len(sorted_values) // 100))))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: Sequence[Sample]) -> List[Dict[str, Any]]:
+    """
+    シナリオ・エンドポイントごとに応答時間のパーセンタイルとクエリ数を集計します。
+    """
+    groups: Dict[Tuple[str, str], List[Sample]] = {}
+    for sample in samples:
+        groups.setdefault((sample.scenario, sample.endpoint), []).append(sample)
+
+    results = []
+    for (scenario, endpoint), group in sorted(groups.items()):
+        latencies = sorted(s.seconds * 1000 for s in group)
+        queries = [s.queries for s in group]
+        results.append({
+            "scenario": scenario,
+            "endpoint": endpoint,
+            "count": len(group),
+            "errors": sum(1 for s in group if s.status >= 400),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "queries_mean": sum(queries) / len(queries),
+            "queries_max": max(queries),
+        })
+    return results
+
+
+def print_report(results: Sequence[Dict[str, Any]], throughput: Dict[str, float]) -> None:
+    header = f"{'scenario':<18} {'endpoint':<46} {'n':>6} {'err':>4} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'q/req':>6} {'qmax':>5}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<18} {r['endpoint']:<46} {r['count']:>6} {r['errors']:>4} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+            f"{r['queries_mean']:>6.1f} {r['queries_max']:>5}"
+        )
+    print()
+    for name, rps in throughput.items():
+        print(f"{name}: {rps:.1f} req/s")
+
+
+def compare_with_baseline(
+    results: Sequence[Dict[str, Any]], baseline: Sequence[Dict[str, Any]], max_latency_regression: float
+) -> List[str]:
+    """
+    前回の結果と比較し、p95 の応答時間が max_latency_regression の割合を超えて悪化した、
+    または1リクエストあたりのクエリ数が増えたエンドポイントを返します。
+    """
+    previous = {(r["scenario"], r["endpoint"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        base = previous.get((r["scenario"], r["endpoint"]))
+        if base is None:
+            continue
+        label = f"{r['scenario']} {r['endpoint']}"
+        if r["p95_ms"] > base["p95_ms"] * (1 + max_latency_regression):
+            regressions.append(f"{label}: p95 {base['p95_ms']:.2f}ms -> {r['p95_ms']:.2f}ms")
+        # クエリ数はデータに依存して多少揺れるため、0.5 回を超える増加のみを検出する
+        if r["queries_mean"] > base["queries_mean"] + 0.5:
+            regressions.append(f"{label}: queries/request {base['queries_mean']:.1f} -> {r['queries_mean']:.1f}")
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="RekLink API のベンチマーク")
+    parser.add_argument("--teams", type=int, default=10, help="チーム数")
+    parser.add_argument("--students", type=int, default=300, help="生徒数")
+    parser.add_argument("--contents", type=int, default=2000, help="コンテンツ数")
+    parser.add_argument("--seed", type=int, default=42, help="合成データとシナリオの乱数シード")
+    parser.add_argument("--skip-seed", action="store_true", help="投入済みの合成データをそのまま使う")
+    parser.add_argument("--cleanup", action="store_true", help="合成データを削除して終了する")
+    parser.add_argument(
+        "--scenario", choices=[*SCENARIOS, "all"], default="all", help="実行するシナリオ"
+    )
+    parser.add_argument("--sessions", type=int, default=200, help="シナリオごとの仮想ユーザーのセッション数")
+    parser.add_argument("--concurrency", type=int, default=20, help="同時に実行する仮想ユーザー数")
+    parser.add_argument("--json", dest="json_path", help="結果をJSONで保存するパス")
+    parser.add_argument("--baseline", help="比較する前回の結果 (--json で保存したファイル)")
+    parser.add_argument(
+        "--max-latency-regression", type=float, default=0.2,
+        help="p95 の悪化として許容する割合 (0.2 = 20%%)"
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        if args.cleanup:
+            print(f"Removed {await cleanup(conn)} synthetic user(s).")
+            return 0
+        if args.skip_seed:
+            school = await load_school(conn)
+        else:
+            started = time.perf_counter()
+            dataset = Dataset(bench_spec(args.teams, args.students, args.contents), args.seed)
+            await load_dataset(conn, dataset, log=print)
+            school = school_from_dataset(dataset)
+            print(f"Seeded {len(school.teams)} team(s) in {time.perf_counter() - started:.1f}s.")
+    finally:
+        await conn.close()
+    if not school.teams:
+        print("No synthetic data found. Run without --skip-seed first.", file=sys.stderr)
+        return 1
+
+    # クエリ数はメトリクスのミドルウェアで数えるため、アプリを読み込む前に有効にする
+    settings.METRICS_ENABLED = True
+    from main import app, lifespan
+
+    client = AsgiClient(app)
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    samples: List[Sample] = []
+    throughput: Dict[str, float] = {}
+    async with lifespan(app):
+        for name in names:
+            scenario_samples, elapsed = await run_scenario(
+                client, school, name, args.sessions, args.concurrency, args.seed
+            )
+            samples.extend(scenario_samples)
+            throughput[name] = len(scenario_samples) / elapsed if elapsed else 0.0
+
+    results = summarize(samples)
+    print_report(results, throughput)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "throughput": throughput, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f)["results"], args.max_latency_regression)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
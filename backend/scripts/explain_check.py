@@ -0,0 +1,138 @@
+"""
+主要エンドポイントのクエリがインデックスを使用しているかを EXPLAIN で検証する回帰チェック。
+
+マイグレーション適用済みのデータベースに対して実行します (backend ディレクトリで実行):
+    python -m scripts.explain_check
+    python -m scripts.explain_check --synthetic 10   # 基準の10倍の合成データを投入してから検証する
+
+検証するのは、アプリケーションが実際に実行する登録済みの文 (core.queries の register_query) そのものです。
+SQLを書き写さないため、文を変更すると次回の実行でそのまま検証されます。
+
+データ量が少ないとプランナーはシーケンシャルスキャンを選ぶため、
+enable_seqscan を無効にした上で「対象テーブルをインデックス経由で読めるか」を確認します。
+次のいずれかの場合は終了コード1で終了します（CIやデプロイ前の確認で失敗として扱えます）。
+    - いずれかの文で対象テーブルがシーケンシャルスキャンになった、または読まれなかった
+    - 登録済みの文のうち、CASES に検証方法が書かれていないものがある
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+import asyncpg
+
+# すべてのエンドポイントを読み込み、登録済みの文をそろえる
+import api.v1.api  # noqa: F401
+from core.config import settings
+from core.queries import PreparedQuery, registered_queries
+from scripts.generate_data import BASE_SPEC, Dataset, load_dataset
+from services import queries
+from services.search_service import SEARCH_PAGE
+from services.trending import TRENDING_TOP
+
+
+class ExplainCase(NamedTuple):
+    name: str               # 対応するエンドポイント
+    table: str              # インデックスで読まれるべきテーブル
+    query: PreparedQuery    # アプリケーションが実行する登録済みの文
+    args: tuple             # EXPLAIN に渡す引数の例
+
+
+_ID = uuid.UUID(int=1)
+_NOW = datetime.now(timezone.utc)
+
+CASES: List[ExplainCase] = [
+    ExplainCase("GET /quizzes, GET /facts", "contents", queries.CONTENTS_PAGE, ("quiz", 21, None, None)),
+    ExplainCase("GET /public/feed", "contents", queries.PUBLIC_FEED_PAGE, (51, None, None)),
+    ExplainCase("GET /search", "contents", SEARCH_PAGE, ("%本能寺%", "本能寺", None, None, None, 21)),
+    ExplainCase("GET /quizzes/{id}", "contents", queries.CONTENT_WITH_COUNTS, (_ID, "quiz")),
+    ExplainCase("PUT /quizzes/{id} (author)", "contents", queries.CONTENT_AUTHOR, (_ID, "quiz")),
+    ExplainCase("PUT /quizzes/{id}", "contents", queries.UPDATE_CONTENT, (_ID, False, None, False, None, False, None)),
+    ExplainCase("GET /quizzes/{id} (options)", "quiz_options", queries.QUIZ_OPTIONS, (_ID,)),
+    ExplainCase("GET /quizzes/{id} (tags)", "content_tags", queries.CONTENT_TAGS, (_ID,)),
+    ExplainCase("hydration (options)", "quiz_options", queries.CONTENTS_OPTIONS, ([_ID],)),
+    ExplainCase("POST /quizzes/{id}/answer", "quiz_options", queries.ANSWER_KEY, (_ID,)),
+    ExplainCase("POST /auth/login", "users", queries.USER_BY_EMAIL, ("student@example.com",)),
+    ExplainCase("PUT /users/me", "users", queries.UPDATE_USER_PROFILE, (_ID, None, None, None)),
+    ExplainCase("GET /users/me/posts", "contents", queries.USER_POSTS_PAGE, (_ID, 21, None, None)),
+    ExplainCase("GET /users/me/answers", "user_answers", queries.USER_ANSWERS_PAGE, (_ID, 21, None, None)),
+    ExplainCase(
+        "GET /users/me/likes, /users/me/bookmarks", "interactions",
+        queries.USER_INTERACTIONS_PAGE, (_ID, 21, None, None, "like"),
+    ),
+    ExplainCase("GET /notifications", "notifications", queries.USER_NOTIFICATIONS, (_ID,)),
+    ExplainCase("GET /feed (team)", "team_members", queries.USER_TEAM, (_ID,)),
+    ExplainCase("GET /feed (older)", "contents", queries.FEED_OLDER_PAGE, (_NOW, 21, None, None)),
+    ExplainCase("GET /reports/pending", "reports", queries.TEAM_PENDING_REPORTS, ([_ID],)),
+    ExplainCase("GET /dashboard/summary (pending reports)", "reports", queries.PENDING_REPORTS_COUNT, ([_ID],)),
+    ExplainCase("GET /trending", "content_trending", TRENDING_TOP, (20, None)),
+    ExplainCase(
+        "PUT /curriculum/settings/{id}", "study_settings",
+        queries.UPDATE_STUDY_SETTING, (_ID, False, None, False, None, False, None),
+    ),
+]
+
+
+def uncovered_queries() -> List[str]:
+    """
+    登録済みの文のうち、CASES で検証されていないものの名前を返します。
+    """
+    covered = {case.query.name for case in CASES}
+    return sorted(query.name for query in registered_queries() if query.name not in covered)
+
+
+def _walk(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+async def check_case(conn: asyncpg.Connection, case: ExplainCase) -> List[str]:
+    """
+    1つのクエリを EXPLAIN し、対象テーブルを読むプランノードの種類を返します。
+    """
+    async with conn.transaction():
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {case.query.sql}", *case.args)
+    plan = json.loads(raw)[0]["Plan"]
+    return [node["Node Type"] for node in _walk(plan) if node.get("Relation Name") == case.table]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="主要クエリのインデックス使用の検証")
+    parser.add_argument(
+        "--synthetic", type=float, metavar="SCALE",
+        help="検証の前に、基準の規模 (scripts.generate_data の BASE_SPEC) の SCALE 倍の合成データを投入する"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="合成データの乱数シード")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    failures = 0
+    try:
+        if args.synthetic:
+            spec = BASE_SPEC.scaled(args.synthetic)
+            print(f"Loading {spec} (seed={args.seed})")
+            await load_dataset(conn, Dataset(spec, args.seed), log=print)
+        for case in CASES:
+            node_types = await check_case(conn, case)
+            ok = bool(node_types) and "Seq Scan" not in node_types
+            failures += 0 if ok else 1
+            status = "OK  " if ok else "FAIL"
+            print(f"[{status}] {case.name:<45} {case.table}: {', '.join(node_types) or '(not scanned)'}")
+        for name in uncovered_queries():
+            failures += 1
+            print(f"[FAIL] registered query '{name}' has no case in scripts/explain_check.py CASES")
+    finally:
+        await conn.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,459 @@
+"""
+スケール検証用の合成データを生成し、COPYで一括投入するCLI。
+
+db/init.sql のスキーマに沿って users / teams / team_members / tags / contents / quiz_options /
+content_tags / user_answers / interactions / reports と、チームごとの試験範囲 (study_settings) を生成します。
+同じシードと基準時刻からは同じデータが生成されます (他のテーブルから参照される行のIDも含む。
+解答・反応・タグの関連付け・通報の行のIDはデータベースの既定値で採番します)。
+タグの使われ方・コンテンツの人気・投稿者の偏りは Zipf 分布に従います。
+大きいテーブルは生成しながらCOPYするため、100倍の規模でもメモリに全行を保持しません。
+
+backend ディレクトリで実行します:
+    python -m scripts.generate_data --scale 10            # 基準の規模 (BASE_SPEC) の10倍
+    python -m scripts.generate_data --scale 100 --seed 7 --now 2024-04-01T09:00:00+09:00
+    python -m scripts.generate_data --scale 1 --dry-run   # 投入せずに件数と生成時間だけを確認
+    python -m scripts.generate_data --cleanup             # 合成データを削除する
+
+合成データのユーザーは SYNTHETIC_EMAIL_DOMAIN のメールアドレス、タグは SYNTHETIC_TAG_PREFIX の名前で識別され、
+--cleanup や再投入の前に削除されます。投入後に集計テーブル (反応数・学習統計・トレンド・日別活動数) を全件再計算するため、
+検証専用のデータベースに対して実行してください。
+scripts.benchmark と scripts.explain_check からも load_dataset を使って投入します。
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from core import security
+from core.config import settings
+from services.activity_rollup import ActivityRollupService
+from services.engagement import EngagementService
+from services.learning_stats import LearningStatsService
+from services.trending import TrendingService
+
+# 合成データの識別子 (削除時にこの条件で対象を特定する)
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.reklink.test"
+SYNTHETIC_TAG_PREFIX = "syn-"
+# 合成ユーザー全員に共通のパスワード
+SYNTHETIC_PASSWORD = "synthetic-password"
+
+OPTIONS_PER_QUIZ = 4
+INTERACTION_TYPES = ("like", "save", "share")
+INTERACTION_WEIGHTS = (0.7, 0.2, 0.1)
+REPORT_CATEGORIES = ("major_error", "minor_error", "improvement")
+REPORT_STATUSES = ("pending", "in_progress", "resolved", "rejected")
+REPORT_STATUS_WEIGHTS = (0.6, 0.1, 0.2, 0.1)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    生成するデータの規模
+    """
+    teams: int
+    students_per_team: int
+    contents: int
+    tags: int
+    answers_per_student: int
+    interactions_per_student: int
+    # コンテンツあたりの通報の割合
+    report_rate: float = 0.01
+    # クイズの割合 (残りは豆知識)
+    quiz_ratio: float = 0.7
+    # 解答の正答率
+    correct_rate: float = 0.6
+    # コンテンツの投稿日時を分布させる日数
+    spread_days: int = 180
+    # Zipf 分布の指数 (大きいほど上位に偏る)
+    zipf_exponent: float = 1.1
+
+    @property
+    def students(self) -> int:
+        return self.teams * self.students_per_team
+
+    def scaled(self, scale: float) -> "DatasetSpec":
+        """
+        規模を scale 倍にした設定を返します。
+        チームの人数は変えずにチーム数を増やし、タグの種類は語彙の増え方に合わせて平方根で増やします。
+        """
+        return replace(
+            self,
+            teams=max(1, round(self.teams * scale)),
+            contents=max(1, round(self.contents * scale)),
+            tags=max(1, round(self.tags * math.sqrt(scale))),
+        )
+
+
+# 基準の規模 (本番相当)。--scale はこの値に対する倍率
+BASE_SPEC = DatasetSpec(
+    teams=30,
+    students_per_team=35,
+    contents=5000,
+    tags=400,
+    answers_per_student=60,
+    interactions_per_student=40,
+)
+
+
+# 各エンティティのIDの種類 (IDの上位ビットに含め、種類ごとに重複しないようにする)
+_KIND_USER, _KIND_TEAM, _KIND_MEMBER, _KIND_TAG, _KIND_CONTENT, _KIND_OPTION, _KIND_STUDY_SETTING = range(1, 8)
+_INDEX_MASK = (1 << 48) - 1
+# 連番を散らすための乗数 (奇数なので 2^48 を法として全単射になる)
+_SCRAMBLE = 0x9E3779B97F4B
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    """
+    順位 1..n に 1 / rank^exponent の重みを付けた累積重みを返します (random.choices の cum_weights 用)。
+    """
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+class Dataset:
+    """
+    シードと規模から決まる合成データ。
+    IDや各行は添字から計算されるため、テーブルごとに独立して（生成しながら）取り出せます。
+    """
+
+    def __init__(self, spec: DatasetSpec, seed: int, now: Optional[datetime] = None):
+        self.spec = spec
+        self.seed = seed
+        self.now = now or datetime.now(timezone.utc)
+        self._id_prefix = random.Random(seed).getrandbits(64)
+        self._plan_contents()
+        # 行ごとに参照されるIDは作成済みのものを使い回す (UUIDの生成が生成時間の大半を占めるため)
+        self._content_ids = [self._id(_KIND_CONTENT, c) for c in range(spec.contents)]
+        self._student_ids = [self._id(_KIND_USER, self.student_index(s)) for s in range(spec.students)]
+        self._option_ids: Dict[int, List[uuid.UUID]] = {}
+
+    # --- ID・識別子 ---
+
+    def _id(self, kind: int, index: int) -> uuid.UUID:
+        scrambled = (index * _SCRAMBLE) & _INDEX_MASK
+        return uuid.UUID(int=(self._id_prefix << 64) | (kind << 56) | scrambled, version=4)
+
+    def _rng(self, name: str) -> random.Random:
+        # テーブルごとに乱数列を分けることで、他のテーブルの生成順序や規模に影響されない
+        return random.Random(f"{self.seed}:{name}")
+
+    def _ago(self, seconds: float) -> datetime:
+        return self.now - timedelta(seconds=seconds)
+
+    def teacher_index(self, team: int) -> int:
+        return team
+
+    def student_index(self, student: int) -> int:
+        return self.spec.teams + student
+
+    def user_id(self, user_index: int) -> uuid.UUID:
+        return self._id(_KIND_USER, user_index)
+
+    def team_id(self, team: int) -> uuid.UUID:
+        return self._id(_KIND_TEAM, team)
+
+    def content_id(self, content: int) -> uuid.UUID:
+        return self._content_ids[content]
+
+    def option_id(self, content: int, option: int) -> uuid.UUID:
+        options = self._option_ids.get(content)
+        if options is None:
+            options = self._option_ids[content] = [
+                self._id(_KIND_OPTION, content * OPTIONS_PER_QUIZ + o) for o in range(OPTIONS_PER_QUIZ)
+            ]
+        return options[option]
+
+    def teacher_email(self, team: int) -> str:
+        return f"teacher{team:06d}@{SYNTHETIC_EMAIL_DOMAIN}"
+
+    def student_email(self, student: int) -> str:
+        return f"student{student:07d}@{SYNTHETIC_EMAIL_DOMAIN}"
+
+    def team_of_student(self, student: int) -> int:
+        return student % self.spec.teams
+
+    def students_of_team(self, team: int) -> range:
+        return range(team, self.spec.students, self.spec.teams)
+
+    def quizzes_of_team(self, team: int) -> List[int]:
+        return [c for c in self.quiz_contents if self.content_team[c] == team]
+
+    # --- コンテンツの計画 (他のテーブルから参照される属性を先に決める) ---
+
+    def _plan_contents(self) -> None:
+        spec = self.spec
+        rng = self._rng("contents")
+        # 投稿者は生徒の中で Zipf 分布に偏らせる（よく投稿する生徒は一部）
+        author_order = list(range(spec.students))
+        rng.shuffle(author_order)
+        authors = rng.choices(author_order, cum_weights=zipf_cum_weights(spec.students, spec.zipf_exponent), k=spec.contents)
+
+        self.content_author: List[int] = authors
+        self.content_team: List[int] = [self.team_of_student(a) for a in authors]
+        self.content_is_quiz: List[bool] = [rng.random() < spec.quiz_ratio for _ in range(spec.contents)]
+        self.content_correct: List[int] = [rng.randrange(OPTIONS_PER_QUIZ) for _ in range(spec.contents)]
+        # 投稿日時 (基準時刻からの秒数)。新しい投稿ほど多くなるよう、二乗で直近に寄せる
+        spread = spec.spread_days * 86400
+        self.content_age: List[float] = [spread * rng.random() ** 2 for _ in range(spec.contents)]
+        self.quiz_contents: List[int] = [c for c in range(spec.contents) if self.content_is_quiz[c]]
+
+        # 人気 (解答・反応の集まりやすさ) の順位。投稿日時とは無関係に割り当てる
+        popularity = list(range(spec.contents))
+        rng.shuffle(popularity)
+        self._popular_contents = popularity
+        self._popular_quizzes = [c for c in popularity if self.content_is_quiz[c]]
+
+    # --- 各テーブルの行 ---
+
+    def users(self, password_hash: str) -> Iterator[tuple]:
+        rng = self._rng("users")
+        for team in range(self.spec.teams):
+            created = self._ago(self.spec.spread_days * 86400 + rng.uniform(0, 30 * 86400))
+            yield (self.user_id(self.teacher_index(team)), self.teacher_email(team), password_hash,
+                   f"Synthetic Teacher {team}", "teacher", created)
+        for student in range(self.spec.students):
+            created = self._ago(self.spec.spread_days * 86400 * rng.random() + 86400)
+            yield (self.user_id(self.student_index(student)), self.student_email(student), password_hash,
+                   f"Synthetic Student {student}", "student", created)
+
+    def teams(self) -> Iterator[tuple]:
+        for team in range(self.spec.teams):
+            # 実際の参加コードは数字のみのため、英字で始まるコードは重複しない
+            yield (self.team_id(team), f"Synthetic Team {team}", f"S{team:05d}",
+                   self.user_id(self.teacher_index(team)), self._ago(self.spec.spread_days * 86400))
+
+    def team_members(self) -> Iterator[tuple]:
+        for student in range(self.spec.students):
+            yield (self._id(_KIND_MEMBER, student), self.team_id(self.team_of_student(student)),
+                   self.user_id(self.student_index(student)), self._ago(self.spec.spread_days * 86400))
+
+    def tags(self) -> Iterator[tuple]:
+        for tag in range(self.spec.tags):
+            yield (self._id(_KIND_TAG, tag), f"{SYNTHETIC_TAG_PREFIX}{tag:05d}")
+
+    def contents(self) -> Iterator[tuple]:
+        for c in range(self.spec.contents):
+            yield (self.content_id(c), "quiz" if self.content_is_quiz[c] else "trivia",
+                   f"Synthetic content {c}", f"Synthetic body of content {c}", f"Synthetic explanation {c}",
+                   self._student_ids[self.content_author[c]], self.team_id(self.content_team[c]),
+                   self._ago(self.content_age[c]))
+
+    def quiz_options(self) -> Iterator[tuple]:
+        for c in self.quiz_contents:
+            for option in range(OPTIONS_PER_QUIZ):
+                yield (self.option_id(c, option), self.content_id(c), f"Option {option + 1}",
+                       option == self.content_correct[c], option)
+
+    def content_tags(self) -> Iterator[tuple]:
+        rng = self._rng("content_tags")
+        cum_weights = zipf_cum_weights(self.spec.tags, self.spec.zipf_exponent)
+        tag_ids = [self._id(_KIND_TAG, tag) for tag in range(self.spec.tags)]
+        for c in range(self.spec.contents):
+            wanted = min(self.spec.tags, rng.randint(1, 3))
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.update(rng.choices(range(self.spec.tags), cum_weights=cum_weights, k=wanted - len(chosen)))
+            for tag in sorted(chosen):
+                yield (self.content_id(c), tag_ids[tag])
+
+    def user_answers(self) -> Iterator[tuple]:
+        if not self._popular_quizzes:
+            return
+        spec = self.spec
+        rng = self._rng("user_answers")
+        cum_weights = zipf_cum_weights(len(self._popular_quizzes), spec.zipf_exponent)
+        for student in range(spec.students):
+            user_id = self._student_ids[student]
+            for c in rng.choices(self._popular_quizzes, cum_weights=cum_weights, k=spec.answers_per_student):
+                if rng.random() < spec.correct_rate:
+                    option = self.content_correct[c]
+                else:
+                    option = rng.randrange(OPTIONS_PER_QUIZ)
+                yield (user_id, self.content_id(c), self.option_id(c, option),
+                       option == self.content_correct[c], self._ago(self.content_age[c] * rng.random()))
+
+    def interactions(self) -> Iterator[tuple]:
+        spec = self.spec
+        rng = self._rng("interactions")
+        cum_weights = zipf_cum_weights(spec.contents, spec.zipf_exponent)
+        type_cum_weights = list(accumulate(INTERACTION_WEIGHTS))
+        wanted = min(spec.interactions_per_student, spec.contents * len(INTERACTION_TYPES))
+        for student in range(spec.students):
+            user_id = self._student_ids[student]
+            # (user_id, content_id, interaction_type) は一意のため、重複を除いて選ぶ
+            chosen = set()
+            while len(chosen) < wanted:
+                k = wanted - len(chosen)
+                contents = rng.choices(self._popular_contents, cum_weights=cum_weights, k=k)
+                types = rng.choices(INTERACTION_TYPES, cum_weights=type_cum_weights, k=k)
+                for c, interaction_type in zip(contents, types):
+                    if (c, interaction_type) in chosen:
+                        continue
+                    chosen.add((c, interaction_type))
+                    yield (user_id, self.content_id(c), interaction_type,
+                           self._ago(self.content_age[c] * rng.random()))
+
+    def reports(self) -> Iterator[tuple]:
+        spec = self.spec
+        rng = self._rng("reports")
+        for index in range(round(spec.contents * spec.report_rate)):
+            c = rng.randrange(spec.contents)
+            student = rng.randrange(spec.students)
+            status = rng.choices(REPORT_STATUSES, weights=REPORT_STATUS_WEIGHTS)[0]
+            created = self._ago(self.content_age[c] * rng.random())
+            resolved = status in ("resolved", "rejected")
+            yield (self._student_ids[student], self.content_id(c),
+                   rng.choice(REPORT_CATEGORIES), f"Synthetic report {index}", status,
+                   self.user_id(self.teacher_index(self.content_team[c])) if resolved else None,
+                   created, created + timedelta(hours=rng.uniform(1, 72)) if resolved else None)
+
+    def study_settings(self) -> Iterator[tuple]:
+        today = self.now.date()
+        for team in range(self.spec.teams):
+            # 基準時刻を含む試験範囲にして、フィードの試験範囲ボーナスが働くようにする
+            yield (self._id(_KIND_STUDY_SETTING, team), self.team_id(team), self.user_id(self.teacher_index(team)),
+                   f"Synthetic exam {team}", today - timedelta(days=7), today + timedelta(days=7))
+
+    def study_setting_tags(self) -> Iterator[tuple]:
+        rng = self._rng("study_setting_tags")
+        for team in range(self.spec.teams):
+            for tag in rng.sample(range(self.spec.tags), min(3, self.spec.tags)):
+                yield (self._id(_KIND_STUDY_SETTING, team), self._id(_KIND_TAG, tag))
+
+    def tables(self, password_hash: str) -> List[Tuple[str, List[str], Callable[[], Iterator[tuple]]]]:
+        """
+        外部キーの順に並べた (テーブル名, 列, 行の生成関数) のリストを返します。
+        """
+        return [
+            ("users", ["id", "email", "password_hash", "nickname", "role", "created_at"],
+             lambda: self.users(password_hash)),
+            ("teams", ["id", "name", "join_code", "created_by", "created_at"], self.teams),
+            ("team_members", ["id", "team_id", "user_id", "joined_at"], self.team_members),
+            ("tags", ["id", "name"], self.tags),
+            ("contents",
+             ["id", "content_type", "title", "content", "explanation", "author_id", "team_id", "created_at"],
+             self.contents),
+            ("quiz_options", ["id", "content_id", "option_text", "is_correct", "display_order"], self.quiz_options),
+            ("content_tags", ["content_id", "tag_id"], self.content_tags),
+            ("user_answers", ["user_id", "content_id", "selected_option_id", "is_correct", "answered_at"],
+             self.user_answers),
+            ("interactions", ["user_id", "content_id", "interaction_type", "created_at"], self.interactions),
+            ("reports",
+             ["reporter_id", "content_id", "category", "description", "status", "resolved_by",
+              "created_at", "resolved_at"],
+             self.reports),
+            ("study_settings", ["id", "team_id", "teacher_id", "setting_name", "exam_range_start", "exam_range_end"],
+             self.study_settings),
+            ("study_setting_tags", ["study_setting_id", "tag_id"], self.study_setting_tags),
+        ]
+
+
+async def cleanup(conn: asyncpg.Connection) -> int:
+    """
+    合成データを削除します。
+
+    :return: 削除したユーザー数
+    """
+    async with conn.transaction():
+        user_ids = [
+            r['id'] for r in await conn.fetch(
+                "SELECT id FROM users WHERE email LIKE $1", f"%@{SYNTHETIC_EMAIL_DOMAIN}"
+            )
+        ]
+        # contents.author_id / teams.created_by は ON DELETE SET NULL のため、先に削除する
+        await conn.execute("DELETE FROM contents WHERE author_id = ANY($1::uuid[])", user_ids)
+        await conn.execute("DELETE FROM teams WHERE created_by = ANY($1::uuid[])", user_ids)
+        await conn.execute("DELETE FROM users WHERE id = ANY($1::uuid[])", user_ids)
+        await conn.execute("DELETE FROM tags WHERE name LIKE $1", f"{SYNTHETIC_TAG_PREFIX}%")
+    return len(user_ids)
+
+
+async def rebuild_rollups(conn: asyncpg.Connection) -> None:
+    """
+    COPYで投入した行を、反応数・学習統計・トレンド・日別活動数の集計テーブルに反映し、統計情報を更新します。
+    """
+    await EngagementService(conn).reconcile()
+    await LearningStatsService(conn).rebuild()
+    await TrendingService(conn).rebuild()
+    # 投入した行は過去の日時のため、ウォーターマーク以降だけを加算する通常の集計ではなく全件を再集計する
+    await ActivityRollupService(conn).rebuild(settings.ACTIVITY_ROLLUP_LAG_SECONDS)
+    await conn.execute("ANALYZE")
+
+
+async def load_dataset(
+    conn: asyncpg.Connection, dataset: Dataset, log: Callable[[str], None] = lambda message: None
+) -> Dict[str, int]:
+    """
+    既存の合成データを削除してから、データセットを1つのトランザクションでCOPYし、集計テーブルを再計算します。
+
+    :param log: 進捗を出力する関数
+    :return: テーブルごとの投入行数
+    """
+    removed = await cleanup(conn)
+    if removed:
+        log(f"Removed {removed} existing synthetic user(s).")
+
+    # 全員同じパスワードのため、ハッシュ計算は1回だけ行う
+    password_hash = security.get_password_hash(SYNTHETIC_PASSWORD)
+    counts: Dict[str, int] = {}
+    async with conn.transaction():
+        for table, columns, rows in dataset.tables(password_hash):
+            started = time.perf_counter()
+            status = await conn.copy_records_to_table(table, records=rows(), columns=columns)
+            counts[table] = int(status.rsplit(" ", 1)[-1])
+            log(f"  {table:<18} {counts[table]:>10} rows  {time.perf_counter() - started:6.2f}s")
+
+    started = time.perf_counter()
+    await rebuild_rollups(conn)
+    log(f"  rollups and ANALYZE          {time.perf_counter() - started:6.2f}s")
+    return counts
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="スケール検証用の合成データの生成")
+    parser.add_argument("--scale", type=float, default=1.0, help="基準の規模 (BASE_SPEC) に対する倍率")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード")
+    parser.add_argument(
+        "--now", type=datetime.fromisoformat, default=None,
+        help="日時の基準時刻 (ISO 8601、タイムゾーン付き)。省略時は現在時刻"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="投入せずに生成だけを行い、件数と時間を表示する")
+    parser.add_argument("--cleanup", action="store_true", help="合成データを削除して終了する")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    spec = BASE_SPEC.scaled(args.scale)
+    started = time.perf_counter()
+
+    if args.dry_run:
+        dataset = Dataset(spec, args.seed, args.now)
+        for table, _, rows in dataset.tables(password_hash=""):
+            print(f"  {table:<18} {sum(1 for _ in rows()):>10} rows")
+        print(f"Generated {spec} in {time.perf_counter() - started:.1f}s (not loaded).")
+        return 0
+
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        if args.cleanup:
+            print(f"Removed {await cleanup(conn)} synthetic user(s).")
+            return 0
+        print(f"Loading {spec} (seed={args.seed})")
+        await load_dataset(conn, Dataset(spec, args.seed, args.now), log=print)
+    finally:
+        await conn.close()
+    print(f"Done in {time.perf_counter() - started:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,142 @@
+"""
+db/migrations 配下のバージョン付きマイグレーションを順番に適用するCLI。
+
+使い方 (backend ディレクトリで実行):
+    python -m scripts.migrate            # 未適用のマイグレーションをすべて適用
+    python -m scripts.migrate --status   # 適用状況を表示
+
+コンテナでは container/backend-entrypoint.sh がサーバーの起動前に実行します。
+"""
+import argparse
+import asyncio
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+import asyncpg
+
+from core.config import settings
+
+# リポジトリの db/migrations ディレクトリ (コンテナでは /usr/src/db/migrations にコピーされる)
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "db" / "migrations"
+
+# 複数のプロセスが同時に実行しても二重適用されないようにするためのアドバイザリロックのキー
+ADVISORY_LOCK_KEY = 7_300_431
+
+# ファイル先頭にこの行があるマイグレーションは、トランザクション外で1文ずつ実行する
+# (CREATE INDEX CONCURRENTLY など、トランザクション内で実行できない文のため)
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+
+# マイグレーションが作成するインデックス名を取り出すためのパターン
+CREATE_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def load_migrations() -> List[Tuple[str, Path]]:
+    """
+    マイグレーションファイルを「バージョン番号_説明.sql」の番号順に読み込みます。
+
+    :return: (バージョン, ファイルパス) のリスト
+    """
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = re.match(r"^(\d+)_", path.name)
+        if match:
+            migrations.append((match.group(1), path))
+    return migrations
+
+
+def _split_statements(sql: str) -> List[str]:
+    """
+    SQLをセミコロン区切りの文に分割します（コメント行は除去）。
+    関数定義などの $$ を含む文は対象外のため、トランザクション内で実行するファイルに書いてください。
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+async def drop_invalid_indexes(conn: asyncpg.Connection, sql: str) -> None:
+    """
+    マイグレーションが作成するインデックスのうち、無効 (pg_index.indisvalid = false) なものを削除します。
+    CREATE INDEX CONCURRENTLY が途中で失敗すると無効なインデックスが残り、
+    再実行しても IF NOT EXISTS で作成がスキップされるため、削除してから作り直させます。
+    """
+    names = CREATE_INDEX_PATTERN.findall(sql)
+    if not names:
+        return
+    invalid = await conn.fetch(
+        """
+        SELECT n.nspname AS schema_name, c.relname AS index_name
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT i.indisvalid AND c.relname = ANY($1::text[])
+        """,
+        names
+    )
+    for record in invalid:
+        print(f"Dropping invalid index {record['schema_name']}.{record['index_name']} ...")
+        await conn.execute(
+            f'DROP INDEX CONCURRENTLY IF EXISTS "{record["schema_name"]}"."{record["index_name"]}"'
+        )
+
+
+async def apply_migration(conn: asyncpg.Connection, version: str, path: Path) -> None:
+    """
+    1つのマイグレーションを適用し、schema_migrations に記録します。
+    トランザクション外で実行するマイグレーションは、前回の失敗で残った無効なインデックスを先に削除します。
+    """
+    sql = path.read_text(encoding="utf-8")
+    if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+        await drop_invalid_indexes(conn, sql)
+        for statement in _split_statements(sql):
+            await conn.execute(statement)
+        await conn.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)", version, path.name
+        )
+    else:
+        async with conn.transaction():
+            await conn.execute(sql)
+            await conn.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)", version, path.name
+            )
+
+
+async def migrate(show_status: bool = False) -> None:
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(20) PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+            """
+        )
+        await conn.execute("SELECT pg_advisory_lock($1)", ADVISORY_LOCK_KEY)
+        try:
+            applied = {r['version'] for r in await conn.fetch("SELECT version FROM schema_migrations")}
+            for version, path in load_migrations():
+                if version in applied:
+                    if show_status:
+                        print(f"[applied] {path.name}")
+                    continue
+                if show_status:
+                    print(f"[pending] {path.name}")
+                    continue
+                print(f"Applying {path.name} ...")
+                await apply_migration(conn, version, path)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_KEY)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply versioned database migrations")
+    parser.add_argument("--status", action="store_true", help="適用状況を表示するだけで適用はしない")
+    args = parser.parse_args()
+    asyncio.run(migrate(show_status=args.status))
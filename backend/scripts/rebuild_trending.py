@@ -0,0 +1,38 @@
+"""
+content_trending（コンテンツごとの指数減衰付きの反応・解答の率）を interactions と user_answers から再計算するCLI。
+
+初回導入時や、TRENDING_HALF_LIFE_SECONDS を変更した場合に実行します (backend ディレクトリで実行):
+    python -m scripts.rebuild_trending
+    python -m scripts.rebuild_trending --if-empty   # content_trending が空の場合のみ再計算する
+
+コンテナでは container/backend-entrypoint.sh がマイグレーションの後に --if-empty 付きで実行し、
+導入時に既存の履歴を取り込みます。
+"""
+import argparse
+import asyncio
+
+import asyncpg
+
+from core.config import settings
+from services.trending import TrendingService
+
+
+async def main(only_if_empty: bool = False) -> None:
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        rebuilt = await TrendingService(conn).rebuild(only_if_empty=only_if_empty)
+    finally:
+        await conn.close()
+    if rebuilt is None:
+        print("content_trending is already populated; skipped.")
+    else:
+        print(f"Rebuilt trending scores for {rebuilt} content(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild content_trending from interactions and user_answers")
+    parser.add_argument(
+        "--if-empty", action="store_true", help="content_trending に行がある場合は再計算しない"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(only_if_empty=args.if_empty))
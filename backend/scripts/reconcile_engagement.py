@@ -0,0 +1,25 @@
+"""
+content_engagement のカウンターを interactions から再計算し、ずれを修正するCLI。
+
+定期実行 (cron など) を想定しています (backend ディレクトリで実行):
+    python -m scripts.reconcile_engagement
+"""
+import asyncio
+
+import asyncpg
+
+from core.config import settings
+from services.engagement import EngagementService
+
+
+async def main() -> None:
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        fixed = await EngagementService(conn).reconcile()
+    finally:
+        await conn.close()
+    print(f"Reconciled {fixed} engagement counter(s).")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+日別活動数 (user_daily_activity) の集計を1回実行するCLI。
+
+アプリケーション内の定期集計 (ACTIVITY_ROLLUP_ENABLED) の代わりに cron などから実行できます
+(backend ディレクトリで実行):
+    python -m scripts.rollup_activity
+    python -m scripts.rollup_activity --rebuild   # 過去の日時の行を一括投入した後に全件を再集計する
+"""
+import argparse
+import asyncio
+
+import asyncpg
+
+from core.config import settings
+from services.activity_rollup import ActivityRollupService
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="日別活動数の集計")
+    parser.add_argument("--rebuild", action="store_true", help="日別活動数を全件再集計する")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        service = ActivityRollupService(conn)
+        if args.rebuild:
+            result = await service.rebuild(settings.ACTIVITY_ROLLUP_LAG_SECONDS)
+        else:
+            result = await service.run(settings.ACTIVITY_ROLLUP_LAG_SECONDS)
+    finally:
+        await conn.close()
+    if args.rebuild:
+        print(
+            f"Rebuilt up to {result['to']}: "
+            f"{result['answer_days']} answer day(s), {result['post_days']} post day(s)."
+        )
+    elif result is None:
+        print("Nothing to roll up.")
+    else:
+        print(
+            f"Rolled up {result['from']} .. {result['to']}: "
+            f"{result['answer_days']} answer day(s), {result['post_days']} post day(s)."
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+import asyncpg
+from typing import Optional
+from uuid import UUID
+
+from services.engagement import EngagementService, publish_interaction_change
+from services.trending import TrendingService
+
+
+class AccountService:
+    """
+    ユーザーアカウントの削除を行うサービス。
+    interactions と user_answers はユーザーの削除でカスケード削除されるため、
+    それらから集計しているカウンター (content_engagement) とトレンド (content_trending) を
+    削除と同じトランザクションで減らします。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def delete(self, user_id: UUID, role: Optional[str] = None) -> Optional[str]:
+        """
+        ユーザーを削除し、そのユーザーの反応・解答の分だけ集計を減らします。
+
+        :param user_id: 削除するユーザーのID
+        :param role: 指定した場合は、そのロールのユーザーのみ削除します
+        :return: 削除したユーザーのメールアドレス（該当するユーザーがいない場合は None）
+        """
+        async with self.conn.transaction():
+            # 対象のユーザーを先にロックし、存在しない・ロールが違う場合は集計を変更しない
+            email = await self.conn.fetchval(
+                "SELECT email FROM users WHERE id = $1 AND ($2::text IS NULL OR role = $2) FOR UPDATE",
+                user_id, role
+            )
+            if email is None:
+                return None
+            removed = await EngagementService(self.conn).subtract_user(user_id)
+            await TrendingService(self.conn).subtract_user_answers(user_id)
+            await self.conn.execute("DELETE FROM users WHERE id = $1", user_id)
+
+        for content_id, interaction_type in removed:
+            await publish_interaction_change(content_id, interaction_type, -1)
+        return email
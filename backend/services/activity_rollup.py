@@ -0,0 +1,259 @@
+import asyncio
+import asyncpg
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from core import database
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# rollup_watermarks での、このロールアップの名前
+WATERMARK_NAME = "user_daily_activity"
+
+
+class ActivityRollupService:
+    """
+    ユーザーごと・日ごとの活動数 (user_daily_activity) の集計と参照を行うサービス。
+
+    集計は前回のウォーターマークから「現在時刻 - lag」までに作成された投稿・解答だけを加算します。
+    コンテンツの削除時は subtract_content で、集計済みの投稿と解答の分を差し引きます。
+    参照時は、ロールアップ済みの日別の値と、ウォーターマーク以降のまだ集計されていない行を合算します。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def run(self, lag_seconds: float) -> Optional[dict]:
+        """
+        前回のウォーターマーク以降の投稿・解答を日別に集計して加算し、ウォーターマークを進めます。
+        ウォーターマークの行をロックするため、複数のプロセスから同時に実行しても二重に加算されません。
+
+        :param lag_seconds: 現在時刻からこの秒数より前の行までを集計する
+        :return: 処理した範囲と件数。進める範囲がない場合は None
+        """
+        async with self.conn.transaction():
+            watermark = await self.conn.fetchval(
+                "SELECT watermark FROM rollup_watermarks WHERE name = $1 FOR UPDATE", WATERMARK_NAME
+            )
+            upper = await self.conn.fetchval("SELECT NOW() - $1::interval", timedelta(seconds=lag_seconds))
+            if watermark is None or watermark >= upper:
+                return None
+
+            answers = await self.conn.fetch(
+                """
+                INSERT INTO user_daily_activity (user_id, activity_date, answers_count)
+                SELECT user_id, DATE(answered_at), COUNT(*)
+                FROM user_answers
+                WHERE answered_at > $1 AND answered_at <= $2
+                GROUP BY user_id, DATE(answered_at)
+                ON CONFLICT (user_id, activity_date) DO UPDATE
+                    SET answers_count = user_daily_activity.answers_count + EXCLUDED.answers_count
+                RETURNING 1
+                """,
+                watermark, upper
+            )
+            posts = await self.conn.fetch(
+                """
+                -- 投稿者が削除された投稿 (author_id が NULL) は集計しない
+                INSERT INTO user_daily_activity (user_id, activity_date, posts_count)
+                SELECT author_id, DATE(created_at), COUNT(*)
+                FROM contents
+                WHERE created_at > $1 AND created_at <= $2 AND author_id IS NOT NULL
+                GROUP BY author_id, DATE(created_at)
+                ON CONFLICT (user_id, activity_date) DO UPDATE
+                    SET posts_count = user_daily_activity.posts_count + EXCLUDED.posts_count
+                RETURNING 1
+                """,
+                watermark, upper
+            )
+            await self.conn.execute(
+                "UPDATE rollup_watermarks SET watermark = $2, updated_at = NOW() WHERE name = $1",
+                WATERMARK_NAME, upper
+            )
+        return {"from": watermark, "to": upper, "answer_days": len(answers), "post_days": len(posts)}
+
+    async def subtract_content(self, content_id: UUID) -> None:
+        """
+        コンテンツの削除前に呼び出し、集計済みの投稿と（カスケード削除される）解答の分だけ日別活動数を減らします。
+        コンテンツの削除と同じトランザクション内で呼び出してください。
+        ウォーターマーク以降の行はまだ集計されていないため対象外です。
+        ウォーターマークの行を共有ロックし、削除のコミットまで集計 (run) が並行して進まないようにします。
+        """
+        watermark = await self.conn.fetchval(
+            "SELECT watermark FROM rollup_watermarks WHERE name = $1 FOR SHARE", WATERMARK_NAME
+        )
+        if watermark is None:
+            return
+        await self.conn.execute(
+            """
+            UPDATE user_daily_activity d
+            SET answers_count = GREATEST(d.answers_count - a.answers_count, 0)
+            FROM (
+                SELECT user_id, DATE(answered_at) AS activity_date, COUNT(*) AS answers_count
+                FROM user_answers
+                WHERE content_id = $1 AND answered_at <= $2
+                GROUP BY user_id, DATE(answered_at)
+            ) a
+            WHERE d.user_id = a.user_id AND d.activity_date = a.activity_date
+            """,
+            content_id, watermark
+        )
+        await self.conn.execute(
+            """
+            UPDATE user_daily_activity d
+            SET posts_count = GREATEST(d.posts_count - 1, 0)
+            FROM contents c
+            WHERE c.id = $1 AND c.created_at <= $2
+              AND d.user_id = c.author_id AND d.activity_date = DATE(c.created_at)
+            """,
+            content_id, watermark
+        )
+
+    async def rebuild(self, lag_seconds: float) -> dict:
+        """
+        日別活動数を全件再集計し、ウォーターマークを「現在時刻 - lag」に設定します。
+        ウォーターマークより前の日時の行を後から投入した場合 (データの一括投入など) に使います。
+
+        :param lag_seconds: 現在時刻からこの秒数より前の行までを集計する
+        :return: 集計した範囲の上限と件数
+        """
+        async with self.conn.transaction():
+            await self.conn.execute(
+                "SELECT watermark FROM rollup_watermarks WHERE name = $1 FOR UPDATE", WATERMARK_NAME
+            )
+            upper = await self.conn.fetchval("SELECT NOW() - $1::interval", timedelta(seconds=lag_seconds))
+            await self.conn.execute("DELETE FROM user_daily_activity")
+            answers = await self.conn.fetch(
+                """
+                INSERT INTO user_daily_activity (user_id, activity_date, answers_count)
+                SELECT user_id, DATE(answered_at), COUNT(*)
+                FROM user_answers
+                WHERE answered_at <= $1
+                GROUP BY user_id, DATE(answered_at)
+                RETURNING 1
+                """,
+                upper
+            )
+            posts = await self.conn.fetch(
+                """
+                -- 投稿者が削除された投稿 (author_id が NULL) は集計しない
+                INSERT INTO user_daily_activity (user_id, activity_date, posts_count)
+                SELECT author_id, DATE(created_at), COUNT(*)
+                FROM contents
+                WHERE created_at <= $1 AND author_id IS NOT NULL
+                GROUP BY author_id, DATE(created_at)
+                ON CONFLICT (user_id, activity_date) DO UPDATE
+                    SET posts_count = EXCLUDED.posts_count
+                RETURNING 1
+                """,
+                upper
+            )
+            await self.conn.execute(
+                "UPDATE rollup_watermarks SET watermark = $2, updated_at = NOW() WHERE name = $1",
+                WATERMARK_NAME, upper
+            )
+        return {"to": upper, "answer_days": len(answers), "post_days": len(posts)}
+
+    async def get_daily_activity(self, user_ids: Sequence[UUID], days: int) -> List[Dict]:
+        """
+        指定したユーザー全体の、今日までの過去N日間の日別の投稿数・解答数を取得します。
+
+        :param user_ids: 対象のユーザーIDのリスト
+        :param days: 日数（今日を含む）
+        :return: 日付の昇順に並んだ {date, posts, answers} のリスト（活動のない日も0で含む）
+        """
+        records = await self.conn.fetch(
+            """
+            WITH date_series AS (
+                SELECT (CURRENT_DATE - generate_series(0, $1::int - 1))::date AS date
+            ),
+            wm AS (
+                SELECT COALESCE(
+                    (SELECT watermark FROM rollup_watermarks WHERE name = $3),
+                    '-infinity'::timestamptz
+                ) AS watermark
+            ),
+            rolled AS (
+                -- ロールアップ済みの日別の値 (主キー (user_id, activity_date) の範囲検索)
+                SELECT activity_date AS date, SUM(posts_count) AS posts, SUM(answers_count) AS answers
+                FROM user_daily_activity
+                WHERE user_id = ANY($2::uuid[])
+                  AND activity_date > CURRENT_DATE - $1::int
+                GROUP BY activity_date
+            ),
+            pending_posts AS (
+                -- ウォーターマーク以降のまだ集計されていない投稿
+                SELECT DATE(created_at) AS date, COUNT(*) AS posts
+                FROM contents
+                WHERE author_id = ANY($2::uuid[])
+                  AND created_at > (SELECT watermark FROM wm)
+                  AND created_at >= CURRENT_DATE - ($1::int - 1)
+                GROUP BY DATE(created_at)
+            ),
+            pending_answers AS (
+                -- ウォーターマーク以降のまだ集計されていない解答
+                SELECT DATE(answered_at) AS date, COUNT(*) AS answers
+                FROM user_answers
+                WHERE user_id = ANY($2::uuid[])
+                  AND answered_at > (SELECT watermark FROM wm)
+                  AND answered_at >= CURRENT_DATE - ($1::int - 1)
+                GROUP BY DATE(answered_at)
+            )
+            SELECT
+                ds.date::text AS date,
+                (COALESCE(r.posts, 0) + COALESCE(pp.posts, 0))::int AS posts,
+                (COALESCE(r.answers, 0) + COALESCE(pa.answers, 0))::int AS answers
+            FROM date_series ds
+            LEFT JOIN rolled r ON r.date = ds.date
+            LEFT JOIN pending_posts pp ON pp.date = ds.date
+            LEFT JOIN pending_answers pa ON pa.date = ds.date
+            ORDER BY ds.date ASC
+            """,
+            days, list(user_ids), WATERMARK_NAME
+        )
+        return [dict(record) for record in records]
+
+
+# --- アプリケーション内での定期実行 ---
+_rollup_task: Optional[asyncio.Task] = None
+
+
+async def _run_periodically(interval_seconds: float, lag_seconds: float) -> None:
+    while True:
+        try:
+            async with database.acquire() as conn:
+                await ActivityRollupService(conn).run(lag_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Activity rollup failed; retrying in %.0f seconds", interval_seconds)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_activity_rollup() -> None:
+    """
+    設定で有効になっている場合、日別活動数の定期集計を開始します。（main.py の lifespan から呼び出す）
+    """
+    global _rollup_task
+    if settings.ACTIVITY_ROLLUP_ENABLED and _rollup_task is None:
+        _rollup_task = asyncio.create_task(
+            _run_periodically(settings.ACTIVITY_ROLLUP_INTERVAL_SECONDS, settings.ACTIVITY_ROLLUP_LAG_SECONDS),
+            name="activity-rollup",
+        )
+
+
+async def stop_activity_rollup() -> None:
+    """
+    定期集計を停止します。集計はトランザクション単位のため、途中で止めても二重に加算されません。
+    """
+    global _rollup_task
+    if _rollup_task is not None:
+        _rollup_task.cancel()
+        try:
+            await _rollup_task
+        except asyncio.CancelledError:
+            pass
+        _rollup_task = None
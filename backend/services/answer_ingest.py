@@ -0,0 +1,293 @@
+import asyncio
+import asyncpg
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from core import database
+from core.config import settings
+from services.learning_stats import LearningStatsService, answer_stats_upsert_sql
+from services.trending import ANSWER_TREND_WEIGHT, TrendingService, trending_upsert_sql
+
+logger = logging.getLogger(__name__)
+
+# user_answers に書き込む列の順序
+ANSWER_COLUMNS = ["id", "user_id", "content_id", "selected_option_id", "is_correct", "answered_at"]
+
+AnswerRow = Tuple[uuid.UUID, uuid.UUID, uuid.UUID, uuid.UUID, bool, datetime]
+
+# キューの終端を表す番兵
+_STOP = object()
+
+
+def make_answer_row(
+    user_id: uuid.UUID, content_id: uuid.UUID, selected_option_id: uuid.UUID, is_correct: bool
+) -> AnswerRow:
+    """
+    user_answers の1行分のデータを作成します。IDと解答日時はリクエスト受付時点で確定させます。
+    """
+    return (uuid.uuid4(), user_id, content_id, selected_option_id, is_correct, datetime.now(timezone.utc))
+
+
+class AnswerIngestQueue:
+    """
+    解答 (user_answers) をメモリ上のキューに溜め、件数または時間を契機にまとめて書き込むパイプライン。
+
+    - キューの上限を超えた場合、enqueue は空きが出るまで待機します（バックプレッシャー）。
+    - 書き込みは copy_records_to_table で行い、失敗した場合は存在しなくなったコンテンツ等への
+      解答を除外して INSERT で書き込み直します。学習統計 (user_learning_stats) とトレンド (content_trending) も
+      同じトランザクションで更新します。
+    - DBの障害などで書き込めない場合は、間隔を空けて書き込み直します。
+    - stop() ではキューに残っている解答をすべて書き込んでから終了します。
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_queue_size: int,
+        enqueue_timeout: float,
+        max_retries: int = 0,
+        retry_backoff: float = 0.0,
+    ):
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._accepting = False
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,    # 書き込み直しても書き込めなかった・無効だった件数
+            "retries": 0,    # 書き込みに失敗して書き込み直した回数
+            "flushes": 0,
+            "rejected": 0,   # キューが満杯で受け付けられなかった件数
+        }
+
+    def start(self) -> None:
+        self._accepting = True
+        self._task = asyncio.create_task(self._run(), name="answer-ingest")
+
+    async def stop(self) -> None:
+        """
+        新規の受け付けを止め、キューに残っている解答をすべて書き込んでから終了します。
+        """
+        if self._task is None:
+            return
+        self._accepting = False
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def enqueue(self, row: AnswerRow) -> bool:
+        """
+        解答をキューに積みます。
+
+        :return: 積めた場合は True。停止中、またはキューが満杯のまま待ち時間を超えた場合は False
+                 （呼び出し元で直接書き込んでください）
+        """
+        if not self._accepting:
+            return False
+        try:
+            await asyncio.wait_for(self._queue.put(row), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._stats["rejected"] += 1
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"queue_depth": self._queue.qsize(), "max_queue_size": self._queue.maxsize, **self._stats}
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+
+            # 件数が batch_size に達するか、flush_interval が経過するまで溜める
+            batch: List[AnswerRow] = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+
+        # 停止時: 番兵の後に積まれた解答も残さず書き込む
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for i in range(0, len(remaining), self.batch_size):
+            await self._write(remaining[i:i + self.batch_size])
+
+    async def _write(self, batch: List[AnswerRow]) -> None:
+        """
+        解答をまとめて書き込みます。DBの再起動や接続の取得待ちのタイムアウトなどで失敗した場合は、
+        間隔を倍にしながら max_retries 回まで書き込み直します（その間、後続の解答はキューで待ちます）。
+        すべて失敗した場合のみ、その解答を dropped として数えます。
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                written = await self._write_once(batch)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception(
+                        "Failed to write %d buffered answers after %d attempts; dropping them",
+                        len(batch), attempt + 1
+                    )
+                    self._stats["dropped"] += len(batch)
+                    return
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(
+                    "Failed to write %d buffered answers (attempt %d); retrying in %.1f seconds",
+                    len(batch), attempt + 1, delay, exc_info=True
+                )
+                self._stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+        self._stats["flushes"] += 1
+        self._stats["written"] += len(written)
+        self._stats["dropped"] += len(batch) - len(written)
+
+    async def _write_once(self, batch: List[AnswerRow]) -> List[AnswerRow]:
+        """
+        解答を1つのトランザクションで書き込み、学習統計とトレンドを更新します。
+        行のIDはキューに積んだ時点で確定しているため、コミット済みのバッチを書き込み直しても二重にはなりません。
+
+        :return: 書き込んだ解答の行
+        """
+        async with database.acquire() as conn:
+            async with conn.transaction():
+                try:
+                    async with conn.transaction():
+                        await conn.copy_records_to_table("user_answers", records=batch, columns=ANSWER_COLUMNS)
+                    written = batch
+                except asyncpg.IntegrityConstraintViolationError as e:
+                    # 外部キー違反など（解答後にクイズが削除された場合）や、書き込み直しでの重複。
+                    # 有効で未登録の行だけを書き込み直す
+                    logger.warning("COPY into user_answers failed (%s); retrying row-wise", e)
+                    written = await self._insert_valid_rows(conn, batch)
+                # 書き込んだ解答の分だけ学習統計とトレンドを更新する（解答の書き込みと同じトランザクション）
+                await LearningStatsService(conn).add_answers(
+                    (user_id, is_correct, answered_at) for _, user_id, _, _, is_correct, answered_at in written
+                )
+                await TrendingService(conn).add_answers(
+                    (content_id, answered_at) for _, _, content_id, _, _, answered_at in written
+                )
+        return written
+
+    @staticmethod
+    async def _insert_valid_rows(conn, batch: List[AnswerRow]) -> List[AnswerRow]:
+        """
+        削除済みのユーザー・コンテンツ・選択肢への解答を除外して書き込みます。
+
+        :return: 書き込んだ解答の行
+        """
+        inserted = await conn.fetch(
+            """
+            INSERT INTO user_answers (id, user_id, content_id, selected_option_id, is_correct, answered_at)
+            SELECT a.id, a.user_id, a.content_id, a.selected_option_id, a.is_correct, a.answered_at
+            FROM unnest($1::uuid[], $2::uuid[], $3::uuid[], $4::uuid[], $5::boolean[], $6::timestamptz[])
+                AS a(id, user_id, content_id, selected_option_id, is_correct, answered_at)
+            WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = a.user_id)
+              AND EXISTS (SELECT 1 FROM contents c WHERE c.id = a.content_id)
+              AND EXISTS (SELECT 1 FROM quiz_options qo WHERE qo.id = a.selected_option_id)
+            ON CONFLICT (id) DO NOTHING
+            RETURNING id
+            """,
+            *[list(column) for column in zip(*batch)]
+        )
+        inserted_ids = {r['id'] for r in inserted}
+        return [row for row in batch if row[0] in inserted_ids]
+
+
+# --- アプリケーション全体で共有するキュー ---
+_answer_ingest: Optional[AnswerIngestQueue] = None
+
+
+def start_answer_ingest() -> None:
+    """
+    設定で有効になっている場合、解答の書き込みキューを開始します。（main.py の lifespan から呼び出す）
+    """
+    global _answer_ingest
+    if settings.ANSWER_INGEST_ENABLED and _answer_ingest is None:
+        _answer_ingest = AnswerIngestQueue(
+            batch_size=settings.ANSWER_INGEST_BATCH_SIZE,
+            flush_interval=settings.ANSWER_INGEST_FLUSH_INTERVAL,
+            max_queue_size=settings.ANSWER_INGEST_MAX_QUEUE_SIZE,
+            enqueue_timeout=settings.ANSWER_INGEST_ENQUEUE_TIMEOUT,
+            max_retries=settings.ANSWER_INGEST_MAX_RETRIES,
+            retry_backoff=settings.ANSWER_INGEST_RETRY_BACKOFF,
+        )
+        _answer_ingest.start()
+
+
+async def stop_answer_ingest() -> None:
+    """
+    キューに残っている解答を書き込んでから停止します。（コネクションプールのクローズ前に呼び出す）
+    """
+    global _answer_ingest
+    if _answer_ingest is not None:
+        await _answer_ingest.stop()
+        _answer_ingest = None
+
+
+def get_answer_ingest() -> Optional[AnswerIngestQueue]:
+    """
+    解答の書き込みキューを返します。無効の場合は None を返します。
+    """
+    return _answer_ingest
+
+
+async def record_answer(
+    conn: asyncpg.Connection,
+    user_id: uuid.UUID,
+    content_id: uuid.UUID,
+    selected_option_id: uuid.UUID,
+    is_correct: bool,
+) -> None:
+    """
+    解答を記録します。キューが有効ならキューに積み、無効・満杯の場合はこの接続で直接書き込みます。
+
+    :param conn: リクエストのDB接続（直接書き込む場合に使用）
+    """
+    row = make_answer_row(user_id, content_id, selected_option_id, is_correct)
+    ingest = get_answer_ingest()
+    if ingest is not None and await ingest.enqueue(row):
+        return
+    # 解答の書き込みと学習統計・トレンドの更新を1つの文で行う
+    trending_sql = trending_upsert_sql(
+        f"(SELECT content_id, answered_at AS occurred_at, {ANSWER_TREND_WEIGHT} AS weight FROM inserted) AS i",
+        "answer",
+    )
+    await conn.execute(
+        f"""
+        WITH inserted AS (
+            INSERT INTO user_answers ({', '.join(ANSWER_COLUMNS)})
+            VALUES ($1, $2, $3, $4, $5, $6)
+            RETURNING user_id, content_id, is_correct, answered_at
+        ),
+        trended AS ({trending_sql})
+        {answer_stats_upsert_sql("inserted")}
+        """,
+        *row
+    )
@@ -0,0 +1,54 @@
+import asyncpg
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from uuid import UUID
+
+from core.cache import get_cache
+from core.cache.tags import answer_key_key, content_tag
+from core.config import settings
+from services.queries import ANSWER_KEY
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    クイズの正誤判定に必要な情報
+    """
+    content_type: str
+    is_published: bool
+    explanation: Optional[str]
+    correct_option_id: Optional[UUID]
+    # 選択肢ID -> 正解かどうか
+    options: Dict[UUID, bool] = field(default_factory=dict)
+
+
+async def get_answer_key(conn: asyncpg.Connection, content_id: UUID) -> Optional[AnswerKey]:
+    """
+    コンテンツの解答キーを取得します。共有キャッシュ (core.cache) に無い場合のみ1回のクエリで読み込みます。
+    キャッシュには content_tag を付けるため、クイズの更新・削除時にタグを破棄すると
+    （Redisを使う場合は）すべてのワーカーで古い解答キーによる採点が止まります。
+
+    :param conn: データベース接続
+    :param content_id: コンテンツのID
+    :return: 解答キー。コンテンツが存在しない場合は None
+    """
+    async def load() -> Optional[AnswerKey]:
+        records = await ANSWER_KEY.fetch(conn, content_id)
+        if not records:
+            return None
+
+        options = {r['option_id']: bool(r['is_correct']) for r in records if r['option_id'] is not None}
+        return AnswerKey(
+            content_type=records[0]['content_type'],
+            is_published=bool(records[0]['is_published']),
+            explanation=records[0]['explanation'],
+            correct_option_id=next((option_id for option_id, correct in options.items() if correct), None),
+            options=options,
+        )
+
+    return await get_cache().get_or_load(
+        answer_key_key(content_id),
+        load,
+        ttl_seconds=settings.ANSWER_KEY_CACHE_TTL_SECONDS,
+        tags=[content_tag(content_id)],
+    )
@@ -0,0 +1,90 @@
+import asyncpg
+from typing import List, Sequence
+from uuid import UUID
+
+from schemas.content import QuizOptionCreate
+
+
+class ContentWriteService:
+    """
+    コンテンツの選択肢とタグをまとめて書き込むサービス。
+    選択肢・タグの数に関係なく、それぞれ1回のクエリで登録します。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def insert_options(self, content_id: UUID, options: Sequence[QuizOptionCreate]) -> List[dict]:
+        """
+        選択肢を配列の順序どおりの display_order で一括登録します。
+
+        :param content_id: 選択肢を登録するコンテンツのID
+        :param options: 登録する選択肢
+        :return: 登録された選択肢（display_order順）
+        """
+        if not options:
+            return []
+
+        option_records = await self.conn.fetch(
+            """
+            INSERT INTO quiz_options (content_id, option_text, is_correct, display_order)
+            SELECT $1, o.option_text, o.is_correct, o.ord - 1
+            FROM unnest($2::text[], $3::boolean[]) WITH ORDINALITY AS o(option_text, is_correct, ord)
+            RETURNING *
+            """,
+            content_id,
+            [option.option_text for option in options],
+            [option.is_correct for option in options],
+        )
+        return sorted((dict(o) for o in option_records), key=lambda o: o['display_order'])
+
+    async def replace_options(self, content_id: UUID, options: Sequence[QuizOptionCreate]) -> List[dict]:
+        """
+        既存の選択肢を削除し、新しい選択肢に置き換えます。
+        """
+        await self.conn.execute("DELETE FROM quiz_options WHERE content_id = $1", content_id)
+        return await self.insert_options(content_id, options)
+
+    async def insert_tags(self, content_id: UUID, tag_names: Sequence[str]) -> List[dict]:
+        """
+        タグ名の配列を tags に一括でupsertし、コンテンツとの関連付けも同じクエリで登録します。
+
+        :param content_id: タグを関連付けるコンテンツのID
+        :param tag_names: タグ名のリスト（重複は1つにまとめられます）
+        :return: 関連付けたタグ（id, name）の、入力順のリスト
+        """
+        unique_names = list(dict.fromkeys(tag_names))
+        if not unique_names:
+            return []
+        # 同じタグを含む投稿が同時に書き込まれてもデッドロックしないよう、
+        # 行ロックを取る順番をそろえるためにタグ名の順に upsert する
+        sorted_names = sorted(unique_names)
+
+        # DO UPDATE にすることで、既存のタグも RETURNING で返される
+        # (DO NOTHING だと、同時に作成された既存タグのIDを取得できない)
+        tag_records = await self.conn.fetch(
+            """
+            WITH upserted AS (
+                INSERT INTO tags (name)
+                SELECT unnest($2::text[])
+                ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                RETURNING id, name
+            ),
+            linked AS (
+                INSERT INTO content_tags (content_id, tag_id)
+                SELECT $1, id FROM upserted
+            )
+            SELECT id, name FROM upserted
+            """,
+            content_id, sorted_names
+        )
+        # 入力順に並べ直して返す
+        tags_by_name = {t['name']: dict(t) for t in tag_records}
+        return [tags_by_name[name] for name in unique_names if name in tags_by_name]
+
+    async def replace_tags(self, content_id: UUID, tag_names: Sequence[str]) -> List[dict]:
+        """
+        既存のタグの関連付けを削除し、新しいタグに置き換えます。
+        """
+        await self.conn.execute("DELETE FROM content_tags WHERE content_id = $1", content_id)
+        return await self.insert_tags(content_id, tag_names)
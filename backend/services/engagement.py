@@ -0,0 +1,223 @@
+import asyncpg
+from typing import Dict, List, Sequence, Tuple
+from uuid import UUID
+
+from core.cache import get_cache
+from core.cache.tags import content_tag
+from services.feed_candidates import get_feed_candidate_pool
+from services.trending import (
+    INTERACTION_TREND_WEIGHTS,
+    interaction_weight_sql,
+    trending_subtract_sql,
+    trending_upsert_sql,
+)
+
+# interaction_type と content_engagement のカウンター列の対応
+COUNTER_COLUMNS = {
+    "like": "like_count",
+    "save": "save_count",
+    "share": "share_count",
+}
+
+EMPTY_COUNTS = {column: 0 for column in COUNTER_COLUMNS.values()}
+
+# コンテンツ1件を反応数付きで取得するためのSELECT句（エイリアス c で条件を付けて使う）
+CONTENT_WITH_COUNTS_SQL = """
+    SELECT
+        c.*,
+        COALESCE(ce.like_count, 0) AS like_count,
+        COALESCE(ce.save_count, 0) AS save_count,
+        COALESCE(ce.share_count, 0) AS share_count
+    FROM contents c
+    LEFT JOIN content_engagement ce ON ce.content_id = c.id
+"""
+
+
+async def publish_interaction_change(content_id: UUID, interaction_type: str, delta: int) -> None:
+    """
+    反応の登録 (delta=1)・取消 (delta=-1) の後に呼び出し、反応数を含む詳細のキャッシュを破棄して、
+    フィードの候補のスコアに反映します。
+    """
+    await get_cache().invalidate_tags(content_tag(content_id))
+    get_feed_candidate_pool().record_interaction(content_id, interaction_type, delta)
+
+
+class EngagementService:
+    """
+    interactions（いいね・保存・共有）の登録・取消と、content_engagement のカウンターの増減を
+    1つの文で行うサービス。反応数の表示やフィードのスコア計算ではカウンターを参照します。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def add(self, user_id: UUID, content_id: UUID, interaction_type: str) -> bool:
+        """
+        反応を登録し、新規に登録された場合のみカウンターを1増やし、トレンド (content_trending) の率に加えます。
+
+        :return: 新規に登録された場合は True（既に登録済みの場合は False）
+        """
+        column = COUNTER_COLUMNS[interaction_type]
+        trending_sql = trending_upsert_sql(
+            f"(SELECT content_id, NOW() AS occurred_at, {INTERACTION_TREND_WEIGHTS[interaction_type]} AS weight "
+            "FROM inserted) AS i",
+            "interaction",
+        )
+        content_id_added = await self.conn.fetchval(
+            f"""
+            WITH inserted AS (
+                INSERT INTO interactions (user_id, content_id, interaction_type)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (user_id, content_id, interaction_type) DO NOTHING
+                RETURNING content_id
+            ),
+            counted AS (
+                INSERT INTO content_engagement (content_id, {column})
+                SELECT content_id, 1 FROM inserted
+                ON CONFLICT (content_id) DO UPDATE
+                    SET {column} = content_engagement.{column} + 1, updated_at = NOW()
+            ),
+            trended AS ({trending_sql})
+            SELECT content_id FROM inserted
+            """,
+            user_id, content_id, interaction_type
+        )
+        return content_id_added is not None
+
+    async def remove(self, user_id: UUID, content_id: UUID, interaction_type: str) -> bool:
+        """
+        反応を取り消し、実際に削除された場合のみカウンターを1減らし、トレンドの率からその反応の分を差し引きます。
+
+        :return: 削除された場合は True（登録されていなかった場合は False）
+        """
+        column = COUNTER_COLUMNS[interaction_type]
+        # 登録時にトレンドへ加えた寄与を、登録日時から求めて差し引く
+        trending_sql = trending_subtract_sql(
+            f"(SELECT content_id, created_at AS occurred_at, {INTERACTION_TREND_WEIGHTS[interaction_type]} AS weight "
+            "FROM deleted) AS d",
+            "interaction",
+        )
+        content_id_removed = await self.conn.fetchval(
+            f"""
+            WITH deleted AS (
+                DELETE FROM interactions
+                WHERE user_id = $1 AND content_id = $2 AND interaction_type = $3
+                RETURNING content_id, created_at
+            ),
+            counted AS (
+                UPDATE content_engagement ce
+                SET {column} = GREATEST(ce.{column} - 1, 0), updated_at = NOW()
+                FROM deleted d
+                WHERE ce.content_id = d.content_id
+            ),
+            trended AS ({trending_sql})
+            SELECT content_id FROM deleted
+            """,
+            user_id, content_id, interaction_type
+        )
+        return content_id_removed is not None
+
+    async def subtract_user(self, user_id: UUID) -> List[Tuple[UUID, str]]:
+        """
+        ユーザーの削除前に呼び出し、（カスケード削除される）そのユーザーの反応の分だけ
+        カウンターを減らし、トレンドの率から差し引きます。
+        ユーザーの削除と同じトランザクション内で呼び出してください。
+
+        :return: 差し引いた反応の (content_id, interaction_type) のリスト
+        """
+        counter_updates = ", ".join(
+            f"{column} = GREATEST(ce.{column} - r.{column}, 0)" for column in COUNTER_COLUMNS.values()
+        )
+        counter_filters = ", ".join(
+            f"COUNT(*) FILTER (WHERE interaction_type = '{interaction_type}') AS {column}"
+            for interaction_type, column in COUNTER_COLUMNS.items()
+        )
+        trending_sql = trending_subtract_sql(
+            f"(SELECT content_id, created_at AS occurred_at, {interaction_weight_sql()} AS weight "
+            "FROM removed) AS r",
+            "interaction",
+        )
+        records = await self.conn.fetch(
+            f"""
+            WITH removed AS (
+                SELECT content_id, interaction_type, created_at
+                FROM interactions
+                WHERE user_id = $1
+            ),
+            counted AS (
+                UPDATE content_engagement ce
+                SET {counter_updates}, updated_at = NOW()
+                FROM (SELECT content_id, {counter_filters} FROM removed GROUP BY content_id) r
+                WHERE ce.content_id = r.content_id
+            ),
+            trended AS ({trending_sql})
+            SELECT content_id, interaction_type FROM removed
+            """,
+            user_id
+        )
+        return [(r['content_id'], r['interaction_type']) for r in records]
+
+    async def get_counts(self, content_ids: Sequence[UUID]) -> Dict[UUID, dict]:
+        """
+        複数コンテンツの反応数を一括で取得します。
+
+        :return: コンテンツIDをキー、{like_count, save_count, share_count} を値とする辞書
+                 （反応が1件もないコンテンツは含まれません）
+        """
+        if not content_ids:
+            return {}
+        records = await self.conn.fetch(
+            "SELECT content_id, like_count, save_count, share_count "
+            "FROM content_engagement WHERE content_id = ANY($1::uuid[])",
+            list(content_ids)
+        )
+        return {
+            r['content_id']: {column: r[column] for column in COUNTER_COLUMNS.values()}
+            for r in records
+        }
+
+    async def reconcile(self) -> int:
+        """
+        interactions を集計し直して、値がずれているカウンターを修正します。
+        （DBを直接変更した場合など、APIを経由しない変更で生じたずれを解消する）
+
+        集計中にカウンターが更新されないよう、content_engagement をロックして実行します。
+
+        :return: 修正したカウンターの件数
+        """
+        async with self.conn.transaction():
+            await self.conn.execute("LOCK TABLE content_engagement IN SHARE ROW EXCLUSIVE MODE")
+            fixed = await self.conn.fetch(
+                """
+                WITH actual AS (
+                    SELECT
+                        content_id,
+                        COUNT(*) FILTER (WHERE interaction_type = 'like') AS like_count,
+                        COUNT(*) FILTER (WHERE interaction_type = 'save') AS save_count,
+                        COUNT(*) FILTER (WHERE interaction_type = 'share') AS share_count
+                    FROM interactions
+                    GROUP BY content_id
+                ),
+                drifted AS (
+                    SELECT
+                        COALESCE(a.content_id, ce.content_id) AS content_id,
+                        COALESCE(a.like_count, 0) AS like_count,
+                        COALESCE(a.save_count, 0) AS save_count,
+                        COALESCE(a.share_count, 0) AS share_count
+                    FROM actual a
+                    FULL JOIN content_engagement ce ON ce.content_id = a.content_id
+                    WHERE (ce.like_count, ce.save_count, ce.share_count)
+                          IS DISTINCT FROM
+                          (COALESCE(a.like_count, 0), COALESCE(a.save_count, 0), COALESCE(a.share_count, 0))
+                )
+                INSERT INTO content_engagement (content_id, like_count, save_count, share_count)
+                SELECT content_id, like_count, save_count, share_count FROM drifted
+                ON CONFLICT (content_id) DO UPDATE
+                    SET like_count = EXCLUDED.like_count,
+                        save_count = EXCLUDED.save_count,
+                        share_count = EXCLUDED.share_count,
+                        updated_at = NOW()
+                RETURNING content_id
+                """
+            )
+        return len(fixed)
@@ -0,0 +1,344 @@
+import bisect
+import heapq
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import asyncpg
+
+from core.config import settings
+from core.singleflight import SingleFlight
+
+# --- スコアリングの重み ---
+LIKE_WEIGHT = 1.0          # いいね: +1点
+SAVE_WEIGHT = 5.0          # 保存: +5点
+NEW_POST_BONUS = 5.0       # 新規投稿ボーナス (投稿後24時間以内)
+USER_LIKED_BONUS = 3.0     # 過去のエンゲージメント (ユーザー自身がいいね済み)
+EXAM_RANGE_BONUS = 15.0    # 試験範囲ボーナス (試験範囲のタグを含む)
+
+# 反応の種類ごとのスコアの重み (共有はスコアに含めない)
+INTERACTION_WEIGHTS = {"like": LIKE_WEIGHT, "save": SAVE_WEIGHT}
+
+# 新規投稿ボーナスの対象となる期間
+NEW_POST_PERIOD = timedelta(hours=24)
+# フィードの候補となる期間
+CANDIDATE_WINDOW = timedelta(days=7)
+
+# ランキングの1件: (チーム共通のスコア, 投稿日時, コンテンツID)。タプルの降順がそのまま表示順になる
+RankedEntry = Tuple[float, datetime, UUID]
+
+
+@dataclass
+class FeedCandidate:
+    """
+    フィードの候補となるコンテンツ1件の、スコア計算に必要な情報
+    """
+    id: UUID
+    created_at: datetime
+    # 反応数によるスコア (いいね・保存の数 × 重み)
+    engagement_score: float
+    tag_ids: FrozenSet[UUID]
+
+    def base_score(self, now: datetime) -> float:
+        """
+        チームによらないスコア（反応数・新規投稿ボーナス）を返します。
+        """
+        score = self.engagement_score
+        if self.created_at > now - NEW_POST_PERIOD:
+            score += NEW_POST_BONUS
+        return score
+
+
+class _Ranking:
+    """
+    RankedEntry を昇順のリストで保持し、1件の追加・削除・スコアの更新を二分探索で行うランキング
+    """
+
+    def __init__(self, entries: Iterable[RankedEntry] = ()):
+        self._entries: List[RankedEntry] = sorted(entries)
+        self._by_id: Dict[UUID, RankedEntry] = {entry[2]: entry for entry in self._entries}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, content_id: UUID) -> bool:
+        return content_id in self._by_id
+
+    def upsert(self, entry: RankedEntry) -> None:
+        self.discard(entry[2])
+        bisect.insort(self._entries, entry)
+        self._by_id[entry[2]] = entry
+
+    def discard(self, content_id: UUID) -> None:
+        old = self._by_id.pop(content_id, None)
+        if old is not None:
+            del self._entries[bisect.bisect_left(self._entries, old)]
+
+    def descending(self) -> Iterator[RankedEntry]:
+        return reversed(self._entries)
+
+
+@dataclass
+class _TeamOverlay:
+    """
+    チームごとの試験範囲のタグと、それを含む候補のランキング (EXAM_RANGE_BONUS を加えたスコア)
+    """
+    exam_tag_ids: FrozenSet[UUID]
+    expires_at: float
+    hits: _Ranking = field(default_factory=_Ranking)
+
+
+class FeedCandidatePool:
+    """
+    おすすめフィードの候補（直近 CANDIDATE_WINDOW に公開されたコンテンツ）と、
+    チーム共通のスコア順のランキングをプロセス内に保持する集計。
+
+    ランキングは全チームで共有する部分（反応数・新規投稿ボーナス）と、チームごとの試験範囲の候補に分けて保持し、
+    チームのランキングは両者を併合して求めます（チーム数 × 候補数の行を持たない）。
+    このプロセスでの投稿・削除・タグの変更・反応の登録と取消は、呼び出し元が各メソッドで即座に反映します。
+    他のワーカーでの変更やAPIを経由しない変更を取り込むため、ttl_seconds ごとにDBから読み込み直します。
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._candidates: Dict[UUID, FeedCandidate] = {}
+        self._ranking = _Ranking()
+        self._teams: Dict[Optional[UUID], _TeamOverlay] = {}
+        self._loaded = False
+        self._expires_at = 0.0
+        # 次にランキングを並べ直す時刻 (新規投稿ボーナスの終了・候補期間の終了のうち最も早いもの)
+        self._reorder_at: Optional[datetime] = None
+        # 変更を反映するたびに進める世代番号 (読み込み中の変更の検出に使用)
+        self._generation = 0
+        self._flight: SingleFlight[None] = SingleFlight()
+        self._exam_tags_flight: SingleFlight[FrozenSet[UUID]] = SingleFlight()
+        self.loads = 0
+        self.updates = 0
+
+    # --- 参照 ---
+
+    async def top_entries(
+        self, conn: asyncpg.Connection, team_id: Optional[UUID], count: int, slack: float = 0.0
+    ) -> List[RankedEntry]:
+        """
+        チームのランキングの上位 count 件と、count 番目のスコアから slack を引いた値以上の後続の候補を返します。
+        ユーザーごとの加点（最大 slack）を重ねても上位 count 件に入り得る候補だけを返すために使います。
+
+        :param team_id: チームのID（未所属の場合は None。試験範囲ボーナスなし）
+        :param count: 必要な上位件数
+        :param slack: 呼び出し側で加算し得るスコアの最大値
+        :return: スコアの降順のエントリ
+        """
+        await self._ensure_fresh(conn)
+        overlay = await self._team_overlay(conn, team_id)
+
+        # 以降は await しないため、併合中にランキングが変更されることはない
+        shared = (entry for entry in self._ranking.descending() if entry[2] not in overlay.hits)
+        entries: List[RankedEntry] = []
+        for entry in heapq.merge(shared, overlay.hits.descending(), reverse=True):
+            if len(entries) >= count and entry[0] < entries[count - 1][0] - slack:
+                break
+            entries.append(entry)
+        return entries
+
+    async def _ensure_fresh(self, conn: asyncpg.Connection) -> None:
+        if not self._loaded or time.monotonic() >= self._expires_at:
+            await self._flight.do(None, lambda: self._load(conn))
+        now = datetime.now(timezone.utc)
+        if self._reorder_at is not None and now >= self._reorder_at:
+            self._rebuild(now)
+
+    async def _load(self, conn: asyncpg.Connection) -> None:
+        """
+        候補と反応数によるスコアをDBから読み込み、ランキングを作り直します。
+        """
+        generation = self._generation
+        now = datetime.now(timezone.utc)
+        records = await conn.fetch(
+            f"""
+            SELECT
+                c.id, c.created_at,
+                (COALESCE(ce.like_count, 0) * {LIKE_WEIGHT}
+                 + COALESCE(ce.save_count, 0) * {SAVE_WEIGHT})::float8 AS engagement_score,
+                ARRAY(SELECT ct.tag_id FROM content_tags ct WHERE ct.content_id = c.id) AS tag_ids
+            FROM contents c
+            LEFT JOIN content_engagement ce ON ce.content_id = c.id
+            WHERE c.is_published = TRUE
+              AND c.author_id IS NOT NULL
+              AND c.created_at > $1
+            """,
+            now - CANDIDATE_WINDOW
+        )
+        self._candidates = {
+            r['id']: FeedCandidate(r['id'], r['created_at'], r['engagement_score'], frozenset(r['tag_ids']))
+            for r in records
+        }
+        # 試験範囲の設定も読み込み直す
+        self._teams.clear()
+        self._rebuild(now)
+        self._loaded = True
+        self.loads += 1
+        # 読み込み中に反映された変更は読み込んだ内容に含まれない可能性があるため、次の参照時に読み込み直す
+        self._expires_at = time.monotonic() + (self.ttl_seconds if generation == self._generation else 0.0)
+
+    def _rebuild(self, now: datetime) -> None:
+        """
+        候補期間を過ぎた候補を除き、現在時刻のスコアでランキングを並べ直します。
+        """
+        self._candidates = {
+            content_id: candidate for content_id, candidate in self._candidates.items()
+            if candidate.created_at > now - CANDIDATE_WINDOW
+        }
+        self._ranking = _Ranking(
+            (candidate.base_score(now), candidate.created_at, candidate.id)
+            for candidate in self._candidates.values()
+        )
+        for overlay in self._teams.values():
+            overlay.hits = self._exam_hits(overlay.exam_tag_ids, now)
+
+        boundaries = [candidate.created_at + CANDIDATE_WINDOW for candidate in self._candidates.values()]
+        boundaries.extend(
+            candidate.created_at + NEW_POST_PERIOD for candidate in self._candidates.values()
+            if candidate.created_at + NEW_POST_PERIOD > now
+        )
+        self._reorder_at = min(boundaries, default=None)
+
+    def _exam_hits(self, exam_tag_ids: FrozenSet[UUID], now: datetime) -> _Ranking:
+        if not exam_tag_ids:
+            return _Ranking()
+        return _Ranking(
+            (candidate.base_score(now) + EXAM_RANGE_BONUS, candidate.created_at, candidate.id)
+            for candidate in self._candidates.values()
+            if candidate.tag_ids & exam_tag_ids
+        )
+
+    async def _team_overlay(self, conn: asyncpg.Connection, team_id: Optional[UUID]) -> _TeamOverlay:
+        overlay = self._teams.get(team_id)
+        if overlay is None or time.monotonic() >= overlay.expires_at:
+            if team_id is None:
+                exam_tag_ids: FrozenSet[UUID] = frozenset()
+            else:
+                exam_tag_ids = await self._exam_tags_flight.do(
+                    team_id, lambda: self._load_exam_tags(conn, team_id)
+                )
+            overlay = _TeamOverlay(exam_tag_ids, time.monotonic() + self.ttl_seconds)
+            overlay.hits = self._exam_hits(exam_tag_ids, datetime.now(timezone.utc))
+            self._teams[team_id] = overlay
+        return overlay
+
+    @staticmethod
+    async def _load_exam_tags(conn: asyncpg.Connection, team_id: UUID) -> FrozenSet[UUID]:
+        """
+        チームの現在有効な試験範囲に設定されているタグを取得します。
+        """
+        records = await conn.fetch(
+            """
+            SELECT DISTINCT sst.tag_id
+            FROM study_settings ss
+            JOIN study_setting_tags sst ON sst.study_setting_id = ss.id
+            WHERE ss.team_id = $1
+              AND ss.exam_range_start <= CURRENT_DATE
+              AND ss.exam_range_end >= CURRENT_DATE
+            """,
+            team_id
+        )
+        return frozenset(r['tag_id'] for r in records)
+
+    # --- 変更の反映 (書き込みのコミット後に呼び出す) ---
+
+    def record_interaction(self, content_id: UUID, interaction_type: str, delta: int) -> None:
+        """
+        反応の登録 (delta=1)・取消 (delta=-1) を候補のスコアに反映します。
+        """
+        weight = INTERACTION_WEIGHTS.get(interaction_type)
+        candidate = self._candidates.get(content_id)
+        if not weight or candidate is None:
+            return
+        candidate.engagement_score = max(candidate.engagement_score + weight * delta, 0.0)
+        self._reposition(candidate)
+
+    def add_content(self, content_id: UUID, created_at: datetime, tag_ids: Sequence[UUID]) -> None:
+        """
+        新しく公開されたコンテンツを候補に追加します。
+        """
+        if not self._loaded:
+            return
+        candidate = FeedCandidate(content_id, created_at, 0.0, frozenset(tag_ids))
+        self._candidates[content_id] = candidate
+        self._reposition(candidate)
+        new_post_ends = created_at + NEW_POST_PERIOD
+        if self._reorder_at is None or new_post_ends < self._reorder_at:
+            self._reorder_at = new_post_ends
+
+    def update_content_tags(self, content_id: UUID, tag_ids: Sequence[UUID]) -> None:
+        """
+        候補のタグの変更を、チームごとの試験範囲の候補に反映します。
+        """
+        candidate = self._candidates.get(content_id)
+        if candidate is None:
+            return
+        candidate.tag_ids = frozenset(tag_ids)
+        self._reposition(candidate)
+
+    def remove_content(self, content_id: UUID) -> None:
+        """
+        削除されたコンテンツを候補から除きます。
+        """
+        if self._candidates.pop(content_id, None) is None:
+            return
+        self._ranking.discard(content_id)
+        for overlay in self._teams.values():
+            overlay.hits.discard(content_id)
+        self._changed()
+
+    def invalidate_team(self, team_id: UUID) -> None:
+        """
+        チームの試験範囲の設定が変わった場合に、次の参照時に読み込み直すようにします。
+        """
+        self._teams.pop(team_id, None)
+        self._changed()
+
+    def clear(self) -> None:
+        """
+        保持している候補をすべて破棄します。次の参照時にDBから読み込み直します。
+        """
+        self._candidates.clear()
+        self._ranking = _Ranking()
+        self._teams.clear()
+        self._loaded = False
+        self._reorder_at = None
+        self._changed()
+
+    def _reposition(self, candidate: FeedCandidate) -> None:
+        now = datetime.now(timezone.utc)
+        entry = (candidate.base_score(now), candidate.created_at, candidate.id)
+        self._ranking.upsert(entry)
+        for overlay in self._teams.values():
+            if candidate.tag_ids & overlay.exam_tag_ids:
+                overlay.hits.upsert((entry[0] + EXAM_RANGE_BONUS, entry[1], entry[2]))
+            else:
+                overlay.hits.discard(candidate.id)
+        self._changed()
+
+    def _changed(self) -> None:
+        self._generation += 1
+        self.updates += 1
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "candidates": len(self._candidates),
+            "teams": len(self._teams),
+            "loads": self.loads,
+            "updates": self.updates,
+            "coalesced_loads": self._flight.coalesced + self._exam_tags_flight.coalesced,
+        }
+
+
+_pool = FeedCandidatePool(ttl_seconds=settings.FEED_CANDIDATE_TTL_SECONDS)
+
+
+def get_feed_candidate_pool() -> FeedCandidatePool:
+    return _pool
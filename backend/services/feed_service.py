@@ -1,103 +1,138 @@
 import asyncpg
-from typing import List, Dict
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Set, Tuple
 from uuid import UUID
 
+from services.feed_candidates import CANDIDATE_WINDOW, USER_LIKED_BONUS, get_feed_candidate_pool
+from services.queries import FEED_OLDER_PAGE, USER_TEAM
+
+
 class FeedService:
     def __init__(self, conn: asyncpg.Connection):
         self.conn = conn
 
-    async def get_scored_feed_for_user(self, user_id: UUID, team_id: UUID) -> List[Dict]:
+    async def get_scored_feed_for_user(
+        self, user_id: UUID, team_id: Optional[UUID] = None, limit: int = 20, offset: int = 0
+    ) -> List[Dict]:
         """
-        指定されたユーザーのためのおすすめフィードをスコア計算して取得します。
+        指定されたユーザーのためのおすすめフィードをスコア順に取得します。
+
+        ユーザーによらない部分（反応数・新規投稿・試験範囲）のスコアは、services/feed_candidates.py が
+        チームごとのランキングとして保持しているものを使います。
+        ユーザー自身のいいねによるボーナスは、その上位の候補に重ねて計算します。
 
         :param user_id: フィードを閲覧するユーザーのID
-        :param team_id: ユーザーが所属するチームのID
-        :return: スコア順にソートされたコンテンツのリスト
+        :param team_id: ユーザーが所属するチームのID。省略時はユーザーの所属チームを使用します
+        :param limit: 取得する件数
+        :param offset: 読み飛ばす上位の件数
+        :return: スコア順にソートされたコンテンツのリスト（"score" と "author_nickname" を含む）
         """
-        # 1. チームの試験範囲設定を取得
-        exam_tags = await self._get_exam_tags(team_id)
+        ranked = await self._rank(user_id, team_id, limit, offset)
+        return await self._load_ranked(ranked)
 
-        # 2. フィードに表示する候補となるコンテンツを取得 (例: 直近1週間の投稿)
-        contents = await self.conn.fetch(
-            """
-            SELECT c.*, u.nickname as author_nickname
-            FROM contents c
-            JOIN users u ON c.author_id = u.id
-            WHERE c.is_published = TRUE AND c.created_at > NOW() - INTERVAL '7 days'
-            """
-        )
+    async def _rank(
+        self, user_id: UUID, team_id: Optional[UUID], limit: int, offset: int
+    ) -> List[Tuple[float, datetime, UUID]]:
+        """
+        ユーザーのいいねのボーナスを加えた候補の順位のうち、offset 番目から limit 件を返します。
 
-        # 3. 各コンテンツのスコアを非同期で計算
-        scored_contents = []
-        for content in contents:
-            score = await self._calculate_score(content, user_id, exam_tags)
-            scored_contents.append({**content, "score": score})
+        :return: (スコア, 作成日時, コンテンツID) のリスト
+        """
+        if team_id is None:
+            team_id = await USER_TEAM.fetchval(self.conn, user_id)
 
-        # 4. スコアの高い順にソート
-        scored_contents.sort(key=lambda x: x['score'], reverse=True)
+        # ユーザーのいいねで加算されるのは最大 USER_LIKED_BONUS のため、それを加えても上位に入り得る候補だけを受け取る
+        entries = await get_feed_candidate_pool().top_entries(
+            self.conn, team_id, offset + limit, slack=USER_LIKED_BONUS
+        )
+        liked_ids = await self._load_user_likes(user_id, [content_id for _, _, content_id in entries])
 
-        return scored_contents
+        return sorted(
+            (
+                (score + (USER_LIKED_BONUS if content_id in liked_ids else 0.0), created_at, content_id)
+                for score, created_at, content_id in entries
+            ),
+            reverse=True,
+        )[offset:offset + limit]
 
-    async def _calculate_score(self, content: asyncpg.Record, user_id: UUID, exam_tags: set) -> float:
+    async def _load_ranked(self, ranked: List[Tuple[float, datetime, UUID]]) -> List[Dict]:
         """
-        個別のコンテンツのスコアを計算する内部メソッド。
+        順位の並びのとおりにコンテンツを読み込みます。
         """
-        score = 0.0
+        if not ranked:
+            return []
 
-        # --- (1) 投稿に関する情報 ---
-        # 反応数 (エンゲージメント)
-        interactions = await self.conn.fetch(
-            "SELECT interaction_type, COUNT(*) as count FROM interactions WHERE content_id = $1 GROUP BY interaction_type",
-            content['id']
-        )
-        for interaction in interactions:
-            if interaction['interaction_type'] == 'like':
-                score += interaction['count'] * 1.0  # いいね: +1点
-            elif interaction['interaction_type'] == 'save':
-                score += interaction['count'] * 5.0  # 保存: +5点
-
-        # 新規投稿ボーナス (投稿後24時間以内)
-        if (content['created_at'].replace(tzinfo=None) - content['created_at'].replace(tzinfo=None)).total_seconds() < 86400:
-            score += 5.0
-
-        # --- (2) ユーザーの行動履歴 (簡易版) ---
-        # ユーザーがこの投稿に「いいね」しているか
-        user_liked = await self.conn.fetchval(
-            "SELECT 1 FROM interactions WHERE content_id = $1 AND user_id = $2 AND interaction_type = 'like'",
-            content['id'], user_id
-        )
-        if user_liked:
-            score += 3.0 # 過去のエンゲージメント
+        # TODO: 虚偽情報などのペナルティ処理を実装
 
-        # --- (3) 定期試験や出来事の反映 ---
-        content_tags = await self.conn.fetch(
-            "SELECT t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1",
-            content['id']
+        records = await self.conn.fetch(
+            """
+            SELECT c.*, u.nickname AS author_nickname
+            FROM contents c
+            JOIN users u ON c.author_id = u.id
+            WHERE c.id = ANY($1::uuid[]) AND c.is_published = TRUE
+            """,
+            [content_id for _, _, content_id in ranked]
         )
-        content_tag_names = {tag['name'] for tag in content_tags}
-        
-        # 試験範囲ボーナス (試験範囲のタグが含まれていれば高スコア)
-        if not exam_tags.isdisjoint(content_tag_names):
-            score += 15.0
+        # 他のワーカーで削除されたばかりのコンテンツは、候補が読み込み直されるまで結果から除かれる
+        records_by_id = {r['id']: r for r in records}
+        return [
+            {**dict(records_by_id[content_id]), "score": score}
+            for score, _, content_id in ranked
+            if content_id in records_by_id
+        ]
 
-        # TODO: 虚偽情報などのペナルティ処理を実装
+    async def get_feed_page(
+        self,
+        user_id: UUID,
+        limit: int,
+        ranked_offset: int = 0,
+        older_after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> Tuple[List[Dict], Optional[Tuple[int, Optional[datetime], Optional[UUID]]]]:
+        """
+        おすすめフィードの1ページを取得します。
+        スコア順の候補を読み終えた後は、候補期間より前の投稿を新しい順で続けます。
 
-        return score
+        候補の一部が返せない（削除された・投稿者が削除された）場合も位置がずれないよう、
+        スコア順の候補は読んだ件数で、候補期間より前の投稿は最後に返した行の (created_at, id) で位置を表します。
+        候補期間の境界は時刻とともに進むため、後者は件数ではなくキーセットで続きを読みます。
+        そのため、候補を除いた分だけページの件数が limit より少なくなることがあります。
 
-    async def _get_exam_tags(self, team_id: UUID) -> set:
+        :param limit: ページの件数
+        :param ranked_offset: スコア順の候補のうち、それまでのページで読んだ件数
+        :param older_after: 候補期間より前の投稿のうち、それまでのページで最後に返した行の (created_at, id)
+        :return: (ページのコンテンツのリスト,
+                  次ページの (ranked_offset, 最後に返した投稿の created_at, id)。続きがない場合は None)
         """
-        現在有効な試験範囲に設定されているタグのセットを取得します。
+        after_created_at, after_id = older_after or (None, None)
+        ranked = await self._rank(user_id, None, limit + 1, ranked_offset)
+        page_ranked = ranked[:limit]
+        records = await self._load_ranked(page_ranked)
+        ranked_offset += len(page_ranked)
+        if len(ranked) > limit:
+            return records, (ranked_offset, after_created_at, after_id)
+
+        # 候補期間の投稿はすべてスコア順の候補に含まれるため、それより前の投稿だけを補う
+        remaining = limit - len(records)
+        older_records = await FEED_OLDER_PAGE.fetch(
+            self.conn, datetime.now(timezone.utc) - CANDIDATE_WINDOW, remaining + 1, after_created_at, after_id
+        )
+        page_older = older_records[:remaining]
+        records.extend(page_older)
+        if page_older:
+            after_created_at, after_id = page_older[-1]['created_at'], page_older[-1]['id']
+        if len(older_records) > remaining:
+            return records, (ranked_offset, after_created_at, after_id)
+        return records, None
+
+    async def _load_user_likes(self, user_id: UUID, content_ids: List[UUID]) -> Set[UUID]:
         """
-        tag_records = await self.conn.fetch(
-            """
-            SELECT t.name
-            FROM study_setting_tags sst
-            JOIN tags t ON sst.tag_id = t.id
-            JOIN study_settings ss ON sst.study_setting_id = ss.id
-            WHERE ss.team_id = $1
-              AND ss.exam_range_start <= NOW()
-              AND ss.exam_range_end >= NOW()
-            """,
-            team_id
+        候補のうち、ユーザー自身がいいね済みのコンテンツIDを取得します。
+        """
+        if not content_ids:
+            return set()
+        records = await self.conn.fetch(
+            "SELECT content_id FROM interactions "
+            "WHERE user_id = $1 AND interaction_type = 'like' AND content_id = ANY($2::uuid[])",
+            user_id, content_ids
         )
-        return {record['name'] for record in tag_records}
\ No newline at end of file
+        return {r['content_id'] for r in records}
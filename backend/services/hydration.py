@@ -0,0 +1,82 @@
+import asyncpg
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence
+from uuid import UUID
+
+from services.engagement import EMPTY_COUNTS, EngagementService
+from services.queries import CONTENTS_OPTIONS
+
+
+class HydrationService:
+    """
+    コンテンツ一覧に選択肢（quiz_options）・タグ（content_tags）・反応数（content_engagement）を
+    まとめて付与するサービス。
+    件数に関係なく、テーブルごとに1回の `= ANY($1)` クエリで取得してメモリ上でグルーピングします。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def load_options(self, content_ids: Sequence[UUID]) -> Dict[UUID, List[dict]]:
+        """
+        複数コンテンツの選択肢を一括で取得します。
+
+        :param content_ids: 選択肢を取得するコンテンツIDのリスト
+        :return: コンテンツIDをキー、表示順に並んだ選択肢のリストを値とする辞書
+        """
+        options_by_content: Dict[UUID, List[dict]] = defaultdict(list)
+        if not content_ids:
+            return options_by_content
+
+        option_records = await CONTENTS_OPTIONS.fetch(self.conn, list(content_ids))
+        for record in option_records:
+            options_by_content[record['content_id']].append(dict(record))
+        return options_by_content
+
+    async def load_tags(self, content_ids: Sequence[UUID]) -> Dict[UUID, List[dict]]:
+        """
+        複数コンテンツのタグを一括で取得します。
+
+        :param content_ids: タグを取得するコンテンツIDのリスト
+        :return: コンテンツIDをキー、タグ（id, name）のリストを値とする辞書
+        """
+        tags_by_content: Dict[UUID, List[dict]] = defaultdict(list)
+        if not content_ids:
+            return tags_by_content
+
+        tag_records = await self.conn.fetch(
+            """
+            SELECT ct.content_id, t.id, t.name
+            FROM content_tags ct
+            JOIN tags t ON t.id = ct.tag_id
+            WHERE ct.content_id = ANY($1::uuid[])
+            ORDER BY ct.content_id, t.name
+            """,
+            list(content_ids)
+        )
+        for record in tag_records:
+            tags_by_content[record['content_id']].append({"id": record['id'], "name": record['name']})
+        return tags_by_content
+
+    async def hydrate(self, records: Iterable[asyncpg.Record]) -> List[dict]:
+        """
+        contentsテーブルのレコード列を、タグと（クイズの場合は）選択肢付きの辞書に変換します。
+        レコードの並び順はそのまま維持されます。
+
+        :param records: contentsテーブルのレコード（id と content_type を含むこと）
+        :return: "tags"・反応数（およびクイズの場合は "options"）を付与した辞書のリスト
+        """
+        items = [dict(record) for record in records]
+        content_ids = [item['id'] for item in items]
+        quiz_ids = [item['id'] for item in items if item['content_type'] == 'quiz']
+
+        options_by_content = await self.load_options(quiz_ids)
+        tags_by_content = await self.load_tags(content_ids)
+        counts_by_content = await EngagementService(self.conn).get_counts(content_ids)
+
+        for item in items:
+            item['tags'] = tags_by_content.get(item['id'], [])
+            item.update(counts_by_content.get(item['id'], EMPTY_COUNTS))
+            if item['content_type'] == 'quiz':
+                item['options'] = options_by_content.get(item['id'], [])
+        return items
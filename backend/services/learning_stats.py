@@ -0,0 +1,192 @@
+import asyncpg
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from uuid import UUID
+
+EMPTY_STATS = {
+    "answers_count": 0,
+    "correct_answers_count": 0,
+    "posts_count": 0,
+    "last_activity_at": None,
+}
+
+
+def answer_stats_upsert_sql(source: str) -> str:
+    """
+    解答の行 (user_id, is_correct, answered_at) の集合から user_learning_stats を増分更新するSQLを返します。
+    解答を書き込む文のCTEと組み合わせて、書き込みと統計の更新を1つの文で行うために使います。
+
+    :param source: 解答の行を返すFROM句の対象（CTE名や unnest(...) AS a(...) など）
+    """
+    return f"""
+    INSERT INTO user_learning_stats (user_id, answers_count, correct_answers_count, last_activity_at)
+    SELECT user_id, COUNT(*), COUNT(*) FILTER (WHERE is_correct), MAX(answered_at)
+    FROM {source}
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        answers_count = user_learning_stats.answers_count + EXCLUDED.answers_count,
+        correct_answers_count = user_learning_stats.correct_answers_count + EXCLUDED.correct_answers_count,
+        last_activity_at = GREATEST(user_learning_stats.last_activity_at, EXCLUDED.last_activity_at),
+        updated_at = NOW()
+    """
+
+
+def accuracy(correct_answers: int, total_answered: int) -> float:
+    """
+    正答率（%、小数第2位まで）を計算します。解答がない場合は 0.0 を返します。
+    """
+    if total_answered <= 0:
+        return 0.0
+    return round((correct_answers / total_answered) * 100, 2)
+
+
+class LearningStatsService:
+    """
+    user_learning_stats（ユーザーごとの解答数・正解数・投稿数・最終活動日時）の読み書きを行うサービス。
+    統計は解答・投稿の書き込み時に増分で更新され、参照は主キーでの検索のみで行います。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def get(self, user_id: UUID) -> dict:
+        """
+        1ユーザーの統計を取得します。統計の行がない場合はゼロの統計を返します。
+        """
+        record = await self.conn.fetchrow(
+            "SELECT answers_count, correct_answers_count, posts_count, last_activity_at "
+            "FROM user_learning_stats WHERE user_id = $1",
+            user_id
+        )
+        return dict(record) if record else dict(EMPTY_STATS)
+
+    async def get_many(self, user_ids: Sequence[UUID]) -> Dict[UUID, dict]:
+        """
+        複数ユーザーの統計を一括で取得します。（統計の行がないユーザーは含まれません）
+        """
+        if not user_ids:
+            return {}
+        records = await self.conn.fetch(
+            "SELECT user_id, answers_count, correct_answers_count, posts_count, last_activity_at "
+            "FROM user_learning_stats WHERE user_id = ANY($1::uuid[])",
+            list(user_ids)
+        )
+        return {r['user_id']: {k: v for k, v in r.items() if k != 'user_id'} for r in records}
+
+    async def add_answers(self, answers: Iterable[Tuple[UUID, bool, datetime]]) -> None:
+        """
+        書き込まれた解答の分だけ統計を増やします。
+
+        :param answers: (user_id, is_correct, answered_at) の行
+        """
+        answers = list(answers)
+        if not answers:
+            return
+        user_ids, is_corrects, answered_ats = (list(column) for column in zip(*answers))
+        await self.conn.execute(
+            answer_stats_upsert_sql(
+                "unnest($1::uuid[], $2::boolean[], $3::timestamptz[]) AS a(user_id, is_correct, answered_at)"
+            ),
+            user_ids, is_corrects, answered_ats
+        )
+
+    async def add_post(self, author_id: UUID, created_at: Optional[datetime]) -> None:
+        """
+        投稿数を1増やし、最終活動日時を更新します。
+        """
+        await self.conn.execute(
+            """
+            INSERT INTO user_learning_stats (user_id, posts_count, last_activity_at)
+            VALUES ($1, 1, $2)
+            ON CONFLICT (user_id) DO UPDATE SET
+                posts_count = user_learning_stats.posts_count + 1,
+                last_activity_at = GREATEST(user_learning_stats.last_activity_at, EXCLUDED.last_activity_at),
+                updated_at = NOW()
+            """,
+            author_id, created_at
+        )
+
+    async def subtract_content(self, content_id: UUID) -> None:
+        """
+        コンテンツの削除前に呼び出し、その投稿と（カスケード削除される）解答の分だけ統計を減らします。
+        コンテンツの削除と同じトランザクション内で呼び出してください。
+        最終活動日時は変更しません（再構築時に再計算されます）。
+        """
+        await self.conn.execute(
+            """
+            UPDATE user_learning_stats s
+            SET answers_count = GREATEST(s.answers_count - a.answers_count, 0),
+                correct_answers_count = GREATEST(s.correct_answers_count - a.correct_answers_count, 0),
+                updated_at = NOW()
+            FROM (
+                SELECT user_id, COUNT(*) AS answers_count, COUNT(*) FILTER (WHERE is_correct) AS correct_answers_count
+                FROM user_answers
+                WHERE content_id = $1
+                GROUP BY user_id
+            ) a
+            WHERE s.user_id = a.user_id
+            """,
+            content_id
+        )
+        await self.conn.execute(
+            """
+            UPDATE user_learning_stats s
+            SET posts_count = GREATEST(s.posts_count - 1, 0), updated_at = NOW()
+            FROM contents c
+            WHERE c.id = $1 AND s.user_id = c.author_id
+            """,
+            content_id
+        )
+
+    async def rebuild(self) -> int:
+        """
+        user_answers と contents から全ユーザーの統計を再計算します。
+        集計中に統計が更新されないよう、user_learning_stats をロックして実行します。
+
+        :return: 書き込んだ統計の行数
+        """
+        async with self.conn.transaction():
+            await self.conn.execute("LOCK TABLE user_learning_stats IN SHARE ROW EXCLUSIVE MODE")
+            await self.conn.execute(
+                """
+                DELETE FROM user_learning_stats s
+                WHERE NOT EXISTS (SELECT 1 FROM user_answers ua WHERE ua.user_id = s.user_id)
+                  AND NOT EXISTS (SELECT 1 FROM contents c WHERE c.author_id = s.user_id)
+                """
+            )
+            rebuilt = await self.conn.fetch(
+                """
+                INSERT INTO user_learning_stats
+                    (user_id, answers_count, correct_answers_count, posts_count, last_activity_at)
+                SELECT
+                    COALESCE(a.user_id, p.author_id),
+                    COALESCE(a.answers_count, 0),
+                    COALESCE(a.correct_answers_count, 0),
+                    COALESCE(p.posts_count, 0),
+                    GREATEST(a.last_answered_at, p.last_posted_at)
+                FROM (
+                    SELECT
+                        user_id,
+                        COUNT(*) AS answers_count,
+                        COUNT(*) FILTER (WHERE is_correct) AS correct_answers_count,
+                        MAX(answered_at) AS last_answered_at
+                    FROM user_answers
+                    GROUP BY user_id
+                ) a
+                FULL JOIN (
+                    -- 投稿者が削除された投稿 (author_id が NULL) は集計しない
+                    SELECT author_id, COUNT(*) AS posts_count, MAX(created_at) AS last_posted_at
+                    FROM contents
+                    WHERE author_id IS NOT NULL
+                    GROUP BY author_id
+                ) p ON p.author_id = a.user_id
+                ON CONFLICT (user_id) DO UPDATE SET
+                    answers_count = EXCLUDED.answers_count,
+                    correct_answers_count = EXCLUDED.correct_answers_count,
+                    posts_count = EXCLUDED.posts_count,
+                    last_activity_at = EXCLUDED.last_activity_at,
+                    updated_at = NOW()
+                RETURNING user_id
+                """
+            )
+        return len(rebuilt)
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from core.cache import get_cache
+from core.cache.tags import public_feed_key, public_feed_tag
+from core.config import settings
+
+# 公開フィードの1ページ (反応数を含まないコンテンツのリスト, 次ページのカーソル)
+PublicFeedPage = Tuple[List[dict], Optional[str]]
+
+
+async def get_public_feed_page(
+    limit: int, cursor: Optional[str], loader: Callable[[], Awaitable[PublicFeedPage]]
+) -> PublicFeedPage:
+    """
+    公開フィードの1ページを共有キャッシュ (core.cache) から取得し、無い場合は loader で読み込んで保存します。
+    反応数はリクエストごとに変わるためキャッシュには含めず、呼び出し側で付与してください。
+    返されるリストは他のリクエストと共有されるため、変更せずにコピーして使ってください。
+    """
+    return await get_cache().get_or_load(
+        public_feed_key(limit, cursor),
+        loader,
+        ttl_seconds=settings.PUBLIC_FEED_CACHE_TTL_SECONDS,
+        tags=[public_feed_tag()],
+    )
+
+
+async def invalidate_public_feed() -> None:
+    """
+    公開フィードのキャッシュをすべて破棄します。（コンテンツの作成・更新・削除時に呼び出す）
+    """
+    await get_cache().invalidate_tags(public_feed_tag())
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    """
+    条件付きリクエスト (If-None-Match) に対して 304 を返せるかを判定します。
+    ETag は本文のハッシュのためワーカー間で一致しますが、更新時刻はワーカーごとに異なるため
+    Last-Modified / If-Modified-Since は使いません。
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def conditional_response(request: Request, payload: Any, headers: Dict[str, str]) -> Response:
+    """
+    レスポンスの内容をJSONに変換し、本文のハッシュを ETag として付けて返します。
+    クライアントが同じ内容を持っている場合は本文なしの 304 を返します。
+
+    :param payload: レスポンスの内容
+    :param headers: 一緒に返すヘッダー（次ページのカーソルなど）
+    """
+    # FastAPI の JSONResponse と同じ形式でシリアライズする
+    body = json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    response_headers = {
+        **headers,
+        "ETag": etag,
+        # 共有キャッシュにも保存させるが、毎回 ETag で再検証させる
+        "Cache-Control": "public, no-cache",
+    }
+    if _is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+    return Response(content=body, media_type="application/json", headers=response_headers)
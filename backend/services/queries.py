@@ -0,0 +1,232 @@
+from typing import Any, Dict, List, Sequence
+
+from core.pagination import keyset_condition
+from core.queries import register_query
+from services.engagement import CONTENT_WITH_COUNTS_SQL
+
+# 頻繁に実行されるSQL文の一覧。
+# ここで登録した文は、コネクションプールの各接続の初期化時に準備されます（core/queries.py）。
+# 実行回数・実行時間は GET /admin/system/queries で確認できます。
+# インデックスを使っているかは scripts/explain_check.py がこの文そのものを EXPLAIN して検証します。
+
+
+def partial_update_args(data: Dict[str, Any], fields: Sequence[str]) -> List[Any]:
+    """
+    部分更新の文に渡す (更新するかどうか, 値) の引数の並びを作ります。
+    SET 句を動的に組み立てずに、常に同じSQL文で部分更新するために使います。
+
+    :param data: 更新する項目（model_dump(exclude_unset=True) の結果など）
+    :param fields: 文の引数の順に並べた項目名
+    :return: [項目1を更新するか, 項目1の値, 項目2を更新するか, ...]
+    """
+    args: List[Any] = []
+    for field in fields:
+        args.append(field in data)
+        args.append(data.get(field))
+    return args
+
+
+# --- ユーザー ---
+USER_BY_EMAIL = register_query(
+    "user_by_email",
+    "SELECT * FROM users WHERE email = $1",
+)
+
+# 指定した値 (NULL 以外) のみを更新する
+UPDATE_USER_PROFILE = register_query(
+    "update_user_profile",
+    """
+    UPDATE users
+    SET nickname = COALESCE($2, nickname),
+        profile_image_url = COALESCE($3, profile_image_url),
+        password_hash = COALESCE($4, password_hash),
+        updated_at = NOW()
+    WHERE id = $1
+    RETURNING *
+    """,
+)
+
+# --- コンテンツ ---
+CONTENT_AUTHOR = register_query(
+    "content_author",
+    "SELECT author_id FROM contents WHERE id = $1 AND content_type = $2",
+)
+
+CONTENT_WITH_COUNTS = register_query(
+    "content_with_counts",
+    f"{CONTENT_WITH_COUNTS_SQL} WHERE c.id = $1 AND c.content_type = $2",
+)
+
+# 公開済みのコンテンツの一覧 (クイズ・豆知識ごと)。引数は (content_type, 件数, カーソルの日時, カーソルのID)
+CONTENTS_PAGE = register_query(
+    "contents_page",
+    "SELECT * FROM contents "
+    "WHERE content_type = $1 AND is_published = TRUE "
+    f"AND {keyset_condition('created_at', 'id', 3)} "
+    "ORDER BY created_at DESC, id DESC LIMIT $2",
+)
+
+# 公開フィード (作成者は匿名化)。引数は (件数, カーソルの日時, カーソルのID)
+PUBLIC_FEED_PAGE = register_query(
+    "public_feed_page",
+    f"""
+    SELECT
+        c.id, c.title, c.content, c.content_type,
+        c.created_at, c.updated_at, c.is_published,
+        NULL::uuid as author_id  -- 匿名化のためNULLに
+    FROM contents c
+    WHERE c.is_published = TRUE
+      AND {keyset_condition('c.created_at', 'c.id', 2)}
+    ORDER BY c.created_at DESC, c.id DESC
+    LIMIT $1
+    """,
+)
+
+# おすすめフィードの候補期間より前の投稿 (services/feed_service.py)。
+# 引数は (候補期間の開始日時, 件数, カーソルの日時, カーソルのID)
+FEED_OLDER_PAGE = register_query(
+    "feed_older_page",
+    f"""
+    SELECT * FROM contents c
+    WHERE c.is_published = TRUE AND c.created_at <= $1
+      AND {keyset_condition('c.created_at', 'c.id', 3)}
+    ORDER BY c.created_at DESC, c.id DESC
+    LIMIT $2
+    """,
+)
+
+# 複数コンテンツの選択肢 (services/hydration.py)
+CONTENTS_OPTIONS = register_query(
+    "contents_options",
+    """
+    SELECT * FROM quiz_options
+    WHERE content_id = ANY($1::uuid[])
+    ORDER BY content_id, display_order
+    """,
+)
+
+CONTENT_TAGS = register_query(
+    "content_tags",
+    "SELECT t.id, t.name FROM tags t JOIN content_tags ct ON t.id = ct.tag_id WHERE ct.content_id = $1",
+)
+
+QUIZ_OPTIONS = register_query(
+    "quiz_options",
+    "SELECT * FROM quiz_options WHERE content_id = $1 ORDER BY display_order",
+)
+
+# 引数は partial_update_args(data, UPDATE_CONTENT_FIELDS) で作る
+UPDATE_CONTENT_FIELDS = ("title", "content", "explanation")
+UPDATE_CONTENT = register_query(
+    "update_content",
+    """
+    UPDATE contents
+    SET title = CASE WHEN $2::boolean THEN $3 ELSE title END,
+        content = CASE WHEN $4::boolean THEN $5 ELSE content END,
+        explanation = CASE WHEN $6::boolean THEN $7 ELSE explanation END,
+        updated_at = NOW()
+    WHERE id = $1
+    """,
+)
+
+# --- 解答 ---
+ANSWER_KEY = register_query(
+    "answer_key",
+    """
+    SELECT c.content_type, c.is_published, c.explanation, qo.id AS option_id, qo.is_correct
+    FROM contents c
+    LEFT JOIN quiz_options qo ON qo.content_id = c.id
+    WHERE c.id = $1
+    """,
+)
+
+# --- ユーザーの履歴 ---
+# 引数は (ユーザーID, 件数, カーソルの日時, カーソルのID)
+USER_POSTS_PAGE = register_query(
+    "user_posts_page",
+    "SELECT id, content_type, title, created_at FROM contents "
+    f"WHERE author_id = $1 AND {keyset_condition('created_at', 'id', 3)} "
+    "ORDER BY created_at DESC, id DESC LIMIT $2",
+)
+
+USER_ANSWERS_PAGE = register_query(
+    "user_answers_page",
+    f"""
+    SELECT ua.id, ua.content_id, c.title as quiz_title, ua.selected_option_id, ua.is_correct, ua.answered_at
+    FROM user_answers ua
+    JOIN contents c ON ua.content_id = c.id
+    WHERE ua.user_id = $1
+      AND {keyset_condition('ua.answered_at', 'ua.id', 3)}
+    ORDER BY ua.answered_at DESC, ua.id DESC
+    LIMIT $2
+    """,
+)
+
+# いいね・保存したコンテンツ。引数は (ユーザーID, 件数, カーソルの日時, カーソルのID, 反応の種類)
+USER_INTERACTIONS_PAGE = register_query(
+    "user_interactions_page",
+    f"""
+    SELECT c.id, c.content_type, c.title, c.created_at,
+           i.created_at AS interacted_at, i.id AS interaction_id
+    FROM contents c
+    JOIN interactions i ON c.id = i.content_id
+    WHERE i.user_id = $1 AND i.interaction_type = $5
+      AND {keyset_condition('i.created_at', 'i.id', 3)}
+    ORDER BY i.created_at DESC, i.id DESC
+    LIMIT $2
+    """,
+)
+
+USER_NOTIFICATIONS = register_query(
+    "user_notifications",
+    """
+    SELECT * FROM notifications
+    WHERE user_id = $1
+    ORDER BY created_at DESC
+    LIMIT 50
+    """,
+)
+
+# --- チーム ---
+USER_TEAM = register_query(
+    "user_team",
+    "SELECT team_id FROM team_members WHERE user_id = $1 LIMIT 1",
+)
+
+# --- 通報 ---
+# 指定したチームのメンバーによる未対応の通報 (古い順)
+TEAM_PENDING_REPORTS = register_query(
+    "team_pending_reports",
+    """
+    SELECT
+        r.*,
+        u.nickname AS reporter_nickname,
+        c.title AS content_title
+    FROM reports r
+    JOIN users u ON r.reporter_id = u.id
+    JOIN contents c ON r.content_id = c.id
+    JOIN team_members tm ON u.id = tm.user_id
+    WHERE tm.team_id = ANY($1::uuid[]) AND r.status = 'pending'
+    ORDER BY r.created_at ASC
+    """,
+)
+
+PENDING_REPORTS_COUNT = register_query(
+    "pending_reports_count",
+    "SELECT COUNT(*) FROM reports WHERE reporter_id = ANY($1::uuid[]) AND status = 'pending'",
+)
+
+# --- 教科書連携設定 ---
+# 引数は partial_update_args(data, UPDATE_STUDY_SETTING_FIELDS) で作る
+UPDATE_STUDY_SETTING_FIELDS = ("setting_name", "exam_range_start", "exam_range_end")
+UPDATE_STUDY_SETTING = register_query(
+    "update_study_setting",
+    """
+    UPDATE study_settings
+    SET setting_name = CASE WHEN $2::boolean THEN $3 ELSE setting_name END,
+        exam_range_start = CASE WHEN $4::boolean THEN $5 ELSE exam_range_start END,
+        exam_range_end = CASE WHEN $6::boolean THEN $7 ELSE exam_range_end END,
+        updated_at = NOW()
+    WHERE id = $1
+    """,
+)
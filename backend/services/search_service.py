@@ -0,0 +1,118 @@
+import html
+import json
+import asyncpg
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from core.queries import register_query
+
+# スニペットとしてキーワードの前後に表示する文字数
+SNIPPET_CONTEXT_CHARS = 40
+
+# 検索条件 (contents.title / contents.content の pg_trgm GIN インデックスを使用)
+_SEARCH_CONDITION = "(c.title ILIKE $1 OR c.content ILIKE $1) AND c.is_published = TRUE"
+
+
+# キーワード検索の1ページ (関連度順)。
+# 引数は (LIKE パターン, キーワード, カーソルの関連度, カーソルの日時, カーソルのID, 件数)
+SEARCH_PAGE = register_query(
+    "search_page",
+    f"""
+    SELECT * FROM (
+        SELECT
+            c.*,
+            (
+                CASE WHEN c.title ILIKE $1 THEN 1.0 ELSE 0.0 END
+                + similarity(c.title, $2)
+            )::float8 AS rank
+        FROM contents c
+        WHERE {_SEARCH_CONDITION}
+    ) s
+    WHERE $3::float8 IS NULL OR (s.rank, s.created_at, s.id) < ($3::float8, $4::timestamptz, $5::uuid)
+    ORDER BY s.rank DESC, s.created_at DESC, s.id DESC
+    LIMIT $6
+    """,
+)
+
+
+def _escape_like(keyword: str) -> str:
+    """
+    LIKE のワイルドカード文字 (%, _) とエスケープ文字をエスケープします。
+    """
+    return keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def highlight(text: str, keyword: str, context_chars: Optional[int] = None) -> str:
+    """
+    テキスト中のキーワードを <mark> タグで囲んだ文字列を返します。
+    キーワード以外の部分はHTMLエスケープされるため、そのままHTMLとして表示できます。
+
+    :param text: 対象のテキスト
+    :param keyword: ハイライトするキーワード（大文字小文字は区別しない）
+    :param context_chars: 指定した場合、最初の一致箇所の前後この文字数だけを切り出したスニペットにする
+    :return: ハイライト済みの文字列
+    """
+    lowered_text, lowered_keyword = text.lower(), keyword.lower()
+    first = lowered_text.find(lowered_keyword)
+
+    start, end = 0, len(text)
+    if context_chars is not None:
+        if first < 0:
+            return html.escape(text[: context_chars * 2]) + ("…" if len(text) > context_chars * 2 else "")
+        start = max(0, first - context_chars)
+        end = min(len(text), first + len(keyword) + context_chars)
+
+    parts = []
+    position = start
+    while True:
+        found = lowered_text.find(lowered_keyword, position, end)
+        if found < 0 or not keyword:
+            break
+        parts.append(html.escape(text[position:found]))
+        parts.append(f"<mark>{html.escape(text[found:found + len(keyword)])}</mark>")
+        position = found + len(keyword)
+    parts.append(html.escape(text[position:end]))
+
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+class SearchService:
+    """
+    contents のタイトル・本文に対するキーワード検索。
+    関連度（タイトル一致・タイトルとの類似度）順に並べ、キーセット方式でページングします。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def search(
+        self,
+        keyword: str,
+        limit: int,
+        after: Optional[Tuple[float, datetime, UUID]] = None,
+    ) -> List[Dict]:
+        """
+        キーワードに一致する公開済みコンテンツを関連度順に取得します。
+
+        :param keyword: 検索キーワード
+        :param limit: 取得件数
+        :param after: 前ページ最後の行の (rank, created_at, id)。指定した場合はその次の行から取得します
+        :return: "rank" を含むコンテンツのリスト
+        """
+        after_rank, after_created_at, after_id = after if after else (None, None, None)
+        records = await SEARCH_PAGE.fetch(
+            self.conn, f"%{_escape_like(keyword)}%", keyword, after_rank, after_created_at, after_id, limit
+        )
+        return [dict(record) for record in records]
+
+    async def estimate_total(self, keyword: str) -> int:
+        """
+        検索結果の件数を、COUNT(*) を実行せずにプランナーの推定行数から求めます。
+        """
+        raw_plan = await self.conn.fetchval(
+            f"EXPLAIN (FORMAT JSON) SELECT 1 FROM contents c WHERE {_SEARCH_CONDITION}",
+            f"%{_escape_like(keyword)}%"
+        )
+        plan = json.loads(raw_plan)[0]["Plan"]
+        return int(plan.get("Plan Rows", 0))
@@ -0,0 +1,164 @@
+import asyncio
+import asyncpg
+from typing import Dict, Iterable, List, Tuple
+
+from core import security
+
+# 1バッチあたりの行数（この単位でハッシュ計算とステージングテーブルへのCOPYを行う）
+IMPORT_BATCH_SIZE = 500
+
+# users テーブルの列の長さ制限
+EMAIL_MAX_LENGTH = 255
+NICKNAME_MAX_LENGTH = 100
+
+_STAGING_TABLE = "student_import_staging"
+
+
+class StudentImportService:
+    """
+    CSVの行から生徒アカウントを一括登録するサービス。
+
+    行をバッチ単位で読み進め、パスワードのハッシュ計算を並列に行い、
+    一時テーブルへ copy_records_to_table で投入した後、重複メールアドレスの判定と
+    users への登録を集合演算のクエリ1回で行います。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def import_rows(self, rows: Iterable[List[str]]) -> Dict:
+        """
+        ヘッダーを除いたCSVの行を取り込みます。
+
+        :param rows: [email, password, nickname] の行のイテレータ
+        :return: BulkUploadResult 形式の処理結果
+        """
+        result = {
+            "total_rows": 0,
+            "successful_imports": 0,
+            "failed_imports": 0,
+            "errors": []
+        }
+        # (行番号, エラーメッセージ) を集め、最後に行番号順に並べる
+        errors: List[Tuple[int, str]] = []
+
+        await self.conn.execute(f"DROP TABLE IF EXISTS pg_temp.{_STAGING_TABLE}")
+        await self.conn.execute(
+            f"""
+            CREATE TEMP TABLE {_STAGING_TABLE} (
+                row_no INTEGER PRIMARY KEY,
+                email VARCHAR(255) NOT NULL,
+                password_hash VARCHAR(255) NOT NULL,
+                nickname VARCHAR(100) NOT NULL
+            )
+            """
+        )
+        try:
+            batch: List[Tuple[int, str, str, str]] = []
+            for i, row in enumerate(rows):
+                row_no = i + 1
+                result["total_rows"] += 1
+
+                error = self._validate_row(row)
+                if error:
+                    errors.append((row_no, f"Row {row_no}: {error}"))
+                    continue
+
+                email, password, nickname = row
+                batch.append((row_no, email, password, nickname))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    errors.extend(await self._stage_batch(batch))
+                    batch = []
+            if batch:
+                errors.extend(await self._stage_batch(batch))
+
+            errors.extend(await self._insert_staged())
+        finally:
+            await self.conn.execute(f"DROP TABLE IF EXISTS pg_temp.{_STAGING_TABLE}")
+
+        errors.sort(key=lambda e: e[0])
+        result["errors"] = [message for _, message in errors]
+        result["failed_imports"] = len(errors)
+        result["successful_imports"] = result["total_rows"] - len(errors)
+        return result
+
+    @staticmethod
+    def _validate_row(row: List[str]) -> str:
+        """
+        1行分の入力を検証し、エラーがあればメッセージを返します。
+        """
+        if len(row) != 3:
+            return "Invalid number of columns"
+        email, _, nickname = row
+        if len(email) > EMAIL_MAX_LENGTH:
+            return "Email is too long"
+        if len(nickname) > NICKNAME_MAX_LENGTH:
+            return "Nickname is too long"
+        return ""
+
+    async def _stage_batch(self, batch: List[Tuple[int, str, str, str]]) -> List[Tuple[int, str]]:
+        """
+        既に登録済みのメールアドレスを除外し、残りの行のパスワードを並列にハッシュ化して
+        ステージングテーブルへCOPYします。
+
+        :return: 登録済みのため除外した行のエラー
+        """
+        existing = {
+            r['email'] for r in await self.conn.fetch(
+                "SELECT email FROM users WHERE email = ANY($1::text[])",
+                [email for _, email, _, _ in batch]
+            )
+        }
+        errors = [
+            (row_no, f"Row {row_no}: Email '{email}' already exists.")
+            for row_no, email, _, _ in batch if email in existing
+        ]
+        batch = [row for row in batch if row[1] not in existing]
+        if not batch:
+            return errors
+
+        # ハッシュ計算はスレッドプールで並列に実行される（同時実行数は PASSWORD_HASH_WORKERS）
+        hashes = await asyncio.gather(
+            *[security.get_password_hash_async(password) for _, _, password, _ in batch]
+        )
+        await self.conn.copy_records_to_table(
+            _STAGING_TABLE,
+            records=[
+                (row_no, email, password_hash, nickname)
+                for (row_no, email, _, nickname), password_hash in zip(batch, hashes)
+            ],
+            columns=["row_no", "email", "password_hash", "nickname"],
+        )
+        return errors
+
+    async def _insert_staged(self) -> List[Tuple[int, str]]:
+        """
+        ステージングテーブルの行を users に登録します。
+        ファイル内で重複したメールアドレスは最初の行のみを登録し、
+        登録できなかった行（既存・重複）をエラーとして返します。
+        1つの文で実行されるため、登録は全件まとめて確定します。
+        """
+        rejected = await self.conn.fetch(
+            f"""
+            WITH candidates AS (
+                SELECT DISTINCT ON (email) row_no, email, password_hash, nickname
+                FROM {_STAGING_TABLE}
+                ORDER BY email, row_no
+            ),
+            inserted AS (
+                INSERT INTO users (email, password_hash, nickname, role)
+                SELECT email, password_hash, nickname, 'student' FROM candidates
+                ON CONFLICT (email) DO NOTHING
+                RETURNING email
+            )
+            SELECT s.row_no, s.email
+            FROM {_STAGING_TABLE} s
+            LEFT JOIN candidates c ON c.row_no = s.row_no
+            LEFT JOIN inserted i ON i.email = c.email
+            WHERE i.email IS NULL
+            """
+        )
+        return [
+            (r['row_no'], f"Row {r['row_no']}: Email '{r['email']}' already exists.")
+            for r in rejected
+        ]
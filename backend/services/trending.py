@@ -0,0 +1,256 @@
+import asyncpg
+import math
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from core.config import settings
+from core.queries import register_query
+
+# --- トレンドのスコアの重み ---
+# 反応の種類ごとの重み (いいね・保存・共有)
+INTERACTION_TREND_WEIGHTS = {
+    "like": 1.0,
+    "save": 3.0,
+    "share": 2.0,
+}
+ANSWER_TREND_WEIGHT = 1.0
+
+# 減衰率 λ (1秒あたり)。イベントの重みは exp(-λ × 経過秒数) で減衰する
+DECAY_RATE = math.log(2) / settings.TRENDING_HALF_LIFE_SECONDS
+
+# 減衰の基準時刻 (2024-01-01T00:00:00Z の UNIX 時刻)。
+# content_trending には「重み × exp(λ × (発生時刻 - 基準時刻))」の合計の対数を保持する
+EPOCH = 1704067200
+
+# イベントの種類と、率を保持する content_trending の列の対応
+RATE_COLUMNS = {
+    "interaction": "interaction_key",
+    "answer": "answer_key",
+}
+
+# exp() のアンダーフローを避けるための指数の下限 (これより小さい項は 0 とみなせる)
+_MIN_EXPONENT = -700
+
+
+def _logaddexp_sql(a: str, b: str) -> str:
+    """
+    ln(exp(a) + exp(b)) を桁あふれなく計算するSQL式を返します。どちらかが NULL の場合はもう一方を返します。
+    """
+    return (
+        f"CASE WHEN {a} IS NULL THEN {b} WHEN {b} IS NULL THEN {a} "
+        f"ELSE GREATEST({a}, {b}) + ln(1 + exp(GREATEST(-abs({a} - {b}), {_MIN_EXPONENT}))) END"
+    )
+
+
+def _logsubexp_sql(a: str, b: str) -> str:
+    """
+    ln(exp(a) - exp(b)) を計算するSQL式を返します。
+    a が NULL の場合は NULL、差が0以下になる場合は '-infinity'（減衰後の合計が0）を返します。
+    """
+    return (
+        f"CASE WHEN {a} IS NULL THEN NULL WHEN {b} IS NULL THEN {a} "
+        f"WHEN {b} >= {a} THEN '-infinity'::float8 "
+        f"ELSE {a} + ln(1 - exp(GREATEST({b} - {a}, {_MIN_EXPONENT}))) END"
+    )
+
+
+def _grouped_events_sql(source: str) -> str:
+    """
+    イベントの行 (content_id, occurred_at, weight) をコンテンツごとにまとめ、
+    (content_id, rate_key, score_key) を返すSELECT文を返します。
+    """
+    exponent = f"{DECAY_RATE!r}::float8 * (EXTRACT(EPOCH FROM occurred_at)::float8 - {EPOCH})"
+    return f"""
+    SELECT
+        e.content_id,
+        g.m + ln(SUM(exp(GREATEST(e.x - g.m, {_MIN_EXPONENT})))) AS rate_key,
+        g.m + ln(SUM(e.weight * exp(GREATEST(e.x - g.m, {_MIN_EXPONENT})))) AS score_key
+    FROM (SELECT content_id, weight::float8 AS weight, {exponent} AS x FROM {source}) e
+    JOIN (SELECT content_id, MAX({exponent}) AS m FROM {source} GROUP BY content_id) g
+        ON g.content_id = e.content_id
+    GROUP BY e.content_id, g.m
+    """
+
+
+def trending_upsert_sql(source: str, kind: str) -> str:
+    """
+    イベントの行 (content_id, occurred_at, weight) の集合を、content_trending の率とスコアに加えるSQLを返します。
+    イベントを書き込む文のCTEと組み合わせて、書き込みとトレンドの更新を1つの文で行うために使います。
+    既存の値は読み直さず、対数のまま加算するため、履歴の件数に関係なく1行の更新で済みます。
+
+    :param source: イベントの行を返すFROM句の対象（エイリアス付きのサブクエリや unnest(...) AS a(...) など）。
+                   同じ文の中で2回参照されます
+    :param kind: 更新する率の種類 ("interaction" または "answer")
+    """
+    column = RATE_COLUMNS[kind]
+    return f"""
+    INSERT INTO content_trending AS tr (content_id, {column}, score_key)
+    SELECT content_id, rate_key, score_key FROM ({_grouped_events_sql(source)}) ev
+    ON CONFLICT (content_id) DO UPDATE SET
+        {column} = {_logaddexp_sql(f"tr.{column}", f"EXCLUDED.{column}")},
+        score_key = {_logaddexp_sql("tr.score_key", "EXCLUDED.score_key")},
+        updated_at = NOW()
+    """
+
+
+def trending_subtract_sql(source: str, kind: str) -> str:
+    """
+    削除されたイベントの行 (content_id, occurred_at, weight) の寄与を、content_trending の率とスコアから差し引くSQLを返します。
+    発生時刻を使って加算時と同じ値を差し引くため、取消を繰り返してもスコアは増えず、
+    rebuild() で残っている行から再計算した値と一致します。
+
+    :param source: trending_upsert_sql と同じ
+    :param kind: 更新する率の種類 ("interaction" または "answer")
+    """
+    column = RATE_COLUMNS[kind]
+    return f"""
+    UPDATE content_trending tr
+    SET {column} = {_logsubexp_sql(f"tr.{column}", "ev.rate_key")},
+        score_key = {_logsubexp_sql("tr.score_key", "ev.score_key")},
+        updated_at = NOW()
+    FROM ({_grouped_events_sql(source)}) ev
+    WHERE tr.content_id = ev.content_id
+    """
+
+
+def interaction_weight_sql(type_column: str = "interaction_type") -> str:
+    """
+    反応の種類の列から、トレンドの重み (INTERACTION_TREND_WEIGHTS) を返すSQLのCASE式を返します。
+    """
+    weight_cases = " ".join(
+        f"WHEN '{interaction_type}' THEN {weight}"
+        for interaction_type, weight in INTERACTION_TREND_WEIGHTS.items()
+    )
+    return f"CASE {type_column} {weight_cases} END"
+
+
+def decayed_value(key: Optional[float], now: datetime) -> float:
+    """
+    content_trending の対数の値を、現在時刻まで減衰させた合計に戻します。
+    """
+    if key is None:
+        return 0.0
+    return math.exp(key - DECAY_RATE * (now.timestamp() - EPOCH))
+
+
+def hourly_rate(key: Optional[float], now: datetime) -> float:
+    """
+    減衰付きの件数の合計を、1時間あたりの件数（指数移動平均）に換算します。
+    """
+    return decayed_value(key, now) * DECAY_RATE * 3600
+
+
+# トレンドの上位のコンテンツ。引数は (件数, チームID または NULL)
+TRENDING_TOP = register_query(
+    "trending_top",
+    """
+    SELECT c.*, tr.interaction_key, tr.answer_key, tr.score_key
+    FROM content_trending tr
+    JOIN contents c ON c.id = tr.content_id
+    WHERE c.is_published = TRUE AND tr.score_key > '-infinity'::float8
+      AND (
+          $2::uuid IS NULL
+          OR c.team_id = $2
+          OR c.author_id IN (SELECT user_id FROM team_members WHERE team_id = $2)
+      )
+    ORDER BY tr.score_key DESC
+    LIMIT $1
+    """,
+)
+
+
+class TrendingService:
+    """
+    content_trending（コンテンツごとの指数減衰付きの反応・解答の率）の読み書きを行うサービス。
+    率は反応・解答の書き込み時に更新され、順位は score_key のインデックスで読むため履歴を走査しません。
+    反応の取消では、その反応の登録日時から求めた寄与を差し引きます。
+    """
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def add_answers(self, answers: Iterable[Tuple[UUID, datetime]]) -> None:
+        """
+        書き込まれた解答の分だけ、コンテンツの解答の率とスコアを増やします。
+
+        :param answers: (content_id, answered_at) の行
+        """
+        answers = list(answers)
+        if not answers:
+            return
+        content_ids, answered_ats = (list(column) for column in zip(*answers))
+        await self.conn.execute(
+            trending_upsert_sql(
+                f"(SELECT content_id, answered_at AS occurred_at, {ANSWER_TREND_WEIGHT} AS weight "
+                "FROM unnest($1::uuid[], $2::timestamptz[]) AS a(content_id, answered_at)) AS a",
+                "answer",
+            ),
+            content_ids, answered_ats
+        )
+
+    async def subtract_user_answers(self, user_id: UUID) -> None:
+        """
+        ユーザーの削除前に呼び出し、（カスケード削除される）そのユーザーの解答の分だけ解答の率とスコアを減らします。
+        ユーザーの削除と同じトランザクション内で呼び出してください。
+        """
+        await self.conn.execute(
+            trending_subtract_sql(
+                "(SELECT content_id, answered_at AS occurred_at, "
+                f"{ANSWER_TREND_WEIGHT} AS weight FROM user_answers WHERE user_id = $1) AS a",
+                "answer",
+            ),
+            user_id
+        )
+
+    async def top(self, limit: int, team_id: Optional[UUID] = None) -> List[Dict]:
+        """
+        現在のトレンドの上位のコンテンツを取得します。
+
+        :param limit: 取得する件数
+        :param team_id: 指定した場合は、そのチームのメンバーの投稿（またはチームに紐づく投稿）に絞ります
+        :return: contents の列と "trending"（現在のスコアと1時間あたりの反応・解答の率）を含む辞書のリスト
+        """
+        records = await TRENDING_TOP.fetch(self.conn, limit, team_id)
+        now = datetime.now(timezone.utc)
+        items = []
+        for record in records:
+            item = {k: v for k, v in record.items() if k not in ('interaction_key', 'answer_key', 'score_key')}
+            item['trending'] = {
+                "score": decayed_value(record['score_key'], now),
+                "interaction_rate": hourly_rate(record['interaction_key'], now),
+                "answer_rate": hourly_rate(record['answer_key'], now),
+            }
+            items.append(item)
+        return items
+
+    async def rebuild(self, only_if_empty: bool = False) -> Optional[int]:
+        """
+        interactions と user_answers の履歴から全コンテンツの率とスコアを再計算します。
+        （導入時・半減期の変更時や、APIを経由しない書き込みの後に実行する）
+        集計中に率が更新されないよう、content_trending をロックして実行します。
+
+        :param only_if_empty: True の場合、content_trending に行がある場合は何もしません
+                              （起動時の初回の取り込み用。同時に起動した他のプロセスが取り込み済みなら省略される）
+        :return: 率を持つコンテンツの件数（省略した場合は None）
+        """
+        async with self.conn.transaction():
+            await self.conn.execute("LOCK TABLE content_trending IN SHARE ROW EXCLUSIVE MODE")
+            if only_if_empty and await self.conn.fetchval("SELECT EXISTS (SELECT 1 FROM content_trending)"):
+                return None
+            await self.conn.execute("DELETE FROM content_trending")
+            await self.conn.execute(
+                trending_upsert_sql(
+                    "(SELECT content_id, created_at AS occurred_at, "
+                    f"{interaction_weight_sql()} AS weight FROM interactions) AS i",
+                    "interaction",
+                )
+            )
+            await self.conn.execute(
+                trending_upsert_sql(
+                    "(SELECT content_id, answered_at AS occurred_at, "
+                    f"{ANSWER_TREND_WEIGHT} AS weight FROM user_answers) AS a",
+                    "answer",
+                )
+            )
+            return await self.conn.fetchval("SELECT COUNT(*) FROM content_trending")
@@ -0,0 +1,12 @@
+#!/bin/sh
+# サーバーの起動前に未適用のマイグレーションを適用する
+# (複数のコンテナが同時に起動しても、scripts.migrate のアドバイザリロックで二重適用されない)
+set -e
+
+python -m scripts.migrate
+
+# トレンド (content_trending) が空の場合は、既存の反応・解答の履歴から取り込む
+# (減衰率は TRENDING_HALF_LIFE_SECONDS から求めるため、SQLのマイグレーションではなくここで実行する)
+python -m scripts.rebuild_trending --if-empty
+
+exec "$@"
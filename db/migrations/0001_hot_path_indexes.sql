@@ -0,0 +1,74 @@
+-- migrate: no-transaction
+-- 0001: ホットパスのクエリ用セカンダリインデックス
+-- 既存データがある環境でもテーブルをロックしないよう CONCURRENTLY で作成します。
+-- そのため、このファイルはトランザクション外で1文ずつ実行されます。
+
+-- user_answers: 解答履歴（ユーザー別・新しい順）と統計の集計
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_answers_user_answered_at
+    ON user_answers (user_id, answered_at DESC);
+
+-- user_answers: コンテンツ別の解答（削除時のCASCADEや集計）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_answers_content_id
+    ON user_answers (content_id);
+
+-- contents: 公開済みコンテンツの新しい順一覧（フィード・公開フィード・検索）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_published_created_at
+    ON contents (created_at DESC, id DESC)
+    WHERE is_published = TRUE;
+
+-- contents: 種類別（クイズ・豆知識）の公開済み一覧
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_published_type_created_at
+    ON contents (content_type, created_at DESC, id DESC)
+    WHERE is_published = TRUE;
+
+-- contents: 作成者別の投稿履歴
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_author_created_at
+    ON contents (author_id, created_at DESC);
+
+-- content_tags: タグからコンテンツを引く（人気タグ・試験範囲ボーナス）
+-- (content_id, tag_id) は UNIQUE 制約のインデックスで既にカバーされています
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_tags_tag_id
+    ON content_tags (tag_id);
+
+-- quiz_options: 表示順での選択肢取得
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quiz_options_content_display_order
+    ON quiz_options (content_id, display_order);
+
+-- quiz_options: 正解の選択肢の取得（解答判定）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quiz_options_correct
+    ON quiz_options (content_id)
+    WHERE is_correct = TRUE;
+
+-- notifications: ユーザー別の通知一覧（新しい順）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_notifications_user_created_at
+    ON notifications (user_id, created_at DESC);
+
+-- reports: ステータス別の指摘一覧
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_status_created_at
+    ON reports (status, created_at);
+
+-- reports: 自身の指摘履歴
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_reporter_created_at
+    ON reports (reporter_id, created_at DESC);
+
+-- reports: 未対応の指摘数（ダッシュボード）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_pending_reporter
+    ON reports (reporter_id)
+    WHERE status = 'pending';
+
+-- interactions: コンテンツ別の反応数の集計
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_interactions_content_type
+    ON interactions (content_id, interaction_type);
+
+-- interactions: 自身がいいね・保存したコンテンツの一覧（新しい順）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_interactions_user_type_created_at
+    ON interactions (user_id, interaction_type, created_at DESC);
+
+-- team_members: ユーザーの所属チームの取得
+-- (team_id, user_id) は UNIQUE 制約のインデックスで既にカバーされています
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_team_members_user_id
+    ON team_members (user_id);
+
+-- teams: 教師が管理するチームの一覧
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_teams_created_by
+    ON teams (created_by);
@@ -0,0 +1,12 @@
+-- migrate: no-transaction
+-- 0002: キーワード検索 (/search) 用のトライグラムインデックス
+-- 日本語の文章は空白で単語に区切れないため、全文検索(tsvector)ではなく
+-- pg_trgm の GIN インデックスで ILIKE '%キーワード%' の部分一致検索を高速化します。
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_title_trgm
+    ON contents USING GIN (title gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_content_trgm
+    ON contents USING GIN (content gin_trgm_ops);
@@ -0,0 +1,23 @@
+-- 0003: コンテンツごとの反応数 (いいね・保存・共有) を保持するカウンターテーブル
+-- interactions を毎回集計せずに、フィードのスコア計算や一覧表示で反応数を読めるようにします。
+-- カウンターは interactions への書き込みと同じ文で増減し、
+-- ずれた場合は python -m scripts.reconcile_engagement で interactions から再計算します。
+
+CREATE TABLE IF NOT EXISTS content_engagement (
+    content_id UUID PRIMARY KEY REFERENCES contents(id) ON DELETE CASCADE,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    save_count INTEGER NOT NULL DEFAULT 0,
+    share_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 既存の interactions からカウンターを作成
+INSERT INTO content_engagement (content_id, like_count, save_count, share_count)
+SELECT
+    content_id,
+    COUNT(*) FILTER (WHERE interaction_type = 'like'),
+    COUNT(*) FILTER (WHERE interaction_type = 'save'),
+    COUNT(*) FILTER (WHERE interaction_type = 'share')
+FROM interactions
+GROUP BY content_id
+ON CONFLICT (content_id) DO NOTHING;
@@ -0,0 +1,39 @@
+-- 0004: ユーザーごとの学習統計 (解答数・正解数・投稿数・最終活動日時) のロールアップテーブル
+-- マイページ・生徒詳細・ダッシュボード・チームメンバー一覧で、user_answers と contents を
+-- 毎回集計せずに主キーで統計を読めるようにします。
+-- 解答・投稿の書き込み時に増分で更新し、python -m scripts.backfill_learning_stats で再構築できます。
+
+CREATE TABLE IF NOT EXISTS user_learning_stats (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    answers_count INTEGER NOT NULL DEFAULT 0,
+    correct_answers_count INTEGER NOT NULL DEFAULT 0,
+    posts_count INTEGER NOT NULL DEFAULT 0,
+    last_activity_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 既存の解答・投稿から統計を作成
+INSERT INTO user_learning_stats (user_id, answers_count, correct_answers_count, posts_count, last_activity_at)
+SELECT
+    u.id,
+    COALESCE(a.answers_count, 0),
+    COALESCE(a.correct_answers_count, 0),
+    COALESCE(p.posts_count, 0),
+    GREATEST(a.last_answered_at, p.last_posted_at)
+FROM users u
+LEFT JOIN (
+    SELECT
+        user_id,
+        COUNT(*) AS answers_count,
+        COUNT(*) FILTER (WHERE is_correct) AS correct_answers_count,
+        MAX(answered_at) AS last_answered_at
+    FROM user_answers
+    GROUP BY user_id
+) a ON a.user_id = u.id
+LEFT JOIN (
+    SELECT author_id, COUNT(*) AS posts_count, MAX(created_at) AS last_posted_at
+    FROM contents
+    GROUP BY author_id
+) p ON p.author_id = u.id
+WHERE a.user_id IS NOT NULL OR p.author_id IS NOT NULL
+ON CONFLICT (user_id) DO NOTHING;
@@ -0,0 +1,31 @@
+-- migrate: no-transaction
+-- 0005: ユーザーごと・日ごとの活動数 (投稿数・解答数) のロールアップ
+-- ダッシュボードの活動推移 (7日・30日・90日) を、contents と user_answers を毎回集計せずに返すためのテーブルです。
+-- 集計は services/activity_rollup.py が定期的に実行し、rollup_watermarks に記録した
+-- 前回の処理位置 (ウォーターマーク) より新しい行だけを加算します。
+
+CREATE TABLE IF NOT EXISTS user_daily_activity (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    activity_date DATE NOT NULL,
+    posts_count INTEGER NOT NULL DEFAULT 0,
+    answers_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, activity_date)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 初回の集計で既存の全履歴を取り込むよう、ウォーターマークを最古に設定
+INSERT INTO rollup_watermarks (name, watermark)
+VALUES ('user_daily_activity', '-infinity')
+ON CONFLICT (name) DO NOTHING;
+
+-- ウォーターマーク以降の行を時刻の範囲で読むためのインデックス
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_answers_answered_at
+    ON user_answers (answered_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_created_at
+    ON contents (created_at);
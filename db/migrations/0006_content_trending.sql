@@ -0,0 +1,22 @@
+-- 0006: コンテンツごとの指数減衰付きの反応・解答の率 (トレンド) を保持するテーブル
+-- 各列は「イベントごとの重み × exp(λ × (発生時刻 - 基準時刻))」の合計の自然対数で、
+-- 時刻とともに全行が同じ割合で減衰するため、値の大小がそのまま現在のトレンドの順位になります。
+-- (λ は TRENDING_HALF_LIFE_SECONDS から求める減衰率。基準時刻は services/trending.py の EPOCH)
+-- 反応・解答の書き込みと同じ文・トランザクションで更新し、履歴を走査せずに順位を返せるようにします。
+-- 既存の履歴は、コンテナの起動時に python -m scripts.rebuild_trending --if-empty が取り込みます
+-- (container/backend-entrypoint.sh)。半減期を変更した場合は python -m scripts.rebuild_trending で再計算します。
+
+CREATE TABLE IF NOT EXISTS content_trending (
+    content_id UUID PRIMARY KEY REFERENCES contents(id) ON DELETE CASCADE,
+    -- 反応 (いいね・保存・共有) の件数の減衰付き合計 (対数)。反応がない場合は NULL
+    interaction_key DOUBLE PRECISION,
+    -- 解答の件数の減衰付き合計 (対数)。解答がない場合は NULL
+    answer_key DOUBLE PRECISION,
+    -- 反応・解答の重み付きの減衰付き合計 (対数)。順位に使用する
+    score_key DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 全体のトレンドを上位から読むためのインデックス
+CREATE INDEX IF NOT EXISTS idx_content_trending_score_key
+    ON content_trending (score_key DESC);